@@ -1,8 +1,10 @@
 from fastapi import APIRouter
 
 from api.convert import convert_router
+from api.system import system_router
 
 api_router = APIRouter()
 
 
 api_router.include_router(convert_router, prefix="/convert", tags=["convert"])
+api_router.include_router(system_router, prefix="/system", tags=["system"])
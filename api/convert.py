@@ -1,22 +1,28 @@
+import os
+import json
 import time
 import logging
 from typing import Any
 from pathlib import Path
+from email.utils import parsedate_to_datetime
 
-from fastapi.responses import FileResponse
-from fastapi import APIRouter, HTTPException, status, BackgroundTasks
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from fastapi import APIRouter, HTTPException, Request, status
 
 from core.config import settings
-from services.llm import llm_service
+from core.executors import executors
+from services.jobs import Job, job_service
+from services.batch import Batch, batch_service
 from services.pdf import pdf_service
-from services.youtube import youtube_service
+from services.lifecycle import lifecycle_service
 from schemas.response import StandardResponse
 from schemas.convert import (
-    PDFInfo,
-    VideoInfo,
+    JobResponse,
+    BatchResponse,
+    BatchItemResponse,
+    BatchConvertRequest,
     ConvertRequest,
     ConvertResponse,
-    ContentAnalysis,
     ProcessingStatus,
 )
 
@@ -31,110 +37,220 @@ convert_router = APIRouter()
     status_code=status.HTTP_200_OK,
     description="Convert a YouTube video to actionable PDF notes with insights and analysis",
 )
-async def convert_to_pdf(
-    request: ConvertRequest, background_tasks: BackgroundTasks
-) -> Any:
+async def convert_to_pdf(request: ConvertRequest) -> Any:
     """
     Convert YouTube video to actionable PDF notes.
     """
     start_time = time.time()
-    audio_file_path = None
-    pdf_file_path = None
 
     try:
-        logger.info(f"Starting conversion for URL: {request.url}")
+        job = job_service.submit(request)
+        await job.wait()
 
-        # validate yt url
-        if not youtube_service.validate_youtube_url(str(request.url)):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid YouTube URL provided",
-            )
+        if job.error:
+            raise job.error
 
-        # extract video information
-        logger.info("Extracting video metadata...")
-        video_info_dict = youtube_service.extract_video_info(str(request.url))
-        video_info = VideoInfo(**video_info_dict)
+        return StandardResponse(
+            success=True,
+            message="YouTube video converted to PDF successfully",
+            data=job.result,
+        )
 
-        # download audio
-        logger.info("Downloading and processing audio...")
-        audio_file_path = youtube_service.download_audio(
-            str(request.url), video_info_dict
+    except OverflowError as ex:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(ex)
         )
 
-        # transcribe audio
-        logger.info("Transcribing audio using Whisper...")
-        transcript = await llm_service.transcribe_audio(audio_file_path)
+    except ValueError as ex:
+        logger.exception(f"Validation error: {str(ex)}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ex))
 
-        if not transcript or len(transcript.strip()) < 50:
-            raise ValueError(
-                "Transcript is too short or empty. The video might not have clear audio."
-            )
+    except Exception as ex:
+        logger.exception(f"Unexpected error during conversion: {str(ex)}")
 
-        logger.info(f"Transcription completed. Length: {len(transcript)} characters")
+        processing_time = round(time.time() - start_time, 2)
 
-        # analyze content
-        logger.info("Analyzing content with GPT...")
-        analysis_dict = await llm_service.analyze_content(transcript, video_info_dict)
-        analysis = ContentAnalysis(**analysis_dict)
+        convert_response = ConvertResponse(
+            status=ProcessingStatus.FAILED,
+            message=f"Conversion failed: {str(ex)}",
+            processing_time=processing_time,
+        )
 
-        # generate HTML content for PDF
-        logger.info("Generating PDF content...")
-        html_content = await llm_service.generate_pdf_content(
-            analysis_dict, video_info_dict
+        return StandardResponse(
+            success=False,
+            message="Failed to convert YouTube video to PDF",
+            data=convert_response,
         )
 
-        # create PDF
-        logger.info("Creating PDF document...")
-        pdf_file_path = pdf_service.generate_pdf(html_content, video_info_dict)
 
-        # get PDF information
-        pdf_info_dict = pdf_service.get_pdf_info(pdf_file_path)
-        pdf_info = PDFInfo(**pdf_info_dict)
+@convert_router.post(
+    "/jobs",
+    response_model=StandardResponse[JobResponse],
+    status_code=status.HTTP_202_ACCEPTED,
+    description="Queue a YouTube video conversion and return its job id immediately",
+)
+async def create_convert_job(request: ConvertRequest) -> Any:
+    """
+    Queue a YouTube video conversion job.
+    """
+    try:
+        job = job_service.submit(request)
 
-        processing_time = round(time.time() - start_time, 2)
+    except OverflowError as ex:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(ex)
+        )
 
-        convert_response = ConvertResponse(
-            status=ProcessingStatus.COMPLETED,
-            message="PDF generated successfully",
-            video_info=video_info,
-            pdf_info=pdf_info,
-            analysis=analysis,
-            processing_time=processing_time,
+    return StandardResponse(
+        success=True,
+        message="Conversion job queued successfully",
+        data=_build_job_response(job),
+    )
+
+
+@convert_router.get(
+    "/jobs/{job_id}",
+    response_model=StandardResponse[JobResponse],
+    description="Get the status and result of a conversion job",
+)
+async def get_convert_job(job_id: str) -> Any:
+    """
+    Get the status of a conversion job.
+    """
+    job = job_service.get(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Conversion job not found"
         )
 
-        logger.info(f"Conversion completed successfully in {processing_time}s")
+    return StandardResponse(
+        success=job.status != ProcessingStatus.FAILED,
+        message=f"Conversion job is {job.status.value}",
+        data=_build_job_response(job),
+    )
 
-        return StandardResponse(
-            success=True,
-            message="YouTube video converted to PDF successfully",
-            data=convert_response,
+
+@convert_router.get(
+    "/jobs/{job_id}/events",
+    response_class=StreamingResponse,
+    description="Stream stage and progress events of a conversion job as Server-Sent Events",
+)
+async def stream_convert_job_events(job_id: str) -> Any:
+    """
+    Stream the progress of a conversion job.
+    """
+    job = job_service.get(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Conversion job not found"
         )
 
+    async def event_stream():
+        async for event in job.events(settings.JOB_EVENT_HEARTBEAT_SECONDS):
+            if event is None:
+                # comment line, keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+                continue
+
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _build_job_response(job: Job) -> JobResponse:
+    """
+    Build the job response schema from a job.
+    """
+    return JobResponse(
+        job_id=job.id,
+        status=job.status,
+        url=job.url,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        result=job.result,
+        error=str(job.error) if job.error else None,
+    )
+
+
+@convert_router.post(
+    "/batch",
+    response_model=StandardResponse[BatchResponse],
+    status_code=status.HTTP_202_ACCEPTED,
+    description="Queue conversions for every video of a playlist, channel or list of URLs",
+)
+async def create_batch(request: BatchConvertRequest) -> Any:
+    """
+    Queue a batch of YouTube video conversions.
+    """
+    try:
+        batch = await batch_service.create(request)
+
     except ValueError as ex:
         logger.exception(f"Validation error: {str(ex)}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ex))
 
-    except Exception as ex:
-        logger.exception(f"Unexpected error during conversion: {str(ex)}")
+    return StandardResponse(
+        success=True,
+        message=f"Batch of {len(batch.items)} videos queued successfully",
+        data=_build_batch_response(batch),
+    )
 
-        processing_time = round(time.time() - start_time, 2)
 
-        convert_response = ConvertResponse(
-            status=ProcessingStatus.FAILED,
-            message=f"Conversion failed: {str(ex)}",
-            processing_time=processing_time,
+@convert_router.get(
+    "/batch/{batch_id}",
+    response_model=StandardResponse[BatchResponse],
+    description="Get the progress and partial results of a batch conversion",
+)
+async def get_batch(batch_id: str) -> Any:
+    """
+    Get the status of a batch conversion.
+    """
+    batch = batch_service.get(batch_id)
+    if not batch:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Batch not found"
         )
 
-        return StandardResponse(
-            success=False,
-            message="Failed to convert YouTube video to PDF",
-            data=convert_response,
+    return StandardResponse(
+        success=batch.status != ProcessingStatus.FAILED,
+        message=f"Batch is {batch.status.value}",
+        data=_build_batch_response(batch),
+    )
+
+
+def _build_batch_response(batch: Batch) -> BatchResponse:
+    """
+    Build the batch response schema from a batch.
+    """
+    items = []
+    for index, item in enumerate(batch.items):
+        job = item.job
+        items.append(
+            BatchItemResponse(
+                index=index,
+                url=str(item.request.url),
+                status=item.status,
+                job_id=job.id if job else None,
+                result=job.result if job else None,
+                error=str(job.error) if job and job.error else None,
+            )
         )
 
-    # finally:
-    #     if audio_file_path:
-    #         background_tasks.add_task(cleanup_files, audio_file_path, pdf_file_path)
+    return BatchResponse(
+        batch_id=batch.id,
+        status=batch.status,
+        total=len(batch.items),
+        completed=batch.count(ProcessingStatus.COMPLETED),
+        failed=batch.count(ProcessingStatus.FAILED),
+        created_at=batch.created_at,
+        finished_at=batch.finished_at,
+        items=items,
+    )
 
 
 @convert_router.get(
@@ -142,9 +258,14 @@ async def convert_to_pdf(
     response_class=FileResponse,
     description="Download a generated PDF file by filename",
 )
-async def download_pdf(filename: str) -> Any:
+async def download_pdf(filename: str, request: Request) -> Any:
     """
     Download a generated PDF file.
+
+    Supports conditional requests against a content-hash ETag and byte
+    ranges. Names carrying the content hash are cached as immutable and
+    stop resolving once a re-render replaces those bytes. Plain names
+    always serve the latest render, so clients revalidate them.
     """
     try:
         safe_filename = Path(filename).name
@@ -154,28 +275,82 @@ async def download_pdf(filename: str) -> Any:
                 detail="Invalid file format. Only PDF files are supported.",
             )
 
-        pdf_path = Path(settings.UPLOAD_DIR) / "pdfs" / safe_filename
+        pdf_path, content_hash = pdf_service.resolve_filename(safe_filename)
 
-        if not pdf_path.exists():
+        stat_result, digest = await executors.run_io(_stat_pdf, pdf_path)
+        if stat_result is None or (
+            content_hash and not digest.startswith(content_hash)
+        ):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="PDF file not found"
             )
 
+        etag = f'"{digest}"'
+        headers = {
+            "ETag": etag,
+            "Cache-Control": (
+                "public, max-age=31536000, immutable" if content_hash else "no-cache"
+            ),
+        }
+
+        if _is_not_modified(request, etag, stat_result):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
         logger.info(f"Serving PDF file: {pdf_path}")
 
         return FileResponse(
             path=str(pdf_path),
             filename=safe_filename,
             media_type="application/pdf",
+            stat_result=stat_result,
             headers={
                 "Content-Disposition": f"attachment; filename={safe_filename}",
-                "Cache-Control": "no-cache",
+                **headers,
             },
         )
 
+    except HTTPException:
+        raise
+
     except Exception as ex:
         logger.error(f"Error serving PDF file: {str(ex)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to serve PDF file",
         )
+
+
+def _stat_pdf(pdf_path: Path) -> tuple[os.stat_result | None, str | None]:
+    """
+    Stat a PDF, record the access and get the SHA-256 of its bytes.
+    """
+    try:
+        stat_result = pdf_path.stat()
+    except FileNotFoundError:
+        return None, None
+
+    # a download, or a revalidation, keeps the file from quota eviction longest
+    lifecycle_service.touch(pdf_path)
+
+    return stat_result, pdf_service.digest(pdf_path, stat_result)
+
+
+def _is_not_modified(request: Request, etag: str, stat_result: os.stat_result) -> bool:
+    """
+    Check a request's If-None-Match, or else If-Modified-Since, against the file.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        # Last-Modified has whole-second precision
+        return int(stat_result.st_mtime) <= since
+
+    return False
@@ -0,0 +1,27 @@
+import logging
+from typing import Any
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    description="Prometheus metrics in the text exposition format",
+)
+async def get_metrics() -> Any:
+    """
+    Get Prometheus metrics.
+
+    Gauges are set by the services as their state changes, so every worker's
+    values are current in a multiprocess scrape.
+    """
+    body, content_type = metrics.render()
+    return PlainTextResponse(body, media_type=content_type)
@@ -0,0 +1,39 @@
+import logging
+from typing import Any
+
+from fastapi import APIRouter
+
+from core.executors import executors
+from services.jobs import job_service
+from services.cache import result_cache
+from services.lifecycle import lifecycle_service
+from services.ratelimit import openai_scheduler
+from services.render_pool import render_pool
+from schemas.response import StandardResponse
+
+logger = logging.getLogger(__name__)
+
+system_router = APIRouter()
+
+
+@system_router.get(
+    "/stats",
+    response_model=StandardResponse[dict[str, Any]],
+    description="Get job queue, executor pool, result cache, storage and OpenAI scheduler statistics",
+)
+async def get_stats() -> Any:
+    """
+    Get job queue, executor pool, result cache, storage and OpenAI scheduler statistics.
+    """
+    return StandardResponse(
+        success=True,
+        message="Stats retrieved successfully",
+        data={
+            "jobs": job_service.stats(),
+            "executors": executors.stats(),
+            "render": render_pool.stats(),
+            "cache": result_cache.stats(),
+            "storage": lifecycle_service.stats(),
+            "openai": openai_scheduler.stats(),
+        },
+    )
@@ -0,0 +1,154 @@
+"""
+Benchmark of the "mp3" and "speech" audio profiles on a local media file.
+
+Each profile runs through the service's own download path, with yt-dlp
+reading the file through a file:// URL: the "mp3" profile converts it with
+yt-dlp's FFmpegExtractAudio postprocessor, and the "speech" profile keeps it
+as is when Whisper accepts the container or transcodes it on the CPU pool
+otherwise. The "speech (transcoded)" row forces that transcode, to show its
+cost on sources that can't be kept.
+
+For each profile, reports the CPU time of this process, ffmpeg and the CPU
+pool workers, the output file size and the estimated upload time to Whisper
+at a given uplink bandwidth.
+
+Usage:
+    python -m benchmarks.audio_profile path/to/audio.webm --uplink-mbps 20
+"""
+
+import os
+import time
+import argparse
+import tempfile
+import resource
+from typing import Callable
+from pathlib import Path
+
+# an 11-character id, so the service takes the URL for a YouTube one
+VIDEO_ID = "audioprof01"
+VIDEO_URL = f"https://www.youtube.com/watch?v={VIDEO_ID}"
+
+
+def pool_cpu_times() -> dict[int, float]:
+    """
+    CPU seconds of each live CPU pool worker and its reaped children, from /proc.
+    """
+    from benchmarks.e2e import worker_pids
+
+    ticks = os.sysconf("SC_CLK_TCK")
+    times = {}
+    for pid in worker_pids()["cpu_pool"]:
+        try:
+            with open(f"/proc/{pid}/stat") as stat:
+                # fields after the command name, which may contain spaces
+                fields = stat.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        # utime, stime, cutime and cstime
+        times[pid] = sum(int(value) for value in fields[11:15]) / ticks
+    return times
+
+
+def cpu_time() -> float:
+    """
+    CPU seconds of this process, its reaped children and the CPU pool workers.
+
+    ffmpeg run by yt-dlp is a direct child of this process, while the speech
+    transcode runs it from a pool worker, which only reports it once reaped.
+    """
+    total = 0.0
+    for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+        usage = resource.getrusage(who)
+        total += usage.ru_utime + usage.ru_stime
+    return total + sum(pool_cpu_times().values())
+
+
+def measure(name: str, func: Callable[[], Path], uplink_mbps: float) -> dict:
+    cpu_before = cpu_time()
+    wall_before = time.perf_counter()
+    output_path = func()
+    wall = time.perf_counter() - wall_before
+    cpu = cpu_time() - cpu_before
+
+    size = output_path.stat().st_size
+    output_path.unlink()
+    return {
+        "profile": name,
+        "format": output_path.suffix.lstrip("."),
+        "cpu_s": cpu,
+        "wall_s": wall,
+        "size_mb": size / (1024 * 1024),
+        "upload_s": size * 8 / (uplink_mbps * 1_000_000),
+    }
+
+
+def run_profiles(source: Path, uplink_mbps: float) -> list[dict]:
+    """
+    Download the source with each profile through the YouTube service.
+    """
+    from core.config import settings
+    from core.executors import executors
+    from services.audio import probe_seconds
+    from services.youtube import youtube_service
+    from benchmarks.e2e import install_fixtures
+
+    install_fixtures({VIDEO_ID: (source, round(probe_seconds(str(source))))})
+    raw_info = youtube_service._extract_raw_info(VIDEO_URL)
+
+    def forced_transcode() -> Path:
+        allowed = settings.ALLOWED_AUDIO_FORMATS
+        settings.ALLOWED_AUDIO_FORMATS = []
+        try:
+            return youtube_service._download_speech_audio(raw_info, "transcoded")
+        finally:
+            settings.ALLOWED_AUDIO_FORMATS = allowed
+
+    try:
+        return [
+            measure(
+                "mp3 (192 kbps)",
+                lambda: youtube_service._download_mp3_audio(raw_info, "mp3"),
+                uplink_mbps,
+            ),
+            measure(
+                "speech",
+                lambda: youtube_service._download_speech_audio(raw_info, "speech"),
+                uplink_mbps,
+            ),
+            measure(
+                f"speech (transcoded, {settings.SPEECH_BITRATE_KBPS} kbps)",
+                forced_transcode,
+                uplink_mbps,
+            ),
+        ]
+    finally:
+        executors.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("source", type=Path, help="downloaded audio-only stream")
+    parser.add_argument("--uplink-mbps", type=float, default=20.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # settings are read at import, so configure them before the service loads
+        os.environ.setdefault("OPENAI_API_KEY", "stub")
+        # yt-dlp can't tell a local file is audio-only, so "ba" never matches it
+        os.environ.setdefault("SPEECH_AUDIO_FORMAT", "best")
+        os.environ["UPLOAD_DIR"] = tmp
+        results = run_profiles(args.source.resolve(), args.uplink_mbps)
+
+    print(
+        f"{'profile':<32}{'format':>8}{'cpu s':>9}{'wall s':>9}"
+        f"{'size MB':>10}{'upload s':>10}"
+    )
+    for row in results:
+        print(
+            f"{row['profile']:<32}{row['format']:>8}{row['cpu_s']:>9.2f}"
+            f"{row['wall_s']:>9.2f}{row['size_mb']:>10.2f}{row['upload_s']:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Benchmark of local transcript compression on transcripts several hours long.
+
+Builds transcripts of each --hours length by drawing sentences of a source
+corpus at random, at --words-per-minute of speech, and compresses each
+--repeat times with the TRANSCRIPT_COMPRESSION_* settings.
+Reports the wall time of each step, the compression ratio and the tokens
+removed per second.
+
+The corpus defaults to the transcripts kept in the result cache. Without
+any, a generated lecture with fillers and repeated sentences is used.
+Needs the "compression" extra (NumPy).
+
+Usage:
+    python -m benchmarks.compression "uploads/cache/*/transcript.txt" \\
+        --hours 1 2 4 8 --repeat 3
+"""
+
+import os
+import glob
+import time
+import random
+import argparse
+import statistics
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+
+from core.config import settings  # noqa: E402
+from services.compression import (  # noqa: E402
+    compress_transcript,
+    find_duplicates,
+    remove_disfluencies,
+    split_sentences,
+    textrank,
+    tfidf_matrix,
+)
+
+WORDS = (
+    "model training data loss gradient network layer attention token embedding "
+    "optimizer batch learning rate transformer weights inference latency memory "
+    "cache dataset label feature vector matrix kernel dropout schedule warmup "
+    "checkpoint evaluation benchmark accuracy precision recall overfitting "
+    "regularization activation softmax encoder decoder sequence context window "
+    "prompt sampling temperature beam search quantization pruning distillation"
+).split()
+FILLERS = ("Um, so", "And, you know,", "Uh,", "So basically", "Right, so", "And")
+CONNECTORS = ("the", "of", "and", "with", "for", "is", "to", "in")
+
+
+def generated_sentences(count: int, seed: int = 0) -> list[str]:
+    """
+    Sentences of random domain words with fillers, some said twice in a row.
+    """
+    rng = random.Random(seed)
+    sentences = []
+    for _ in range(count):
+        words = []
+        for _ in range(rng.randint(5, 12)):
+            words += [rng.choice(CONNECTORS), rng.choice(WORDS)]
+        sentence = f"{rng.choice(FILLERS)} {' '.join(words)}."
+        sentences.append(sentence)
+        if rng.random() < 0.05:
+            sentences.append(sentence)
+    return sentences
+
+
+def build_transcript(
+    sentences: list[str], hours: float, words_per_minute: int, seed: int = 0
+) -> str:
+    rng = random.Random(seed)
+    words_needed = hours * 60 * words_per_minute
+    parts, words = [], 0
+    while words < words_needed:
+        sentence = rng.choice(sentences)
+        parts.append(sentence)
+        words += len(sentence.split())
+    return " ".join(parts)
+
+
+def time_steps(transcript: str) -> dict[str, float]:
+    """
+    Time each step of the compression on its own.
+    """
+    timings = {}
+
+    start = time.perf_counter()
+    cleaned, _ = remove_disfluencies(transcript)
+    sentences = split_sentences(cleaned)
+    timings["clean"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matrix = tfidf_matrix(sentences, settings.TRANSCRIPT_COMPRESSION_MAX_FEATURES)
+    timings["tfidf"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    duplicate = find_duplicates(
+        matrix, settings.TRANSCRIPT_COMPRESSION_DUPLICATE_SIMILARITY
+    )
+    timings["dedupe"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    textrank(matrix[~duplicate])
+    timings["rank"] = time.perf_counter() - start
+
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "corpus",
+        nargs="?",
+        default=str(Path(settings.UPLOAD_DIR) / "cache" / "*" / "transcript.txt"),
+        help="glob of transcript files",
+    )
+    parser.add_argument("--hours", type=float, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--words-per-minute", type=int, default=150)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sentences = [
+        sentence
+        for path in sorted(glob.glob(args.corpus))
+        for sentence in split_sentences(Path(path).read_text())
+    ]
+    if not sentences:
+        print("No transcripts found, using a generated lecture")
+        sentences = generated_sentences(20000)
+
+    target_tokens = (
+        settings.TRANSCRIPT_COMPRESSION_TARGET_TOKENS
+        or settings.ANALYSIS_SINGLE_CALL_MAX_TOKENS
+    )
+    print(f"{len(sentences)} source sentences, target {target_tokens} tokens")
+    print(
+        f"{'hours':>6}{'tokens':>9}{'kept':>8}{'ratio':>7}"
+        f"{'clean s':>9}{'tfidf s':>9}{'dedupe s':>10}{'rank s':>8}"
+        f"{'total s':>9}{'tokens/s':>11}"
+    )
+
+    for hours in args.hours:
+        transcript = build_transcript(sentences, hours, args.words_per_minute)
+
+        totals = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = compress_transcript(
+                transcript,
+                target_tokens,
+                settings.ANALYSIS_CHARS_PER_TOKEN,
+                settings.TRANSCRIPT_COMPRESSION_MIN_KEEP_RATIO,
+                settings.TRANSCRIPT_COMPRESSION_DUPLICATE_SIMILARITY,
+                settings.TRANSCRIPT_COMPRESSION_MAX_FEATURES,
+            )
+            totals.append(time.perf_counter() - start)
+        steps = time_steps(transcript)
+
+        total = statistics.median(totals)
+        original = result["original_tokens"]
+        compressed = result["compressed_tokens"]
+        print(
+            f"{hours:>6g}{original:>9}{compressed:>8}{compressed / original:>7.2f}"
+            f"{steps['clean']:>9.2f}{steps['tfidf']:>9.2f}"
+            f"{steps['dedupe']:>10.2f}{steps['rank']:>8.2f}"
+            f"{total:>9.2f}{(original - compressed) / total:>11.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
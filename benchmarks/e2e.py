@@ -0,0 +1,341 @@
+"""
+Offline end-to-end benchmark of the conversion endpoint.
+
+Sends concurrent POST /convert requests through the real app, job queue
+and pipeline. OpenAI is replaced by the local stub server, and YouTube by
+generated WAV fixtures that yt-dlp reads through file:// URLs, so no
+network access or API key is needed. For each video duration and
+concurrency level, reports throughput, p50/p95/p99 latency of the whole
+request and of each stage, and peak RSS of this process and its pool
+workers. Results are written as JSON so runs can be compared.
+
+PDF rendering still needs WeasyPrint and its system libraries. Fixtures
+over WHISPER_CHUNK_MAX_SECONDS are split with ffmpeg before transcription.
+
+Usage:
+    python -m benchmarks.e2e --durations 60 300 --concurrency 1 4 8 \\
+        --requests 8 --latency 0.5 --output bench.json
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import wave
+import array
+import asyncio
+import argparse
+import platform
+import resource
+import tempfile
+from typing import Any
+from pathlib import Path
+
+from benchmarks.stub_openai import StubServer
+
+SAMPLE_RATE = 16000
+
+
+def write_fixture(path: Path, duration: int) -> None:
+    """
+    Write a mono 16 kHz WAV of a tone interrupted by a short silence every 10 seconds.
+    """
+    tone = array.array(
+        "h",
+        (
+            int(8000 * math.sin(2 * math.pi * 220 * i / SAMPLE_RATE))
+            for i in range(SAMPLE_RATE)
+        ),
+    ).tobytes()
+    silence = bytes(len(tone))
+    ten_seconds = tone * 9 + silence
+
+    with wave.open(str(path), "wb") as fixture:
+        fixture.setnchannels(1)
+        fixture.setsampwidth(2)
+        fixture.setframerate(SAMPLE_RATE)
+        fixture.writeframes(ten_seconds * (duration // 10) + tone * (duration % 10))
+
+
+def install_fixtures(fixtures: dict[str, tuple[Path, int]]) -> None:
+    """
+    Make yt-dlp read fixture files for the benchmark's YouTube video ids.
+    """
+    from services.youtube import youtube_service
+
+    build_ydl_opts = youtube_service._build_ydl_opts
+    extract_raw_info = youtube_service._extract_raw_info
+
+    def build_local_ydl_opts(profile: str) -> dict[str, Any]:
+        return {**build_ydl_opts(profile), "enable_file_urls": True}
+
+    def extract_local_raw_info(url: str) -> dict[str, Any]:
+        video_id = youtube_service.extract_video_id(url)
+        path, duration = fixtures[video_id]
+
+        info = extract_raw_info(path.as_uri())
+        info.update(
+            {
+                "id": video_id,
+                "title": f"Benchmark {duration}s",
+                "description": "Local benchmark fixture.",
+                "uploader": "benchmark",
+                "duration": duration,
+                "webpage_url": url,
+            }
+        )
+        # register under the YouTube id, as the real extraction would
+        with youtube_service._raw_infos_lock:
+            youtube_service._raw_infos[video_id] = (time.monotonic(), info)
+        return info
+
+    youtube_service._build_ydl_opts = build_local_ydl_opts
+    youtube_service._extract_raw_info = extract_local_raw_info
+
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    """
+    Nearest-rank p50/p95/p99 of a list of values.
+    """
+    if not values:
+        return {}
+
+    ordered = sorted(values)
+
+    def rank(p: float) -> float:
+        return round(ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)], 3)
+
+    return {"p50": rank(50), "p95": rank(95), "p99": rank(99)}
+
+
+def worker_pids() -> dict[str, list[int]]:
+    """
+    PIDs of the live workers of the CPU process pool and the render pool.
+    """
+    from core.executors import executors
+    from services.render_pool import render_pool
+
+    # neither pool exposes its processes, so read them from the pool internals
+    try:
+        cpu = list(getattr(executors.cpu.executor, "_processes", None) or {})
+    except RuntimeError:
+        # the pool's management thread changed the dict mid-copy
+        cpu = []
+    with render_pool._lock:
+        render = [worker.process.pid for worker in render_pool._workers]
+    return {"cpu_pool": cpu, "render_pool": render}
+
+
+def vm_hwm_mb(pid: int) -> float | None:
+    """
+    Peak resident set size of a live process from /proc, None once it is gone or off Linux.
+    """
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class WorkerRSSSampler:
+    """Peak RSS of each pool's workers, sampled while they are alive."""
+
+    def __init__(self, interval: float = 0.25):
+        self.interval = interval
+        self.peaks = {"cpu_pool": 0.0, "render_pool": 0.0}
+
+    def sample(self) -> None:
+        for pool, pids in worker_pids().items():
+            for pid in pids:
+                rss_mb = vm_hwm_mb(pid)
+                if rss_mb is not None:
+                    self.peaks[pool] = max(self.peaks[pool], rss_mb)
+
+    async def run(self) -> None:
+        # workers recycled mid-run are caught before they exit
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval)
+
+
+def peak_rss_mb(sampler: WorkerRSSSampler) -> dict[str, float]:
+    """
+    Peak resident set size so far of this process, of each pool's workers and of reaped children.
+
+    RUSAGE_CHILDREN only covers children that have exited and been waited
+    for, such as ffmpeg runs and recycled workers, so the long-lived pool
+    workers are read from /proc while alive.
+    """
+    sampler.sample()
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+        **{pool: round(peak, 1) for pool, peak in sampler.peaks.items()},
+        "reaped_children": round(
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1
+        ),
+    }
+
+
+async def run_level(
+    client: Any, video_ids: list[str], concurrency: int, sampler: WorkerRSSSampler
+) -> dict[str, Any]:
+    """
+    Convert every video, at most concurrency requests in flight.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    stages: dict[str, list[float]] = {}
+    failures: list[str] = []
+
+    async def convert(video_id: str) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post(
+                "/api/v1/convert/convert",
+                json={"url": f"https://www.youtube.com/watch?v={video_id}"},
+            )
+            elapsed = time.perf_counter() - start
+
+        body = response.json()
+        if response.status_code != 200 or not body.get("success"):
+            failures.append(body.get("detail") or body["data"]["message"])
+            return
+
+        latencies.append(elapsed)
+        for stage, timing in (body["data"].get("stage_timings") or {}).items():
+            stages.setdefault(stage, []).append(timing["duration"])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(convert(video_id) for video_id in video_ids))
+    wall = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(video_ids),
+        "completed": len(latencies),
+        "failures": failures,
+        "wall_s": round(wall, 3),
+        "throughput_per_min": round(len(latencies) * 60 / wall, 2),
+        "latency_s": percentiles(latencies),
+        "stage_latency_s": {
+            stage: percentiles(values) for stage, values in stages.items()
+        },
+        "peak_rss_mb": peak_rss_mb(sampler),
+    }
+
+
+async def run_benchmark(args: argparse.Namespace, fixture_dir: Path) -> list[dict]:
+    import httpx
+
+    from main import app
+    from services.jobs import job_service
+    from services.llm import llm_service
+
+    # unique ids per request, so no result is cached or coalesced
+    fixtures: dict[str, tuple[Path, int]] = {}
+    plan: list[tuple[int, int, list[str]]] = []
+    for duration in args.durations:
+        path = fixture_dir / f"fixture_{duration}s.wav"
+        write_fixture(path, duration)
+
+        for concurrency in args.concurrency:
+            video_ids = [
+                f"b{duration:05d}{concurrency:02d}{i:03d}"[:11]
+                for i in range(args.requests)
+            ]
+            fixtures.update({video_id: (path, duration) for video_id in video_ids})
+            plan.append((duration, concurrency, video_ids))
+
+    install_fixtures(fixtures)
+    await job_service.start()
+
+    results = []
+    sampler = WorkerRSSSampler()
+    sampling = asyncio.create_task(sampler.run())
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://benchmark", timeout=None
+    ) as client:
+        for duration, concurrency, video_ids in plan:
+            result = {
+                "duration_s": duration,
+                **await run_level(client, video_ids, concurrency, sampler),
+            }
+            results.append(result)
+
+            print(
+                f"duration {duration:>5}s  concurrency {concurrency:>3}  "
+                f"{result['throughput_per_min']:>7.2f}/min  "
+                f"p50 {result['latency_s'].get('p50', float('nan')):>7.2f}s  "
+                f"p95 {result['latency_s'].get('p95', float('nan')):>7.2f}s  "
+                f"failed {len(result['failures'])}"
+            )
+
+    sampling.cancel()
+    await job_service.stop()
+    await llm_service.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--durations", type=int, nargs="+", default=[60, 300])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--requests", type=int, default=8, help="per level")
+    parser.add_argument("--latency", type=float, default=0.5, help="stub seconds")
+    parser.add_argument("--renderer", choices=["template", "llm"], default="template")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", type=Path, default=Path("bench_e2e.json"))
+    args = parser.parse_args()
+
+    with (
+        tempfile.TemporaryDirectory() as tmp,
+        StubServer(latency=args.latency, port=args.port) as server,
+    ):
+        tmp_dir = Path(tmp)
+        fixture_dir = tmp_dir / "fixtures"
+        fixture_dir.mkdir()
+
+        # settings are read at import, so configure them before the app loads
+        os.environ.update(
+            {
+                "OPENAI_API_KEY": "stub",
+                "OPENAI_BASE_URL": server.base_url,
+                "UPLOAD_DIR": str(tmp_dir / "uploads"),
+                "CACHE_ENABLED": "false",
+                "AUDIO_PROFILE": "speech",
+                "HTML_RENDERER": args.renderer,
+                "MAX_CONCURRENT_JOBS": str(max(args.concurrency)),
+                "JOB_QUEUE_MAX_SIZE": str(max(args.requests, 1) * 2),
+            }
+        )
+        Path(os.environ["UPLOAD_DIR"]).mkdir()
+
+        results = asyncio.run(run_benchmark(args, fixture_dir))
+
+    report = {
+        "created_at": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {
+            "durations": args.durations,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "stub_latency_s": args.latency,
+            "renderer": args.renderer,
+        },
+        "results": results,
+    }
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
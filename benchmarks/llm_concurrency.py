@@ -0,0 +1,78 @@
+"""
+Concurrency benchmark for LLMService against the local OpenAI stub.
+
+Runs N analyze_content calls at once on a single event loop, first through
+the async client used by LLMService and then through a synchronous OpenAI
+client (the previous behaviour), and reports the wall time of each.
+
+Usage:
+    python -m benchmarks.llm_concurrency --requests 10 --latency 0.5
+"""
+
+import os
+import time
+import asyncio
+import argparse
+
+from benchmarks.stub_openai import StubServer
+
+
+async def run_async(n: int) -> float:
+    from services.llm import llm_service
+
+    video_info = {"title": "Benchmark", "duration": 60, "description": ""}
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            llm_service.analyze_content("benchmark transcript", video_info)
+            for _ in range(n)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    await llm_service.close()
+    return elapsed
+
+
+async def run_sync(n: int, base_url: str) -> float:
+    from openai import OpenAI
+
+    client = OpenAI(api_key="stub", base_url=base_url)
+
+    async def call():
+        # mirrors the old LLMService: a blocking call inside a coroutine
+        client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "benchmark transcript"}],
+            response_format={"type": "json_object"},
+        )
+
+    start = time.perf_counter()
+    await asyncio.gather(*(call() for _ in range(n)))
+    elapsed = time.perf_counter() - start
+    client.close()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    with StubServer(latency=args.latency, port=args.port) as server:
+        os.environ.setdefault("OPENAI_API_KEY", "stub")
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+
+        sync_time = asyncio.run(run_sync(args.requests, server.base_url))
+        async_time = asyncio.run(run_async(args.requests))
+
+    print(f"requests:     {args.requests}")
+    print(f"stub latency: {args.latency:.2f}s")
+    print(f"sync client:  {sync_time:.2f}s")
+    print(f"async client: {async_time:.2f}s")
+    print(f"speedup:      {sync_time / async_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
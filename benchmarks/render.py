@@ -0,0 +1,260 @@
+"""
+Benchmark of WeasyPrint render time for generated HTML, before and after normalization.
+
+Renders every video of a corpus twice per repeat:
+
+- "legacy": the model's HTML under the pre-normalization PDF prompt, which
+  asks for <style> blocks, with the house CSS inlined and a fresh
+  FontConfiguration per render, as renders used to run.
+- "normalized": the model's HTML under the current PDF prompt, passed
+  through normalize_html and rendered with the pre-parsed house stylesheet
+  and a warm FontConfiguration, as the render pool workers do.
+
+Reports mean, p50 and p95 render time and the PDF size of both. With
+--normalize-only, WeasyPrint is not needed and only the normalization
+time and the HTML size before and after are reported, over the legacy
+HTML, where the model CSS is. With --sizes, the normalized HTML is
+rendered under each PDF_OPTIMIZATION mode and the PDF sizes are compared.
+
+The corpus must be model output: the cached content.html files hold
+whatever the configured renderer produced, the template by default. Build
+one with --build, which sends every cached analysis through both PDF
+prompts of the configured GPT_MODEL and writes the replies to
+benchmarks/corpus/legacy and benchmarks/corpus/current. It needs a real
+OPENAI_API_KEY and fails rather than falling back to the template.
+
+Usage:
+    python -m benchmarks.render --build "uploads/cache/*/analysis.json"
+    python -m benchmarks.render --repeat 3
+    python -m benchmarks.render --normalize-only
+    python -m benchmarks.render --sizes
+"""
+
+import os
+import json
+import glob
+import math
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+
+from core.config import settings  # noqa: E402
+from constants.pdf import PDF_CSS, PDF_STYLESHEET  # noqa: E402
+from utils.html_normalizer import normalize_html  # noqa: E402
+
+CORPUS_DIR = Path(__file__).parent / "corpus"
+
+
+def percentile(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+
+async def build_corpus(analyses: list[Path], corpus_dir: Path) -> None:
+    """
+    Generate the PDF HTML of each cached analysis under both PDF prompts, one file per video.
+    """
+    from constants.llm import PDF_SYSTEM_PROMPT
+    from services.cache import ResultCache
+    from services.llm import llm_service
+    from benchmarks.legacy_prompts import LEGACY_PDF_SYSTEM_PROMPT
+
+    prompts = {"legacy": LEGACY_PDF_SYSTEM_PROMPT, "current": PDF_SYSTEM_PROMPT}
+    for variant in prompts:
+        (corpus_dir / variant).mkdir(parents=True, exist_ok=True)
+
+    try:
+        for path in analyses:
+            video_info = json.loads(
+                (path.parent / ResultCache.METADATA_FILE).read_text()
+            )
+            analysis = json.loads(path.read_text())
+            user_prompt = llm_service.build_pdf_prompt(analysis, video_info)
+
+            for variant, system_prompt in prompts.items():
+                # generate_pdf_content falls back to the template on errors,
+                # so call the model directly to let them surface
+                response = await llm_service._create_chat_completion(
+                    system_prompt, user_prompt
+                )
+                html = llm_service._clean_markdown_code_blocks(
+                    response.choices[0].message.content
+                )
+
+                output_path = corpus_dir / variant / f"{video_info['id']}.html"
+                output_path.write_text(html)
+                print(f"Wrote {output_path} ({len(html)} characters)")
+    finally:
+        await llm_service.close()
+
+
+def load_corpus(corpus_dir: Path) -> tuple[list[str], list[str]]:
+    """
+    Load the legacy and current HTML of every video the corpus has both of.
+    """
+    legacy_dir, current_dir = corpus_dir / "legacy", corpus_dir / "current"
+    names = sorted(
+        {path.name for path in legacy_dir.glob("*.html")}
+        & {path.name for path in current_dir.glob("*.html")}
+    )
+    return (
+        [(legacy_dir / name).read_text() for name in names],
+        [(current_dir / name).read_text() for name in names],
+    )
+
+
+def benchmark_normalize(documents: list[str], repeat: int) -> None:
+    """
+    Time normalize_html alone and compare HTML sizes before and after.
+    """
+    times = []
+    for _ in range(repeat):
+        for html in documents:
+            start = time.perf_counter()
+            normalize_html(html)
+            times.append(time.perf_counter() - start)
+
+    before = sum(len(html) for html in documents)
+    after = sum(len(normalize_html(html)) for html in documents)
+    print(f"{len(documents)} documents, {repeat} repeats")
+    print(
+        f"normalize mean {statistics.mean(times) * 1000:.2f} ms  "
+        f"p95 {percentile(times, 95) * 1000:.2f} ms  "
+        f"HTML {before / len(documents) / 1024:.1f} KB -> "
+        f"{after / len(documents) / 1024:.1f} KB"
+    )
+
+
+def benchmark_sizes(documents: list[str]) -> None:
+    """
+    Compare PDF sizes of the normalized HTML under each optimization mode.
+    """
+    from weasyprint import HTML, CSS
+    from weasyprint.text.fonts import FontConfiguration
+
+    from services.render_pool import pdf_options
+
+    font_config = FontConfiguration()
+    stylesheet = CSS(string=PDF_STYLESHEET, font_config=font_config)
+
+    sizes: dict[str, list[int]] = {"none": [], "size": []}
+    for html in documents:
+        normalized = normalize_html(html)
+        for mode in sizes:
+            pdf = HTML(string=normalized).write_pdf(
+                stylesheets=[stylesheet],
+                font_config=font_config,
+                presentational_hints=True,
+                **pdf_options(mode),
+            )
+            sizes[mode].append(len(pdf))
+
+    print(f"{len(documents)} documents")
+    print(f"{'mode':<8}{'avg KB':>10}{'max KB':>10}")
+    for mode, values in sizes.items():
+        print(
+            f"{mode:<8}{statistics.mean(values) / 1024:>10.1f}"
+            f"{max(values) / 1024:>10.1f}"
+        )
+    print(f"size / none {sum(sizes['size']) / sum(sizes['none']):.2f}")
+
+
+def benchmark_render(legacy: list[str], current: list[str], repeat: int) -> None:
+    from weasyprint import HTML, CSS
+    from weasyprint.text.fonts import FontConfiguration
+
+    font_config = FontConfiguration()
+    stylesheet = CSS(string=PDF_STYLESHEET, font_config=font_config)
+
+    def render_legacy(html: str, output_path: Path) -> None:
+        HTML(string=f"{PDF_CSS}{html}").write_pdf(
+            str(output_path),
+            font_config=FontConfiguration(),
+            presentational_hints=True,
+        )
+
+    def render_normalized(html: str, output_path: Path) -> None:
+        HTML(string=normalize_html(html)).write_pdf(
+            str(output_path),
+            stylesheets=[stylesheet],
+            font_config=font_config,
+            presentational_hints=True,
+        )
+
+    variants = {"legacy": render_legacy, "normalized": render_normalized}
+    times: dict[str, list[float]] = {name: [] for name in variants}
+    sizes: dict[str, list[int]] = {name: [] for name in variants}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = Path(tmp) / "output.pdf"
+        for _ in range(repeat):
+            for documents in zip(legacy, current):
+                for (name, render), html in zip(variants.items(), documents):
+                    start = time.perf_counter()
+                    render(html, output_path)
+                    times[name].append(time.perf_counter() - start)
+                    sizes[name].append(output_path.stat().st_size)
+
+    print(f"{len(legacy)} videos, {repeat} repeats")
+    print(f"{'variant':<14}{'mean s':>9}{'p50 s':>9}{'p95 s':>9}{'avg KB':>10}")
+    for name in variants:
+        print(
+            f"{name:<14}{statistics.mean(times[name]):>9.3f}"
+            f"{percentile(times[name], 50):>9.3f}{percentile(times[name], 95):>9.3f}"
+            f"{statistics.mean(sizes[name]) / 1024:>10.1f}"
+        )
+
+    speedup = statistics.mean(times["legacy"]) / statistics.mean(times["normalized"])
+    print(f"speedup {speedup:.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "corpus",
+        nargs="?",
+        type=Path,
+        default=CORPUS_DIR,
+        help="directory with legacy/ and current/ model HTML per video",
+    )
+    parser.add_argument(
+        "--build",
+        metavar="ANALYSES",
+        nargs="?",
+        const=str(Path(settings.UPLOAD_DIR) / "cache" / "*" / "analysis.json"),
+        help="generate the corpus from a glob of cached analysis.json files",
+    )
+    parser.add_argument("--normalize-only", action="store_true")
+    parser.add_argument("--sizes", action="store_true")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.build:
+        analyses = sorted(Path(path) for path in glob.glob(args.build))
+        if not analyses:
+            parser.error(f"No cached analyses match {args.build}")
+        asyncio.run(build_corpus(analyses, args.corpus))
+        return
+
+    legacy, current = load_corpus(args.corpus)
+    if not legacy:
+        parser.error(
+            f"No videos in {args.corpus}/legacy and {args.corpus}/current, "
+            "build a corpus with --build first"
+        )
+
+    if args.normalize_only:
+        benchmark_normalize(legacy, args.repeat)
+    elif args.sizes:
+        benchmark_sizes(current)
+    else:
+        benchmark_render(legacy, current, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
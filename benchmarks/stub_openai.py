@@ -0,0 +1,109 @@
+"""
+Local OpenAI-compatible stub server for offline benchmarks.
+
+Serves the chat completion and audio transcription endpoints used by
+LLMService with a fixed artificial latency, so client-side concurrency can
+be measured without network access or an API key.
+"""
+
+import json
+import time
+import asyncio
+import threading
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+
+STUB_ANALYSIS = {
+    "executive_summary": "Stub summary of the video content.",
+    "key_concepts": ["Concept one", "Concept two"],
+    "actionable_insights": ["Do the first thing", "Do the second thing"],
+    "important_quotes": ["A memorable quote"],
+    "resources_mentioned": ["A useful resource"],
+    "step_by_step_guides": ["Step one, then step two"],
+    "main_takeaways": ["Takeaway one", "Takeaway two"],
+    "detailed_summary": "A detailed stub summary of the video content.",
+}
+
+STUB_TRANSCRIPT = (
+    "This is a stub transcript produced by the local benchmark server. " * 20
+).strip()
+
+
+def create_app(latency: float = 0.5) -> FastAPI:
+    """
+    Create the stub app, sleeping `latency` seconds per request.
+    """
+    app = FastAPI()
+    app.state.latency = latency
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        await asyncio.sleep(app.state.latency)
+
+        if body.get("response_format", {}).get("type") == "json_object":
+            content = json.dumps(STUB_ANALYSIS)
+        else:
+            content = "<div class='section'><h2>Stub</h2><p>Stub content.</p></div>"
+
+        prompt_tokens = sum(len(m["content"]) // 4 for m in body["messages"])
+        completion_tokens = len(content) // 4
+        return {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body["model"],
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    @app.post("/v1/audio/transcriptions", response_class=PlainTextResponse)
+    async def audio_transcriptions(request: Request):
+        await request.body()
+        await asyncio.sleep(app.state.latency)
+        return STUB_TRANSCRIPT
+
+    return app
+
+
+class StubServer:
+    """Run the stub app with uvicorn on a background thread."""
+
+    def __init__(self, latency: float = 0.5, host: str = "127.0.0.1", port: int = 8765):
+        self.host = host
+        self.port = port
+        config = uvicorn.Config(
+            create_app(latency), host=host, port=port, log_level="warning"
+        )
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    def __enter__(self) -> "StubServer":
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.should_exit = True
+        self.thread.join()
+
+
+if __name__ == "__main__":
+    uvicorn.run(create_app(), host="127.0.0.1", port=8765)
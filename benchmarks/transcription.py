@@ -0,0 +1,108 @@
+"""
+Benchmark of the transcription backends on local audio files.
+
+Transcribes every file with each backend, first one file at a time to
+measure the real-time factor (processing seconds per second of audio),
+then all files at once, up to --concurrency at a time, to measure
+throughput in audio hours per hour of wall time.
+
+The "openai" backend calls the API configured in the environment or .env,
+so it needs a real key to be meaningful. The "local" backend needs the
+"local" extra (faster-whisper) and reads its LOCAL_WHISPER_* settings,
+which can be set as environment variables.
+
+Usage:
+    python -m benchmarks.transcription audio/*.mp3 --backends local openai \\
+        --concurrency 4
+"""
+
+import os
+import time
+import asyncio
+import argparse
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+
+from pydub import AudioSegment  # noqa: E402
+
+from core.config import settings  # noqa: E402
+from services.transcription import (  # noqa: E402
+    LocalWhisperBackend,
+    OpenAIWhisperBackend,
+    TranscriptionBackend,
+)
+
+
+def create_backend(name: str) -> TranscriptionBackend:
+    if name == "local":
+        return LocalWhisperBackend()
+
+    from services.llm import llm_service
+
+    return OpenAIWhisperBackend(llm_service.client)
+
+
+async def run_backend(
+    backend: TranscriptionBackend, files: list[Path], concurrency: int
+) -> dict:
+    if isinstance(backend, LocalWhisperBackend):
+        # keep model loading out of the timings
+        await asyncio.get_running_loop().run_in_executor(None, backend.load)
+
+    # sequential: real-time factor per file
+    processing = 0.0
+    for path in files:
+        start = time.perf_counter()
+        await backend.transcribe(str(path))
+        processing += time.perf_counter() - start
+
+    # concurrent: throughput
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def transcribe(path: Path) -> None:
+        async with semaphore:
+            await backend.transcribe(str(path))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(transcribe(path) for path in files))
+    wall = time.perf_counter() - start
+
+    await backend.close()
+    return {"processing_s": processing, "wall_s": wall}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("files", type=Path, nargs="+", help="audio files")
+    parser.add_argument(
+        "--backends", nargs="+", choices=["openai", "local"], default=["local"]
+    )
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    audio_seconds = sum(
+        AudioSegment.from_file(path).duration_seconds for path in args.files
+    )
+    print(f"{len(args.files)} files, {audio_seconds / 60:.1f} min of audio")
+    if "local" in args.backends:
+        print(
+            f"local: {settings.LOCAL_WHISPER_MODEL} {settings.LOCAL_WHISPER_COMPUTE_TYPE}, "
+            f"{settings.LOCAL_WHISPER_WORKERS} x {settings.LOCAL_WHISPER_CPU_THREADS} "
+            f"threads, batch {settings.LOCAL_WHISPER_BATCH_SIZE}, "
+            f"{os.cpu_count()} CPUs"
+        )
+
+    print(f"{'backend':<10}{'RTF':>8}{'wall s':>10}{'audio h/h':>12}")
+    for name in args.backends:
+        result = asyncio.run(
+            run_backend(create_backend(name), args.files, args.concurrency)
+        )
+        print(
+            f"{name:<10}{result['processing_s'] / audio_seconds:>8.3f}"
+            f"{result['wall_s']:>10.1f}{audio_seconds / result['wall_s']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -49,6 +49,94 @@ Please ensure the JSON structure is as follows:
 """
 
 
+CHUNK_ANALYSIS_USER_PROMPT = """
+Please analyze one section of a longer video transcript and provide structured insights in JSON format as specified. Only include insights supported by this section.
+
+Video Information:
+- Title: {title}
+- Duration: {duration} seconds
+- Uploader: {uploader}
+
+Section {index} of {total}: {section_title} ({start_time} - {end_time})
+
+Transcript Section:
+{transcript}
+
+Please ensure the JSON structure is as follows:
+
+{{
+  "executive_summary": "Provide a brief overview of this section in 1-2 sentences.",
+  "key_concepts": [
+    "List of key concepts"
+  ],
+  "actionable_insights": [
+    "List specific and practical steps the viewer can take based on this section."
+  ],
+  "important_quotes": [
+    "Include memorable or impactful quotes directly from this section."
+  ],
+  "resources_mentioned": [
+    "List any tools, books, websites, or other resources referenced."
+  ],
+  "step_by_step_guides": [
+    "List of step-by-step guides if any"
+  ],
+  "main_takeaways": [
+    "Summarize the most important points of this section."
+  ],
+  "detailed_summary": "Provide a detailed summary of this section."
+}}
+"""
+
+
+REDUCE_ANALYSIS_SYSTEM_PROMPT = """You are an expert content analyst. You are given structured analyses of consecutive sections of one video, in order. Merge them into a single structured analysis of the whole video.
+
+Focus on:
+1. Removing duplicates and merging overlapping points
+2. Keeping the most important and actionable items
+3. Preserving the order in which topics appear in the video
+4. Writing the summaries for the video as a whole, not per section
+"""
+
+
+REDUCE_ANALYSIS_USER_PROMPT = """
+Please merge the section analyses below into one analysis of the whole video in JSON format as specified.
+
+Video Information:
+- Title: {title}
+- Duration: {duration} seconds
+- Uploader: {uploader}
+- Description: {description}...
+
+Section Analyses:
+{partial_analyses}
+
+Please ensure the JSON structure is as follows:
+
+{{
+  "executive_summary": "Provide a brief overview of the video in 2-3 sentences.",
+  "key_concepts": [
+    "List of key concepts"
+  ],
+  "actionable_insights": [
+    "List specific and practical steps the viewer can take based on the content."
+  ],
+  "important_quotes": [
+    "Include memorable or impactful quotes directly from the content."
+  ],
+  "resources_mentioned": [
+    "List any tools, books, websites, or other resources referenced."
+  ],
+  "step_by_step_guides": [
+    "List of step-by-step guides if any"
+  ],
+  "main_takeaways": [
+    "Summarize the most important points for quick recall."
+  ],
+  "detailed_summary": "Provide a detailed summary of the video content."
+}}
+"""
+
 PDF_SYSTEM_PROMPT = """You are an expert document designer specializing in creating well-formatted, professional PDF content from analyzed video data.
 
 Create comprehensive HTML content that will be converted to PDF. The content should be:
@@ -69,11 +157,13 @@ If video chapters are provided, include them in a dedicated section using this s
     </ol>
 </div>
 
-Include CSS styles using <style> tags for:
-- Typography and fonts
-- Colors and spacing
-- Layout and structure
-- Professional appearance
+Do not include CSS: no <style> tags, style attributes, scripts or images. The document is styled by a fixed stylesheet, so use only these elements and classes:
+- <div class="document-header"> with <h1 class="document-title"> and <p class="document-meta"> for the title block
+- <div class="executive-summary"> with an <h2> heading for the summary
+- <div class="section"> with an <h1> heading for every other section
+- <div class="key-points">, <div class="step-guide"> and <div class="resources"> around lists of takeaways, steps and resources
+- <div class="quote"> for each quotation
+- Headings, paragraphs, lists, tables, <strong> and <em> for everything else
 
 The document should flow well and be suitable for both digital reading and printing."""
 
@@ -233,3 +233,6 @@ PDF_CSS = """
     }
 </style>
 """
+
+# PDF_CSS without the <style> wrapper, for parsing as a standalone stylesheet
+PDF_STYLESHEET = PDF_CSS.strip().removeprefix("<style>").removesuffix("</style>")
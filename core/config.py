@@ -15,16 +15,129 @@ class Settings(BaseSettings):
 
     # OpenAI Config
     OPENAI_API_KEY: str
+    OPENAI_BASE_URL: str | None = None
+    OPENAI_TIMEOUT: float = 600.0  # seconds
+    OPENAI_MAX_CONNECTIONS: int = 50
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+
+    # OpenAI Rate Limit Config
+    OPENAI_CHAT_RPM: int = 500
+    OPENAI_CHAT_TPM: int = 200_000
+    OPENAI_WHISPER_RPM: int = 50
+    OPENAI_OUTPUT_TOKENS_ESTIMATE: int = 2000  # per chat call, settled on usage
+    OPENAI_MAX_RETRIES: int = 5
+    OPENAI_RETRY_BASE_DELAY: float = 1.0  # seconds
+    OPENAI_RETRY_MAX_DELAY: float = 60.0  # seconds
 
     # File Storage Config
     UPLOAD_DIR: str = "uploads"
     MAX_FILE_SIZE: int = 100 * 1024 * 1024  # 100MB
     ALLOWED_AUDIO_FORMATS: list[str] = ["mp3", "wav", "m4a", "webm"]
 
+    # Audio Profile Config
+    AUDIO_PROFILE: Literal["mp3", "speech"] = "speech"
+    SPEECH_AUDIO_FORMAT: str = "wa[acodec^=opus]/wa[ext=m4a]/wa/ba"
+    SPEECH_SAMPLE_RATE: int = 16000
+    SPEECH_BITRATE_KBPS: int = 32
+
+    # Result Cache Config
+    CACHE_ENABLED: bool = True
+    CACHE_MAX_BYTES: int = 2 * 1024 * 1024 * 1024  # 2GB
+
+    # Storage Lifecycle Config
+    PDF_TTL_SECONDS: int = 7 * 24 * 3600  # 7 days
+    AUDIO_TTL_SECONDS: int = 3 * 3600  # audio left behind by failed jobs
+    STORAGE_MAX_BYTES: int = 5 * 1024 * 1024 * 1024  # 5GB of audio and PDFs
+    STORAGE_SWEEP_INTERVAL_SECONDS: float = 300.0
+    STORAGE_SWEEP_BATCH_SIZE: int = 500  # files handled per executor call
+
+    # Transcript Source Config
+    TRANSCRIPT_SOURCE: Literal["captions", "prefer_captions", "whisper"] = (
+        "prefer_captions"
+    )
+    CAPTION_LANGUAGES: list[str] = ["en"]  # in order of preference
+    CAPTION_ALLOW_AUTOMATIC: bool = True
+    CAPTION_MIN_COVERAGE: float = 0.5  # fraction of the video with captions shown
+
     # Processing Config
     MAX_VIDEO_DURATION: int = 7200  # 2 hours in seconds
     WHISPER_MODEL: str = "whisper-1"
     GPT_MODEL: str = "gpt-4o-mini"
+    HTML_RENDERER: Literal["llm", "template"] = "template"
+
+    # Pipeline Config
+    PIPELINE_MODE: Literal["sequential", "streaming"] = "sequential"
+    STREAMING_SEGMENT_SECONDS: int = 300
+
+    # Transcription Backend Config
+    TRANSCRIPTION_BACKEND: Literal["openai", "local"] = "openai"
+    LOCAL_WHISPER_MODEL: str = "small"  # faster-whisper model name or path
+    LOCAL_WHISPER_COMPUTE_TYPE: str = "int8"
+    LOCAL_WHISPER_CPU_THREADS: int = 4  # per worker
+    LOCAL_WHISPER_WORKERS: int = 1  # files transcribed in parallel
+    LOCAL_WHISPER_BATCH_SIZE: int = 8
+    LOCAL_WHISPER_LANGUAGE: str | None = None  # detected when unset
+    LOCAL_WHISPER_MODEL_DIR: str | None = None
+
+    # Voice Activity Detection Config
+    VAD_ENABLED: bool = False  # needs the "vad" extra
+    VAD_FRAME_MS: int = 30
+    VAD_ENERGY_THRESHOLD_DB: float = 12.0  # above the noise floor
+    VAD_SPEECH_BAND_RATIO: float = 0.5  # of spectral energy in 300-3400 Hz
+    VAD_MIN_DYNAMICS_DB: float = 3.0  # loudness variation over one second
+    VAD_MIN_GAP_SECONDS: float = 1.0  # shorter non-speech is kept
+    VAD_PADDING_SECONDS: float = 0.25
+    VAD_MIN_REMOVED_SECONDS: float = 10.0  # below this the original audio is used
+
+    # Chunked Transcription Config
+    WHISPER_CHUNK_MAX_BYTES: int = 24 * 1024 * 1024  # API limit is 25MB
+    WHISPER_CHUNK_MAX_SECONDS: int = 600
+    WHISPER_CHUNK_OVERLAP_SECONDS: float = 2.0
+    WHISPER_CHUNK_BITRATE_KBPS: int = 64
+    WHISPER_MAX_PARALLEL: int = 4
+
+    # Content Analysis Config
+    ANALYSIS_CHARS_PER_TOKEN: float = 4.0
+    ANALYSIS_SINGLE_CALL_MAX_TOKENS: int = 12000
+    ANALYSIS_CHUNK_TOKENS: int = 6000
+    ANALYSIS_MAX_PARALLEL: int = 4
+
+    # Transcript Compression Config
+    TRANSCRIPT_COMPRESSION_ENABLED: bool = False  # needs the "compression" extra
+    # defaults to ANALYSIS_SINGLE_CALL_MAX_TOKENS, so most videos need one call
+    TRANSCRIPT_COMPRESSION_TARGET_TOKENS: int | None = None
+    TRANSCRIPT_COMPRESSION_MIN_KEEP_RATIO: float = 0.3  # of the cleaned transcript
+    TRANSCRIPT_COMPRESSION_DUPLICATE_SIMILARITY: float = 0.9  # TF-IDF cosine
+    TRANSCRIPT_COMPRESSION_MAX_FEATURES: int = 4096  # TF-IDF vocabulary size
+
+    # Job Config
+    MAX_CONCURRENT_JOBS: int = 2
+    JOB_QUEUE_MAX_SIZE: int = 100
+    JOB_RETENTION_SECONDS: int = 3600  # 1 hour
+    JOB_EVENT_HISTORY: int = 256  # events replayed to late subscribers
+    JOB_EVENT_HEARTBEAT_SECONDS: float = 15.0
+
+    # Batch Config
+    BATCH_MAX_ITEMS: int = 200
+    BATCH_MAX_CONCURRENCY: int = 4
+
+    # Render Pool Config
+    RENDER_POOL_SIZE: int = 2
+    RENDER_WORKER_MAX_JOBS: int = 50  # recycle a worker after this many renders
+    RENDER_WORKER_MAX_RSS_MB: int = 1024  # or once its peak RSS reaches this
+    RENDER_TIMEOUT_SECONDS: float = 120.0
+
+    # PDF Output Config
+    PDF_OPTIMIZATION: Literal["none", "size"] = "size"
+    PDF_IMAGE_DPI: int = 150  # images are downscaled to this resolution
+    PDF_JPEG_QUALITY: int = 75
+    PDF_DROP_IMAGES: bool = False
+    # also render without optimization to report the size saved, at twice the cost
+    PDF_MEASURE_ORIGINAL_SIZE: bool = False
+
+    # Executor Config
+    IO_THREAD_POOL_SIZE: int = 8
+    CPU_PROCESS_POOL_SIZE: int | None = None  # defaults to the CPU count
 
     class Config:
         env_file = ".env"
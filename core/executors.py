@@ -0,0 +1,162 @@
+import os
+import asyncio
+import logging
+import threading
+import multiprocessing
+from typing import Any, Callable
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, ProcessPoolExecutor
+
+from core.config import settings
+from core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class TrackedPool:
+    """Executor wrapper that counts queued and running tasks."""
+
+    def __init__(self, name: str, executor: Executor, max_workers: int):
+        self.name = name
+        self.executor = executor
+        self.max_workers = max_workers
+        self.submitted = 0
+        self.completed = 0
+        self._lock = threading.Lock()
+        self._publish()
+
+    @property
+    def pending(self) -> int:
+        return self.submitted - self.completed
+
+    def submit(self, func: Callable, *args: Any) -> Future:
+        """
+        Submit a task, logging a warning if every worker is busy.
+        """
+        with self._lock:
+            if self.pending >= self.max_workers:
+                logger.warning(
+                    f"{self.name} pool saturated: {self.pending} tasks for {self.max_workers} workers"
+                )
+            self.submitted += 1
+            self._publish()
+
+        future = self.executor.submit(func, *args)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: Future) -> None:
+        with self._lock:
+            self.completed += 1
+            self._publish()
+
+    def _publish(self) -> None:
+        # gauges change with the counts, so with several API workers each
+        # one's values are current whichever worker answers the scrape
+        stats = self.stats()
+        metrics.executor_tasks.labels(pool=self.name, state="running").set(
+            stats["running"]
+        )
+        metrics.executor_tasks.labels(pool=self.name, state="queued").set(
+            stats["queued"]
+        )
+        metrics.executor_saturation.labels(pool=self.name).set(stats["saturation"])
+
+    def unpublish(self) -> None:
+        """
+        Remove this pool's gauges once it is no longer reported.
+        """
+        for state in ("running", "queued"):
+            metrics.executor_tasks.remove(self.name, state)
+        metrics.executor_saturation.remove(self.name)
+
+    def stats(self) -> dict[str, Any]:
+        # process pools don't report when a task starts, so treat in-flight
+        # tasks up to the worker count as running and the rest as queued
+        pending = self.pending
+        running = min(pending, self.max_workers)
+        return {
+            "max_workers": self.max_workers,
+            "running": running,
+            "queued": pending - running,
+            "completed": self.completed,
+            "saturation": round(pending / self.max_workers, 2),
+        }
+
+
+class Executors:
+    """Thread pool for I/O-bound work and process pool for CPU-bound work."""
+
+    def __init__(self):
+        io_workers = settings.IO_THREAD_POOL_SIZE
+        cpu_workers = settings.CPU_PROCESS_POOL_SIZE or os.cpu_count() or 1
+
+        self.io = TrackedPool(
+            "io",
+            ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="io"),
+            io_workers,
+        )
+        # spawn rather than fork: the parent runs an event loop and threads
+        self.cpu = TrackedPool(
+            "cpu",
+            ProcessPoolExecutor(
+                max_workers=cpu_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            ),
+            cpu_workers,
+        )
+        self.pools: dict[str, TrackedPool] = {"io": self.io, "cpu": self.cpu}
+
+    def register(self, pool: TrackedPool) -> TrackedPool:
+        """
+        Report a pool owned elsewhere, such as a backend's own workers, with the shared pools.
+        """
+        self.pools[pool.name] = pool
+        return pool
+
+    def unregister(self, pool: TrackedPool) -> None:
+        """
+        Stop reporting a registered pool.
+        """
+        if self.pools.get(pool.name) is pool:
+            del self.pools[pool.name]
+            pool.unpublish()
+
+    def submit_io(self, func: Callable, *args: Any) -> Future:
+        """
+        Submit blocking I/O work to the thread pool.
+        """
+        return self.io.submit(func, *args)
+
+    def submit_cpu(self, func: Callable, *args: Any) -> Future:
+        """
+        Submit CPU-bound work to the process pool. Arguments must be picklable.
+        """
+        return self.cpu.submit(func, *args)
+
+    async def run_io(self, func: Callable, *args: Any) -> Any:
+        """
+        Run blocking I/O work on the thread pool without blocking the event loop.
+        """
+        return await asyncio.wrap_future(self.submit_io(func, *args))
+
+    async def run_cpu(self, func: Callable, *args: Any) -> Any:
+        """
+        Run CPU-bound work on the process pool without blocking the event loop.
+        """
+        return await asyncio.wrap_future(self.submit_cpu(func, *args))
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Get saturation statistics for every pool.
+        """
+        return {name: pool.stats() for name, pool in list(self.pools.items())}
+
+    def shutdown(self) -> None:
+        """
+        Shut down both pools, cancelling queued work.
+        """
+        self.io.executor.shutdown(wait=False, cancel_futures=True)
+        self.cpu.executor.shutdown(wait=False, cancel_futures=True)
+
+
+executors = Executors()
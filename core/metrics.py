@@ -0,0 +1,141 @@
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.gc_collector import GCCollector
+from prometheus_client.platform_collector import PlatformCollector
+from prometheus_client.process_collector import ProcessCollector
+
+STAGE_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Metrics:
+    """
+    Process-wide Prometheus metrics on a registry of their own.
+
+    With PROMETHEUS_MULTIPROC_DIR set, as when several uvicorn workers
+    serve the API, every worker writes its values there and a scrape of
+    any worker aggregates all of them.
+    """
+
+    def __init__(self):
+        self.registry = CollectorRegistry(auto_describe=True)
+        ProcessCollector(registry=self.registry)
+        PlatformCollector(registry=self.registry)
+        GCCollector(registry=self.registry)
+
+        self.stage_duration = Histogram(
+            "ytpdf_stage_duration_seconds",
+            "Time spent in each conversion stage, per span",
+            ("stage",),
+            buckets=STAGE_BUCKETS,
+            registry=self.registry,
+        )
+        self.conversions = Counter(
+            "ytpdf_conversions_total",
+            "Finished conversion jobs by status",
+            ("status",),
+            registry=self.registry,
+        )
+        self.downloaded_bytes = Counter(
+            "ytpdf_downloaded_bytes_total",
+            "Bytes of media downloaded from YouTube",
+            registry=self.registry,
+        )
+        self.audio_seconds = Counter(
+            "ytpdf_audio_seconds_total",
+            "Seconds of audio transcribed",
+            registry=self.registry,
+        )
+        self.openai_tokens = Counter(
+            "ytpdf_openai_tokens_total",
+            "Tokens reported by OpenAI responses",
+            ("type",),
+            registry=self.registry,
+        )
+        self.openai_requests = Counter(
+            "ytpdf_openai_requests_total",
+            "OpenAI API calls by API and outcome",
+            ("api", "outcome"),
+            registry=self.registry,
+        )
+        self.openai_queue_wait = Histogram(
+            "ytpdf_openai_queue_wait_seconds",
+            "Time OpenAI calls waited for rate limit admission",
+            ("api",),
+            buckets=WAIT_BUCKETS,
+            registry=self.registry,
+        )
+        self.vad_removed_seconds = Counter(
+            "ytpdf_vad_removed_seconds_total",
+            "Seconds of non-speech audio cut before transcription",
+            registry=self.registry,
+        )
+        self.compression_removed_tokens = Counter(
+            "ytpdf_compression_removed_tokens_total",
+            "Estimated transcript tokens removed before analysis",
+            registry=self.registry,
+        )
+        self.cache_lookups = Counter(
+            "ytpdf_cache_lookups_total",
+            "Result cache lookups by result",
+            ("result",),
+            registry=self.registry,
+        )
+        self.storage_reclaimed_bytes = Counter(
+            "ytpdf_storage_reclaimed_bytes_total",
+            "Bytes freed by deleting audio and PDFs, by reason",
+            ("reason",),
+            registry=self.registry,
+        )
+        # the gauges below describe one worker each, so across workers
+        # queue sizes add up and disk usage, swept by all, is the latest
+        self.storage_bytes = Gauge(
+            "ytpdf_storage_bytes",
+            "Bytes of audio and PDFs on disk at the last sweep",
+            registry=self.registry,
+            multiprocess_mode="mostrecent",
+        )
+        self.jobs = Gauge(
+            "ytpdf_jobs",
+            "Conversion jobs by state",
+            ("state",),
+            registry=self.registry,
+            multiprocess_mode="livesum",
+        )
+        self.executor_tasks = Gauge(
+            "ytpdf_executor_tasks",
+            "Executor pool tasks by pool and state",
+            ("pool", "state"),
+            registry=self.registry,
+            multiprocess_mode="livesum",
+        )
+        self.executor_saturation = Gauge(
+            "ytpdf_executor_saturation",
+            "In-flight tasks per worker of each executor pool",
+            ("pool",),
+            registry=self.registry,
+            multiprocess_mode="livemax",
+        )
+
+    def render(self) -> tuple[bytes, str]:
+        """
+        Render every metric in the Prometheus text format, returning the body and its content type.
+        """
+        if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+            return generate_latest(registry), CONTENT_TYPE_LATEST
+
+        return generate_latest(self.registry), CONTENT_TYPE_LATEST
+
+
+metrics = Metrics()
@@ -1,23 +1,45 @@
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from core.config import settings
 from core.logging import configure_logging
+from core.executors import executors
+from services.jobs import job_service
+from services.batch import batch_service
+from services.llm import llm_service
+from services.lifecycle import lifecycle_service
+from services.render_pool import render_pool
 from api import api_router as api_router_v1
+from api.metrics import metrics_router
 
 
 configure_logging()
 logger = logging.getLogger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await job_service.start()
+    await lifecycle_service.start()
+    yield
+    await lifecycle_service.stop()
+    await batch_service.stop()
+    await job_service.stop()
+    await llm_service.close()
+    render_pool.shutdown()
+    executors.shutdown()
+
+
 app = FastAPI(
     debug=settings.DEBUG,
     title=settings.PROJECT_NAME,
     docs_url=f"{settings.API_V1_STR}/docs" if settings.DEBUG else None,
     openapi_url=f"{settings.API_V1_STR}/openapi.json" if settings.DEBUG else None,
     redoc_url=None,
+    lifespan=lifespan,
 )
 
 
@@ -37,3 +59,4 @@ async def root():
 
 
 app.include_router(api_router_v1, prefix=settings.API_V1_STR)
+app.include_router(metrics_router)
@@ -1,6 +1,6 @@
 from enum import Enum
 
-from pydantic import BaseModel, HttpUrl, Field, field_validator
+from pydantic import BaseModel, HttpUrl, Field, field_validator, model_validator
 
 
 class ProcessingStatus(str, Enum):
@@ -12,6 +12,21 @@ class ProcessingStatus(str, Enum):
     FAILED = "failed"
 
 
+class TranscriptSource(str, Enum):
+    """Where a transcript came from."""
+
+    CAPTIONS = "captions"
+    AUTOMATIC_CAPTIONS = "automatic_captions"
+    WHISPER = "whisper"
+
+
+class HTMLRenderer(str, Enum):
+    """PDF content renderers."""
+
+    LLM = "llm"
+    TEMPLATE = "template"
+
+
 class Chapter(BaseModel):
     """Video chapter schema."""
 
@@ -28,6 +43,10 @@ class ConvertRequest(BaseModel):
         description="YouTube video URL to convert",
         example="https://www.youtube.com/watch?v=dQw4w9WgXcQ",
     )
+    renderer: HTMLRenderer | None = Field(
+        None,
+        description="How to build the PDF content, defaults to the HTML_RENDERER setting",
+    )
 
     @field_validator("url")
     @classmethod
@@ -73,6 +92,7 @@ class PDFInfo(BaseModel):
     filename: str
     file_size: int
     file_size_mb: float
+    original_file_size: int | None = None  # without size optimization, if measured
     created_at: float
 
 
@@ -89,6 +109,37 @@ class ContentAnalysis(BaseModel):
     detailed_summary: str
 
 
+class StageTiming(BaseModel):
+    """Timing of one pipeline stage, in seconds from the start of the job."""
+
+    start: float
+    end: float
+    duration: float
+    busy: float
+    spans: int
+
+
+class VADReport(BaseModel):
+    """Non-speech audio cut before transcription."""
+
+    original_seconds: float
+    speech_seconds: float
+    removed_seconds: float
+    # estimated transcription time saved, net of the time spent on detection
+    latency_saved_seconds: float
+
+
+class CompressionReport(BaseModel):
+    """Transcript compression before analysis."""
+
+    original_tokens: int
+    compressed_tokens: int
+    compression_ratio: float  # compressed over original tokens
+    disfluencies: int
+    duplicate_sentences: int
+    dropped_sentences: int
+
+
 class ConvertResponse(BaseModel):
     """Response schema for YouTube to PDF conversion."""
 
@@ -98,6 +149,11 @@ class ConvertResponse(BaseModel):
     pdf_info: PDFInfo | None = None
     analysis: ContentAnalysis | None = None
     processing_time: float | None = None
+    stage_timings: dict[str, StageTiming] | None = None
+    transcript_source: TranscriptSource | None = None  # not kept for cached results
+    vad: VADReport | None = None
+    compression: CompressionReport | None = None
+    cached: bool = False
 
     class Config:
         json_schema_extra = {
@@ -111,11 +167,106 @@ class ConvertResponse(BaseModel):
                     "uploader": "Sample Channel",
                 },
                 "pdf_info": {
-                    "filename": "sample_video_notes.pdf",
+                    "filename": "Sample_Video_Title_dQw4w9WgXcQ_template_notes.3f2a9c41d07b5e68.pdf",
                     "file_size": 1024000,
                     "file_size_mb": 1.02,
+                    "original_file_size": 1536000,
                     "created_at": 1640995200.0,
                 },
                 "processing_time": 45.5,
+                "transcript_source": "captions",
             }
         }
+
+
+class JobResponse(BaseModel):
+    """Response schema for an asynchronous conversion job."""
+
+    job_id: str
+    status: ProcessingStatus
+    url: str
+    created_at: float
+    started_at: float | None = None
+    finished_at: float | None = None
+    result: ConvertResponse | None = None
+    error: str | None = None
+
+
+class BatchConvertRequest(BaseModel):
+    """Request schema for converting a playlist, channel or list of videos."""
+
+    url: HttpUrl | None = Field(
+        None,
+        description="YouTube playlist or channel URL to convert",
+        example="https://www.youtube.com/playlist?list=PLxxxxxxxxxxxxxxxx",
+    )
+    urls: list[HttpUrl] | None = Field(
+        None,
+        description="YouTube video URLs to convert",
+    )
+    renderer: HTMLRenderer | None = Field(
+        None,
+        description="How to build the PDF content, defaults to the HTML_RENDERER setting",
+    )
+    max_concurrency: int | None = Field(
+        None,
+        ge=1,
+        description="Maximum videos of this batch converted at once, capped by BATCH_MAX_CONCURRENCY",
+    )
+
+    @field_validator("url")
+    @classmethod
+    def validate_playlist_url(cls, v):
+        """
+        Validate that the URL is a YouTube playlist or channel URL.
+        """
+        if v is None:
+            return v
+
+        url_str = str(v)
+        playlist_patterns = [
+            "youtube.com/playlist",
+            "youtube.com/@",
+            "youtube.com/channel/",
+            "youtube.com/c/",
+            "youtube.com/user/",
+        ]
+
+        if not any(pattern in url_str for pattern in playlist_patterns):
+            raise ValueError("URL must be a valid YouTube playlist or channel URL")
+
+        return v
+
+    @model_validator(mode="after")
+    def validate_source(self):
+        """
+        Validate that exactly one of url and urls is given.
+        """
+        if (self.url is None) == (not self.urls):
+            raise ValueError("Provide either a playlist url or a list of urls")
+
+        return self
+
+
+class BatchItemResponse(BaseModel):
+    """Response schema for one video of a batch conversion."""
+
+    index: int
+    url: str
+    status: ProcessingStatus
+    job_id: str | None = None
+    result: ConvertResponse | None = None
+    error: str | None = None
+
+
+class BatchResponse(BaseModel):
+    """Response schema for a batch conversion."""
+
+    batch_id: str
+    status: ProcessingStatus
+    total: int
+    completed: int
+    failed: int
+    created_at: float
+    finished_at: float | None = None
+    items: list[BatchItemResponse]
@@ -0,0 +1,163 @@
+import re
+import logging
+import subprocess
+from typing import Any
+from pathlib import Path
+
+from pydub import AudioSegment
+from pydub.silence import detect_silence
+
+logger = logging.getLogger(__name__)
+
+SILENCE_MIN_LENGTH_MS = 300
+SILENCE_THRESHOLD_DBFS = -16  # relative to the segment's average loudness
+# silence is searched for at speech resolution, which is plenty to place a cut
+WINDOW_SAMPLE_RATE = 16000
+DURATION_PATTERN = re.compile(r"Duration: (\d+):(\d{2}):(\d{2}(?:\.\d+)?)")
+
+
+def _run_ffmpeg(arguments: list[str], action: str) -> bytes:
+    """
+    Run ffmpeg with the given arguments and return its standard output.
+    """
+    result = subprocess.run(
+        [AudioSegment.converter, "-nostdin", "-v", "error", *arguments],
+        capture_output=True,
+    )
+    if result.returncode:
+        raise RuntimeError(
+            f"ffmpeg failed to {action}: "
+            f"{result.stderr.decode(errors='replace').strip()}"
+        )
+    return result.stdout
+
+
+def probe_seconds(audio_path: str) -> float:
+    """
+    Read an audio file's duration in seconds from its header, without decoding it.
+    """
+    # with no output file ffmpeg prints the input's details and exits non-zero
+    result = subprocess.run(
+        [AudioSegment.converter, "-nostdin", "-hide_banner", "-i", audio_path],
+        capture_output=True,
+    )
+    match = DURATION_PATTERN.search(result.stderr.decode(errors="replace"))
+    if not match:
+        raise RuntimeError(f"ffmpeg could not read the duration of {audio_path}")
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def _decode_window(audio_path: str, start: float, seconds: float) -> AudioSegment:
+    """
+    Decode one window of an audio file as mono 16 kHz PCM.
+    """
+    pcm = _run_ffmpeg(
+        [
+            "-ss",
+            f"{start:.3f}",
+            "-t",
+            f"{seconds:.3f}",
+            "-i",
+            audio_path,
+            "-vn",
+            "-ac",
+            "1",
+            "-ar",
+            str(WINDOW_SAMPLE_RATE),
+            "-f",
+            "s16le",
+            "-",
+        ],
+        f"decode {audio_path}",
+    )
+    return AudioSegment(
+        data=pcm, sample_width=2, frame_rate=WINDOW_SAMPLE_RATE, channels=1
+    )
+
+
+def _find_cut_point(audio_path: str, start: float, end: float) -> float:
+    """
+    Find the middle of the longest silence in the last fifth of a window.
+
+    Only that fifth is decoded, so memory does not grow with the file.
+    """
+    search_start = end - (end - start) / 5
+    window = _decode_window(audio_path, search_start, end - search_start)
+    if not len(window):
+        return end
+
+    silences = detect_silence(
+        window,
+        min_silence_len=SILENCE_MIN_LENGTH_MS,
+        silence_thresh=window.dBFS + SILENCE_THRESHOLD_DBFS,
+        seek_step=10,
+    )
+    if not silences:
+        return end
+
+    silence_start, silence_end = max(silences, key=lambda s: s[1] - s[0])
+    return search_start + (silence_start + silence_end) / 2000
+
+
+def split_audio(
+    audio_path: str,
+    output_dir: str,
+    max_seconds: float,
+    overlap_seconds: float,
+    bitrate_kbps: int,
+) -> list[dict[str, Any]]:
+    """
+    Split audio into overlapping segments cut at silences. Runs in the CPU process pool.
+
+    Each segment is encoded straight from the source by ffmpeg as mono MP3
+    and returned with its start and end offsets in seconds. The file is
+    never decoded whole, only the windows searched for silence.
+    """
+    total = probe_seconds(audio_path)
+
+    out_dir = Path(output_dir)
+    out_dir.mkdir(exist_ok=True, parents=True)
+
+    segments = []
+    start = 0.0
+    while start < total:
+        end = min(start + max_seconds, total)
+        if end < total:
+            end = _find_cut_point(audio_path, start, end)
+
+        segment_path = out_dir / f"segment_{len(segments):04d}.mp3"
+        _run_ffmpeg(
+            [
+                "-y",
+                "-ss",
+                f"{start:.3f}",
+                "-t",
+                f"{end - start:.3f}",
+                "-i",
+                audio_path,
+                "-vn",
+                "-ac",
+                "1",
+                "-b:a",
+                f"{bitrate_kbps}k",
+                "-f",
+                "mp3",
+                str(segment_path),
+            ],
+            f"cut {audio_path}",
+        )
+        segments.append(
+            {
+                "path": str(segment_path),
+                "start": round(start, 3),
+                "end": round(end, 3),
+            }
+        )
+
+        if end >= total:
+            break
+        start = max(end - overlap_seconds, start + 0.001)
+
+    logger.info(f"Split {audio_path} into {len(segments)} segments")
+    return segments
@@ -0,0 +1,165 @@
+import time
+import uuid
+import asyncio
+import logging
+from dataclasses import dataclass, field
+
+from core.config import settings
+from core.executors import executors
+from services.jobs import Job, job_service
+from services.youtube import youtube_service
+from schemas.convert import (
+    HTMLRenderer,
+    ConvertRequest,
+    ProcessingStatus,
+    BatchConvertRequest,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchItem:
+    """One video of a batch and the job converting it."""
+
+    request: ConvertRequest
+    job: Job | None = None
+
+    @property
+    def status(self) -> ProcessingStatus:
+        return self.job.status if self.job else ProcessingStatus.PENDING
+
+
+@dataclass
+class Batch:
+    """In-memory state of a batch conversion."""
+
+    items: list[BatchItem]
+    max_concurrency: int
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    task: asyncio.Task | None = None
+
+    def count(self, status: ProcessingStatus) -> int:
+        return sum(item.status == status for item in self.items)
+
+    @property
+    def status(self) -> ProcessingStatus:
+        if self.finished_at:
+            if self.count(ProcessingStatus.FAILED) == len(self.items):
+                return ProcessingStatus.FAILED
+            return ProcessingStatus.COMPLETED
+
+        if any(item.job for item in self.items):
+            return ProcessingStatus.PROCESSING
+
+        return ProcessingStatus.PENDING
+
+
+class BatchService:
+    """Service for fanning a playlist or list of videos out to conversion jobs."""
+
+    def __init__(self):
+        self.batches: dict[str, Batch] = {}
+
+    async def create(self, request: BatchConvertRequest) -> Batch:
+        """
+        Expand the batch into videos and start converting them in the background.
+        """
+        if request.url:
+            if not youtube_service.validate_playlist_url(str(request.url)):
+                raise ValueError("Invalid YouTube playlist or channel URL")
+
+            urls = await executors.run_io(
+                youtube_service.expand_playlist,
+                str(request.url),
+                settings.BATCH_MAX_ITEMS,
+            )
+        else:
+            urls = [str(url) for url in request.urls]
+            if len(urls) > settings.BATCH_MAX_ITEMS:
+                raise ValueError(
+                    f"Batch has {len(urls)} videos, the maximum is {settings.BATCH_MAX_ITEMS}"
+                )
+
+        renderer = request.renderer or HTMLRenderer(settings.HTML_RENDERER)
+        items = [
+            BatchItem(request=ConvertRequest(url=url, renderer=renderer))
+            for url in urls
+        ]
+
+        max_concurrency = min(
+            request.max_concurrency or settings.BATCH_MAX_CONCURRENCY,
+            settings.BATCH_MAX_CONCURRENCY,
+        )
+
+        self._prune_finished_batches()
+
+        batch = Batch(items=items, max_concurrency=max_concurrency)
+        batch.task = asyncio.create_task(self._run(batch))
+        self.batches[batch.id] = batch
+
+        logger.info(
+            f"Started batch {batch.id} with {len(items)} videos, {max_concurrency} at a time"
+        )
+        return batch
+
+    def get(self, batch_id: str) -> Batch | None:
+        """
+        Get a batch by its id.
+        """
+        return self.batches.get(batch_id)
+
+    async def stop(self) -> None:
+        """
+        Cancel running batches.
+        """
+        tasks = [batch.task for batch in self.batches.values() if batch.task]
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, batch: Batch) -> None:
+        """
+        Submit the batch's videos as jobs, at most max_concurrency in flight.
+        """
+        semaphore = asyncio.Semaphore(batch.max_concurrency)
+
+        async def run_item(item: BatchItem) -> None:
+            async with semaphore:
+                while item.job is None:
+                    try:
+                        item.job = job_service.submit(item.request)
+                    except OverflowError:
+                        # the shared job queue is full, wait for room
+                        await asyncio.sleep(1)
+
+                await item.job.wait()
+
+        try:
+            await asyncio.gather(*(run_item(item) for item in batch.items))
+        finally:
+            batch.finished_at = time.time()
+
+        logger.info(
+            f"Finished batch {batch.id}: {batch.count(ProcessingStatus.COMPLETED)} completed, "
+            f"{batch.count(ProcessingStatus.FAILED)} failed"
+        )
+
+    def _prune_finished_batches(self) -> None:
+        """
+        Forget finished batches older than the retention window.
+        """
+        cutoff = time.time() - settings.JOB_RETENTION_SECONDS
+        expired = [
+            batch_id
+            for batch_id, batch in self.batches.items()
+            if batch.finished_at and batch.finished_at < cutoff
+        ]
+        for batch_id in expired:
+            del self.batches[batch_id]
+
+
+batch_service = BatchService()
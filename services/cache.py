@@ -0,0 +1,271 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import threading
+from typing import Any
+from pathlib import Path
+from collections import OrderedDict
+
+from core.config import settings
+from core.metrics import metrics
+from constants import llm as llm_prompts
+
+logger = logging.getLogger(__name__)
+
+
+def _prompt_version() -> str:
+    """
+    Hash every prompt template so prompt edits invalidate cached results.
+    """
+    prompts = sorted(
+        (name, value)
+        for name, value in vars(llm_prompts).items()
+        if name.endswith("_PROMPT") and isinstance(value, str)
+    )
+    digest = hashlib.sha256()
+    for name, value in prompts:
+        digest.update(name.encode())
+        digest.update(value.encode())
+    return digest.hexdigest()[:16]
+
+
+PROMPT_VERSION = _prompt_version()
+# a temporary entry this old is left over even if its writer's PID is reused
+STALE_WRITE_SECONDS = 3600
+
+
+class ResultCache:
+    """Disk cache of conversion results keyed by video id and model/prompt versions."""
+
+    METADATA_FILE = "metadata.json"
+    TRANSCRIPT_FILE = "transcript.txt"
+    ANALYSIS_FILE = "analysis.json"
+    HTML_FILE = "content.html"
+    PDF_FILE = "notes.pdf"
+    PDF_DIGEST_FILE = "notes.pdf.sha256"
+
+    def __init__(self):
+        self.cache_dir = Path(settings.UPLOAD_DIR) / "cache"
+        self.cache_dir.mkdir(exist_ok=True, parents=True)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # key -> entry size in bytes, least recently used first
+        self.entries: OrderedDict[str, int] = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_index()
+
+    def build_key(self, video_id: str, renderer: str) -> str:
+        """
+        Build the cache key for a video under the current models, prompts, renderer
+        and the settings that change which transcript is analyzed.
+        """
+        transcription_model = (
+            settings.LOCAL_WHISPER_MODEL
+            if settings.TRANSCRIPTION_BACKEND == "local"
+            else settings.WHISPER_MODEL
+        )
+        raw = "|".join(
+            [
+                video_id,
+                settings.TRANSCRIPTION_BACKEND,
+                transcription_model,
+                settings.GPT_MODEL,
+                PROMPT_VERSION,
+                renderer,
+                settings.TRANSCRIPT_SOURCE,
+                f"vad={settings.VAD_ENABLED}",
+                f"compression={settings.TRANSCRIPT_COMPRESSION_ENABLED}",
+            ]
+        )
+        return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+    def get(self, video_id: str, renderer: str) -> dict[str, Any] | None:
+        """
+        Load a cached result, or return None on a miss.
+        """
+        if not settings.CACHE_ENABLED:
+            return None
+
+        key = self.build_key(video_id, renderer)
+        entry_dir = self.cache_dir / key
+
+        with self._lock:
+            if key not in self.entries:
+                self.misses += 1
+                metrics.cache_lookups.labels(result="miss").inc()
+                return None
+            self.entries.move_to_end(key)
+
+        try:
+            # directory mtime persists the LRU order across restarts
+            os.utime(entry_dir)
+            result = {
+                "video_info": json.loads((entry_dir / self.METADATA_FILE).read_text()),
+                "transcript": (entry_dir / self.TRANSCRIPT_FILE).read_text(),
+                "analysis": json.loads((entry_dir / self.ANALYSIS_FILE).read_text()),
+                "html": (entry_dir / self.HTML_FILE).read_text(),
+                "pdf_path": str(entry_dir / self.PDF_FILE),
+                "pdf_digest": self._read_digest(entry_dir),
+            }
+
+        except (OSError, ValueError) as ex:
+            logger.warning(f"Dropping unreadable cache entry {key}: {str(ex)}")
+            self._remove(key)
+            with self._lock:
+                self.misses += 1
+            metrics.cache_lookups.labels(result="miss").inc()
+            return None
+
+        with self._lock:
+            self.hits += 1
+        metrics.cache_lookups.labels(result="hit").inc()
+
+        logger.info(f"Cache hit for video {video_id}")
+        return result
+
+    def put(
+        self,
+        video_id: str,
+        renderer: str,
+        video_info: dict[str, Any],
+        transcript: str,
+        analysis: dict[str, Any],
+        html: str,
+        pdf_path: str,
+        pdf_digest: str,
+    ) -> None:
+        """
+        Store a conversion result and evict old entries over the size budget.
+        """
+        if not settings.CACHE_ENABLED:
+            return
+
+        key = self.build_key(video_id, renderer)
+        entry_dir = self.cache_dir / key
+        tmp_dir = self.cache_dir / f".{key}.{os.getpid()}.{threading.get_ident()}"
+
+        try:
+            tmp_dir.mkdir()
+            (tmp_dir / self.METADATA_FILE).write_text(json.dumps(video_info))
+            (tmp_dir / self.TRANSCRIPT_FILE).write_text(transcript)
+            (tmp_dir / self.ANALYSIS_FILE).write_text(json.dumps(analysis))
+            (tmp_dir / self.HTML_FILE).write_text(html)
+
+            # hard link so the cached and served copies share disk blocks
+            try:
+                os.link(pdf_path, tmp_dir / self.PDF_FILE)
+            except OSError:
+                shutil.copyfile(pdf_path, tmp_dir / self.PDF_FILE)
+            (tmp_dir / self.PDF_DIGEST_FILE).write_text(pdf_digest)
+
+            size = sum(f.stat().st_size for f in tmp_dir.iterdir())
+
+            self._remove(key)
+            os.rename(tmp_dir, entry_dir)
+
+        except OSError as ex:
+            logger.warning(f"Failed to cache result for video {video_id}: {str(ex)}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+
+        with self._lock:
+            self.entries[key] = size
+
+        logger.info(f"Cached result for video {video_id} ({size} bytes)")
+        self._evict()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Get hit/miss counters and disk usage.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": settings.CACHE_ENABLED,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+                "size_bytes": sum(self.entries.values()),
+                "max_bytes": settings.CACHE_MAX_BYTES,
+            }
+
+    def _evict(self) -> None:
+        """
+        Remove least recently used entries until the cache fits its budget.
+        """
+        while True:
+            with self._lock:
+                if sum(self.entries.values()) <= settings.CACHE_MAX_BYTES:
+                    return
+                key, _ = self.entries.popitem(last=False)
+                self.evictions += 1
+
+            shutil.rmtree(self.cache_dir / key, ignore_errors=True)
+            logger.info(f"Evicted cache entry {key}")
+
+    def _read_digest(self, entry_dir: Path) -> str | None:
+        """
+        Read the stored SHA-256 of an entry's PDF, None for entries cached without one.
+        """
+        try:
+            return (entry_dir / self.PDF_DIGEST_FILE).read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _remove(self, key: str) -> None:
+        with self._lock:
+            self.entries.pop(key, None)
+        shutil.rmtree(self.cache_dir / key, ignore_errors=True)
+
+    def _load_index(self) -> None:
+        """
+        Rebuild the LRU index from the entries on disk.
+        """
+        found = []
+        for entry_dir in self.cache_dir.iterdir():
+            if not entry_dir.is_dir():
+                continue
+
+            if entry_dir.name.startswith("."):
+                # another worker may be writing it right now
+                if self._is_abandoned_write(entry_dir):
+                    shutil.rmtree(entry_dir, ignore_errors=True)
+                continue
+
+            size = sum(f.stat().st_size for f in entry_dir.iterdir())
+            found.append((entry_dir.stat().st_mtime, entry_dir.name, size))
+
+        for _, key, size in sorted(found):
+            self.entries[key] = size
+
+    def _is_abandoned_write(self, tmp_dir: Path) -> bool:
+        """
+        Check whether a temporary entry's writer is gone, or it is too old to still be written.
+        """
+        try:
+            if time.time() - tmp_dir.stat().st_mtime > STALE_WRITE_SECONDS:
+                return True
+            # named .<key>.<pid>.<thread id> by put()
+            pid = int(tmp_dir.name.split(".")[2])
+        except (OSError, IndexError, ValueError):
+            return True
+
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            # alive, under another user
+            pass
+        return False
+
+
+result_cache = ResultCache()
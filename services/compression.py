@@ -0,0 +1,298 @@
+import re
+import math
+import logging
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# fillers, matched case-sensitively so "ER" or "HMM" in a name survive
+FILLERS = r"(?:[Uu]+h+|[Uu]+m+|[Ee]r+m*|[Aa]h+|[Hh]m+|[Mm]+hm+|[Uu]h-huh)"
+# a filler opening a sentence: "Um, so we start"
+LEADING_FILLER_PATTERN = re.compile(rf"(^|(?<=[.!?])\s+){FILLERS}(?:,\s*|\s+)")
+# a filler set off by commas inside a sentence: "we, uh, start"
+COMMA_FILLER_PATTERN = re.compile(rf",\s*{FILLERS}(?:,|(?=[.!?]))")
+# "uh" and "um" are never words, so they go wherever they appear in lowercase
+BARE_FILLER_PATTERN = re.compile(r"\s+(?:u+h+|u+m+)\b(?=[\s,.!?]|$)")
+# discourse markers, only when set off by commas so "I mean it" survives
+MARKER_PATTERN = re.compile(
+    r",\s*(?:you know|i mean|like|sort of|kind of|basically|actually)\s*(?=,)",
+    re.IGNORECASE,
+)
+# one word stuttered at the start of a clause: "I I think", "So so we"
+STUTTER_PATTERN = re.compile(r"(^|[.!?,;]\s+)(\w+)((?:,?\s+\2\b)+)", re.IGNORECASE)
+# words that are said twice on purpose, even at the start of a clause
+LEGITIMATE_DOUBLES = frozenset(
+    "had that is was do bye no yes very really many much far long knock".split()
+)
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+")
+WORD_PATTERN = re.compile(r"[a-z0-9']+")
+# unpunctuated text, such as automatic captions, is split into windows of this many words
+MAX_SENTENCE_WORDS = 60
+FALLBACK_SENTENCE_WORDS = 30
+# sections keep their share of the budget, so chapter positions stay aligned
+SECTIONS = 20
+TEXTRANK_DAMPING = 0.85
+TEXTRANK_ITERATIONS = 50
+TEXTRANK_TOLERANCE = 1e-6
+SIMILARITY_BLOCK_ROWS = 1024
+
+STOPWORDS = frozenset(
+    """
+    a about above after again all also am an and any are as at be because been
+    before being below between both but by can could did do does doing down
+    during each few for from further get got had has have having he her here
+    hers him his how i if in into is it its itself just me more most my no nor
+    not now of off on once only or other our ours out over own same she should
+    so some such than that the their theirs them then there these they this
+    those through to too under until up very was we were what when where which
+    while who whom why will with would you your yours going gonna want wanna
+    okay ok yeah right really thing things say said one know think
+    """.split()
+)
+
+
+def remove_disfluencies(text: str) -> tuple[str, int]:
+    """
+    Remove filler words, comma-delimited discourse markers and stuttered words.
+
+    Returns the cleaned text and the number of removals.
+    """
+    text, leading = LEADING_FILLER_PATTERN.subn(r"\1", text)
+    text, commas = COMMA_FILLER_PATTERN.subn("", text)
+    text, bare = BARE_FILLER_PATTERN.subn("", text)
+    text, markers = MARKER_PATTERN.subn("", text)
+    text, stutters = _collapse_stutters(text)
+
+    # tidy the punctuation left behind
+    text = re.sub(r"\s+([,.!?])", r"\1", text)
+    text = re.sub(r",(?=[,.!?])", "", text)
+    text = re.sub(r"(^|[.!?]\s+),\s*", r"\1", text)
+    text = re.sub(r"\s{2,}", " ", text).strip()
+
+    return text, leading + commas + bare + markers + stutters
+
+
+def _collapse_stutters(text: str) -> tuple[str, int]:
+    """
+    Collapse a word repeated at the start of a clause to one.
+
+    Repeats must be lowercase, as a stutter after a capitalized first word
+    is transcribed, so doubled names like "Bora Bora" are left alone. "I"
+    is the exception.
+    """
+    removed = 0
+
+    def collapse(match: re.Match) -> str:
+        nonlocal removed
+        prefix, word, rest = match.groups()
+        repeats = re.findall(r",?\s+(\w+)", rest)
+        expected = word if word == "I" else word.lower()
+        if word.lower() in LEGITIMATE_DOUBLES or any(r != expected for r in repeats):
+            return match.group(0)
+        removed += len(repeats)
+        return prefix + word
+
+    return STUTTER_PATTERN.sub(collapse, text), removed
+
+
+def split_sentences(text: str) -> list[str]:
+    """
+    Split text into sentences, cutting overlong or unpunctuated runs into word windows.
+    """
+    sentences = []
+    for sentence in SENTENCE_PATTERN.split(text):
+        words = sentence.split()
+        if len(words) <= MAX_SENTENCE_WORDS:
+            if words:
+                sentences.append(sentence[0].upper() + sentence[1:])
+            continue
+        for i in range(0, len(words), FALLBACK_SENTENCE_WORDS):
+            sentences.append(" ".join(words[i : i + FALLBACK_SENTENCE_WORDS]))
+    return sentences
+
+
+def tfidf_matrix(sentences: list[str], max_features: int) -> Any:
+    """
+    L2-normalized TF-IDF rows of the sentences, over their max_features most common terms.
+    """
+    import numpy as np
+
+    tokenized = [
+        [
+            word
+            for word in WORD_PATTERN.findall(sentence.lower())
+            if word not in STOPWORDS
+        ]
+        for sentence in sentences
+    ]
+
+    document_frequency: dict[str, int] = {}
+    for words in tokenized:
+        for word in set(words):
+            document_frequency[word] = document_frequency.get(word, 0) + 1
+    vocabulary = {
+        word: i
+        for i, word in enumerate(
+            sorted(document_frequency, key=document_frequency.get, reverse=True)[
+                :max_features
+            ]
+        )
+    }
+
+    rows, columns = [], []
+    for row, words in enumerate(tokenized):
+        for word in words:
+            column = vocabulary.get(word)
+            if column is not None:
+                rows.append(row)
+                columns.append(column)
+
+    counts = np.zeros((len(sentences), len(vocabulary)), dtype=np.float32)
+    np.add.at(
+        counts, (np.array(rows, dtype=np.intp), np.array(columns, dtype=np.intp)), 1
+    )
+
+    df = np.zeros(len(vocabulary), dtype=np.float32)
+    for word, column in vocabulary.items():
+        df[column] = document_frequency[word]
+    idf = np.log((1 + len(sentences)) / (1 + df)) + 1
+
+    # sublinear term frequency, so a repeated word does not dominate its sentence
+    matrix = np.where(counts > 0, 1 + np.log(np.maximum(counts, 1)), 0) * idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return (matrix / np.maximum(norms, 1e-10)).astype(np.float32)
+
+
+def find_duplicates(matrix: Any, threshold: float) -> Any:
+    """
+    Mask of sentences whose cosine similarity to an earlier sentence reaches threshold.
+    """
+    import numpy as np
+
+    n = matrix.shape[0]
+    duplicate = np.zeros(n, dtype=bool)
+    for block in range(0, n, SIMILARITY_BLOCK_ROWS):
+        end = min(block + SIMILARITY_BLOCK_ROWS, n)
+        # similarities of this block to every sentence up to its end
+        similarity = matrix[block:end] @ matrix[:end].T
+        earlier = np.arange(end)[None, :] < np.arange(block, end)[:, None]
+        duplicate[block:end] = ((similarity >= threshold) & earlier).any(axis=1)
+    return duplicate
+
+
+def textrank(matrix: Any) -> Any:
+    """
+    TextRank scores over the cosine similarity graph of the TF-IDF rows.
+
+    The graph's edge weights are matrix @ matrix.T without the diagonal, so
+    each power iteration multiplies by the two factors instead of building
+    the n x n matrix, keeping memory linear in the number of sentences.
+    """
+    import numpy as np
+
+    n = matrix.shape[0]
+    # rows are unit length, or zero for sentences with no known terms
+    self_similarity = np.einsum("ij,ij->i", matrix, matrix)
+
+    def similarity_times(vector: Any) -> Any:
+        return matrix @ (matrix.T @ vector) - self_similarity * vector
+
+    degree = similarity_times(np.ones(n, dtype=np.float32))
+    inverse_degree = np.where(degree > 1e-10, 1 / np.maximum(degree, 1e-10), 0)
+
+    scores = np.full(n, 1 / n, dtype=np.float32)
+    for _ in range(TEXTRANK_ITERATIONS):
+        updated = (1 - TEXTRANK_DAMPING) / n + TEXTRANK_DAMPING * similarity_times(
+            scores * inverse_degree
+        )
+        if np.abs(updated - scores).sum() < TEXTRANK_TOLERANCE:
+            scores = updated
+            break
+        scores = updated
+    return scores
+
+
+def compress_transcript(
+    transcript: str,
+    target_tokens: int,
+    chars_per_token: float,
+    min_keep_ratio: float,
+    duplicate_threshold: float,
+    max_features: int,
+) -> dict[str, Any]:
+    """
+    Shrink a transcript towards target_tokens by extraction. Runs in the CPU process pool.
+
+    Disfluencies and near-duplicate sentences are removed first. If the
+    text is still over budget, sentences are ranked with TextRank and the
+    best of each section are kept in their original order. Each section
+    keeps its share of the budget, so positions in the transcript still
+    match the video's timeline. At least min_keep_ratio of the cleaned
+    text is kept however small the target.
+    """
+    import numpy as np
+
+    original_tokens = math.ceil(len(transcript) / chars_per_token)
+    cleaned, disfluencies = remove_disfluencies(transcript)
+    sentences = split_sentences(cleaned)
+
+    duplicates = 0
+    dropped = 0
+    if sentences:
+        matrix = tfidf_matrix(sentences, max_features)
+        duplicate = find_duplicates(matrix, duplicate_threshold)
+        duplicates = int(duplicate.sum())
+        keep = ~duplicate
+
+        # sentence costs, counting the joining space
+        costs = np.array([len(s) + 1 for s in sentences], dtype=np.float64)
+        costs /= chars_per_token
+        kept_tokens = costs[keep].sum()
+        budget = max(target_tokens, kept_tokens * min_keep_ratio)
+
+        if kept_tokens > budget:
+            kept = np.flatnonzero(keep)
+            scores = textrank(matrix[kept])
+            # each section gets the budget share of its original length
+            offsets = np.cumsum(costs[kept]) - costs[kept]
+            section = np.minimum(
+                (offsets / kept_tokens * SECTIONS).astype(int), SECTIONS - 1
+            )
+            section_budget = (
+                np.bincount(section, weights=costs[kept], minlength=SECTIONS)
+                * budget
+                / kept_tokens
+            )
+
+            # best first within each section, kept while the section budget lasts
+            order = np.lexsort((-scores, section))
+            ordered_costs = costs[kept][order]
+            ordered_sections = section[order]
+            cumulative = np.cumsum(ordered_costs)
+            section_starts = np.searchsorted(ordered_sections, np.arange(SECTIONS))
+            before_section = np.concatenate(([0.0], cumulative))[section_starts]
+            used = cumulative - before_section[ordered_sections]
+            selected = np.zeros(len(kept), dtype=bool)
+            selected[order] = used <= section_budget[ordered_sections]
+
+            dropped = int((~selected).sum())
+            keep[kept[~selected]] = False
+
+        sentences = [s for s, k in zip(sentences, keep) if k]
+
+    compressed = " ".join(sentences)
+    compressed_tokens = math.ceil(len(compressed) / chars_per_token)
+
+    logger.info(
+        f"Compressed transcript from {original_tokens} to {compressed_tokens} tokens: "
+        f"{disfluencies} disfluencies, {duplicates} duplicate and {dropped} low-ranked "
+        f"sentences removed"
+    )
+    return {
+        "transcript": compressed,
+        "original_tokens": original_tokens,
+        "compressed_tokens": compressed_tokens,
+        "disfluencies": disfluencies,
+        "duplicate_sentences": duplicates,
+        "dropped_sentences": dropped,
+    }
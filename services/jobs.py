@@ -0,0 +1,271 @@
+import time
+import uuid
+import asyncio
+import logging
+from typing import Any, AsyncIterator
+from collections import deque
+from dataclasses import dataclass, field
+
+from core.config import settings
+from core.metrics import metrics
+from services.pipeline import pipeline_service
+from services.youtube import youtube_service
+from schemas.convert import (
+    ConvertRequest,
+    ConvertResponse,
+    HTMLRenderer,
+    ProcessingStatus,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Job:
+    """In-memory state of a queued conversion."""
+
+    request: ConvertRequest
+    video_id: str | None = None
+    renderer: HTMLRenderer | None = None
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: ProcessingStatus = ProcessingStatus.PENDING
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    result: ConvertResponse | None = None
+    error: Exception | None = None
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+    # jobs are created on the event loop, which publish() hands events back to
+    loop: asyncio.AbstractEventLoop = field(
+        default_factory=asyncio.get_running_loop, repr=False
+    )
+    history: deque[dict[str, Any]] = field(
+        default_factory=lambda: deque(maxlen=settings.JOB_EVENT_HISTORY), repr=False
+    )
+    subscribers: set[asyncio.Queue] = field(default_factory=set, repr=False)
+
+    @property
+    def url(self) -> str:
+        return str(self.request.url)
+
+    async def wait(self) -> None:
+        """
+        Wait until the job has completed or failed.
+        """
+        await self.done.wait()
+
+    def publish(self, event: dict[str, Any]) -> None:
+        """
+        Publish a progress event to subscribers. Safe to call from any thread.
+        """
+        self.loop.call_soon_threadsafe(self._deliver, event)
+
+    def _deliver(self, event: dict[str, Any]) -> None:
+        event = {"job_id": self.id, "timestamp": time.time(), **event}
+        self.history.append(event)
+        for queue in self.subscribers:
+            queue.put_nowait(event)
+
+    async def events(self, heartbeat: float) -> AsyncIterator[dict[str, Any] | None]:
+        """
+        Replay this job's recent events, then follow new ones until it finishes.
+
+        Yields None after heartbeat seconds without an event, so callers can
+        keep idle connections open.
+        """
+        queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+        self.subscribers.add(queue)
+        try:
+            # registered and snapshotted without awaiting, so no event is missed or repeated
+            for event in list(self.history):
+                yield event
+                if event["type"] == "status" and self._is_final(event):
+                    return
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+
+                yield event
+                if event["type"] == "status" and self._is_final(event):
+                    return
+
+        finally:
+            self.subscribers.discard(queue)
+
+    @staticmethod
+    def _is_final(event: dict[str, Any]) -> bool:
+        return event["status"] in (ProcessingStatus.COMPLETED, ProcessingStatus.FAILED)
+
+
+class JobService:
+    """Service for queueing conversions onto a bounded pool of pipeline workers."""
+
+    def __init__(self):
+        self.jobs: dict[str, Job] = {}
+        # the latest unfinished job of each video, which duplicate requests share
+        self.active: dict[str, Job] = {}
+        self.queue: asyncio.Queue[Job] | None = None
+        self.workers: list[asyncio.Task] = []
+        self._deferred: set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        """
+        Start the pipeline worker tasks.
+        """
+        if self.workers:
+            return
+
+        self.queue = asyncio.Queue(maxsize=settings.JOB_QUEUE_MAX_SIZE)
+        self.workers = [
+            asyncio.create_task(self._worker(i), name=f"pipeline-worker-{i}")
+            for i in range(settings.MAX_CONCURRENT_JOBS)
+        ]
+        logger.info(f"Started {len(self.workers)} pipeline workers")
+
+    async def stop(self) -> None:
+        """
+        Cancel the pipeline worker tasks.
+        """
+        tasks = self.workers + list(self._deferred)
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.workers = []
+        self._deferred.clear()
+        logger.info("Stopped pipeline workers")
+
+    def submit(self, request: ConvertRequest) -> Job:
+        """
+        Queue a conversion job and return it immediately.
+
+        A request for a video that already has an unfinished job with the
+        same renderer gets that job back, so duplicates never take a queue
+        slot or a worker. With another renderer, the new job is queued once
+        the unfinished one is done, as both write the same audio file.
+        """
+        if self.queue is None:
+            raise RuntimeError("Job service is not started")
+
+        self._prune_finished_jobs()
+
+        video_id = youtube_service.extract_video_id(str(request.url))
+        renderer = request.renderer or HTMLRenderer(settings.HTML_RENDERER)
+        active = self.active.get(video_id) if video_id else None
+        if active and active.renderer == renderer:
+            logger.info(f"Joining job {active.id} for video {video_id}")
+            return active
+
+        if self.queue.full():
+            raise OverflowError("Conversion queue is full, please retry later")
+
+        job = Job(request=request, video_id=video_id, renderer=renderer)
+        if active:
+            task = asyncio.create_task(self._enqueue_after(active, job))
+            self._deferred.add(task)
+            task.add_done_callback(self._deferred.discard)
+        else:
+            self.queue.put_nowait(job)
+
+        self.jobs[job.id] = job
+        if video_id:
+            self.active[video_id] = job
+        job.publish({"type": "status", "status": job.status})
+        self._publish_metrics()
+        logger.info(f"Queued job {job.id} for URL: {job.url}")
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        """
+        Get a job by its id.
+        """
+        return self.jobs.get(job_id)
+
+    def stats(self) -> dict[str, int]:
+        """
+        Get counts of queued and running jobs.
+        """
+        running = sum(
+            job.status == ProcessingStatus.PROCESSING for job in self.jobs.values()
+        )
+        return {
+            "workers": len(self.workers),
+            "queued": self.queue.qsize() if self.queue else 0,
+            "running": running,
+        }
+
+    async def _worker(self, index: int) -> None:
+        """
+        Pull jobs off the queue and run them through the pipeline.
+        """
+        while True:
+            job = await self.queue.get()
+            job.status = ProcessingStatus.PROCESSING
+            job.started_at = time.time()
+            job.publish({"type": "status", "status": job.status})
+            self._publish_metrics()
+
+            try:
+                job.result = await pipeline_service.run(job.request, job.publish)
+                job.status = ProcessingStatus.COMPLETED
+
+            except asyncio.CancelledError:
+                job.status = ProcessingStatus.FAILED
+                job.error = RuntimeError("Job was cancelled")
+                raise
+
+            except Exception as ex:
+                logger.exception(f"Job {job.id} failed: {str(ex)}")
+                job.status = ProcessingStatus.FAILED
+                job.error = ex
+
+            finally:
+                if self.active.get(job.video_id) is job:
+                    del self.active[job.video_id]
+                job.finished_at = time.time()
+                metrics.conversions.labels(status=job.status.value).inc()
+                job.publish(
+                    {
+                        "type": "status",
+                        "status": job.status,
+                        "error": str(job.error) if job.error else None,
+                    }
+                )
+                job.done.set()
+                self.queue.task_done()
+                self._publish_metrics()
+
+    async def _enqueue_after(self, previous: Job, job: Job) -> None:
+        """
+        Queue a job once the previous job of its video has finished.
+        """
+        await previous.wait()
+        await self.queue.put(job)
+        self._publish_metrics()
+
+    def _publish_metrics(self) -> None:
+        # set on every change rather than at scrape time, so with several
+        # API workers each one's gauges are current
+        stats = self.stats()
+        metrics.jobs.labels(state="queued").set(stats["queued"])
+        metrics.jobs.labels(state="running").set(stats["running"])
+
+    def _prune_finished_jobs(self) -> None:
+        """
+        Forget finished jobs older than the retention window.
+        """
+        cutoff = time.time() - settings.JOB_RETENTION_SECONDS
+        expired = [
+            job_id
+            for job_id, job in self.jobs.items()
+            if job.finished_at and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+
+job_service = JobService()
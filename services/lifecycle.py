@@ -0,0 +1,225 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from typing import Any, Iterator
+from pathlib import Path
+from itertools import islice
+from dataclasses import dataclass
+
+from core.config import settings
+from core.metrics import metrics
+from core.executors import executors
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StoredFile:
+    """A file under lifecycle management, as seen by a sweep."""
+
+    path: str
+    kind: str  # "audio" or "pdf"
+    size: int
+    accessed_at: float
+    modified_at: float
+    shared: bool  # hard-linked elsewhere, e.g. into the result cache
+    partial: bool  # a download or render still being written
+
+
+class LifecycleService:
+    """Service for expiring downloaded audio and generated PDFs and keeping them under a disk quota."""
+
+    def __init__(self):
+        self.directories = {
+            "audio": Path(settings.UPLOAD_DIR) / "youtube",
+            "pdf": Path(settings.UPLOAD_DIR) / "pdfs",
+        }
+        self.task: asyncio.Task | None = None
+        self._lock = threading.Lock()
+
+        self.sweeps = 0
+        self.files_removed = 0
+        self.reclaimed_bytes: dict[str, int] = {}
+        self.usage_bytes = 0
+        self.last_sweep_at: float | None = None
+        self.last_sweep_seconds: float | None = None
+
+    async def start(self) -> None:
+        """
+        Start the periodic sweep task.
+        """
+        if self.task:
+            return
+
+        self.task = asyncio.create_task(self._sweep_loop(), name="storage-lifecycle")
+        logger.info("Started storage lifecycle sweeps")
+
+    async def stop(self) -> None:
+        """
+        Cancel the periodic sweep task.
+        """
+        if not self.task:
+            return
+
+        self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+        self.task = None
+        logger.info("Stopped storage lifecycle sweeps")
+
+    def release(self, file_path: str) -> None:
+        """
+        Delete an intermediate file as soon as it is no longer needed.
+        """
+        self._remove(file_path, "released")
+
+    def touch(self, file_path: str | Path) -> None:
+        """
+        Record a download of a file, keeping it from quota eviction the longest.
+        """
+        try:
+            # only the access time changes, the TTL still runs from creation,
+            # and the exact mtime keeps the PDF's known digest valid
+            os.utime(file_path, ns=(time.time_ns(), os.stat(file_path).st_mtime_ns))
+        except OSError as ex:
+            logger.warning(f"Failed to record access to {file_path}: {str(ex)}")
+
+    async def sweep(self) -> int:
+        """
+        Expire old files, then evict the least recently downloaded until under the quota.
+
+        Directories are scanned and files deleted in batches on the I/O
+        pool, so a sweep over many files never holds up request handling.
+        Returns the number of bytes reclaimed.
+        """
+        started = time.monotonic()
+        reclaimed = 0
+
+        now = time.time()
+        ttls = {"audio": settings.AUDIO_TTL_SECONDS, "pdf": settings.PDF_TTL_SECONDS}
+
+        kept: list[StoredFile] = []
+        for kind in self.directories:
+            files = self._iter_files(kind)
+            while batch := await executors.run_io(self._next_batch, files):
+                expired = [f for f in batch if now - f.modified_at > ttls[kind]]
+                kept.extend(f for f in batch if now - f.modified_at <= ttls[kind])
+                if expired:
+                    reclaimed += await executors.run_io(
+                        self._remove_all, expired, "ttl"
+                    )
+
+        # shared files are freed with the cache entry, only the rest counts
+        usage = sum(f.size for f in kept if not f.shared)
+        if usage > settings.STORAGE_MAX_BYTES:
+            evicted: list[StoredFile] = []
+            candidates = sorted(
+                (f for f in kept if not f.shared and not f.partial),
+                key=lambda f: f.accessed_at,
+            )
+            for stored_file in candidates:
+                if usage <= settings.STORAGE_MAX_BYTES:
+                    break
+                evicted.append(stored_file)
+                usage -= stored_file.size
+
+            for i in range(0, len(evicted), settings.STORAGE_SWEEP_BATCH_SIZE):
+                batch = evicted[i : i + settings.STORAGE_SWEEP_BATCH_SIZE]
+                reclaimed += await executors.run_io(self._remove_all, batch, "quota")
+
+        elapsed = time.monotonic() - started
+        with self._lock:
+            self.sweeps += 1
+            self.usage_bytes = usage
+            self.last_sweep_at = time.time()
+            self.last_sweep_seconds = round(elapsed, 3)
+        metrics.storage_bytes.set(usage)
+
+        if reclaimed:
+            logger.info(f"Storage sweep reclaimed {reclaimed} bytes in {elapsed:.2f}s")
+        return reclaimed
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Get disk usage and reclaimed bytes by reason.
+        """
+        with self._lock:
+            return {
+                "usage_bytes": self.usage_bytes,
+                "max_bytes": settings.STORAGE_MAX_BYTES,
+                "files_removed": self.files_removed,
+                "reclaimed_bytes": dict(self.reclaimed_bytes),
+                "reclaimed_bytes_total": sum(self.reclaimed_bytes.values()),
+                "sweeps": self.sweeps,
+                "last_sweep_at": self.last_sweep_at,
+                "last_sweep_seconds": self.last_sweep_seconds,
+            }
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception as ex:
+                logger.exception(f"Storage sweep failed: {str(ex)}")
+
+            await asyncio.sleep(settings.STORAGE_SWEEP_INTERVAL_SECONDS)
+
+    def _next_batch(self, files: Iterator[StoredFile]) -> list[StoredFile]:
+        """
+        Stat the next files of a scan, up to the sweep batch size.
+        """
+        return list(islice(files, settings.STORAGE_SWEEP_BATCH_SIZE))
+
+    def _iter_files(self, kind: str) -> Iterator[StoredFile]:
+        directory = self.directories[kind]
+        if not directory.exists():
+            return
+
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    stat_result = entry.stat(follow_symlinks=False)
+                except FileNotFoundError:
+                    continue
+
+                yield StoredFile(
+                    path=entry.path,
+                    kind=kind,
+                    size=stat_result.st_size,
+                    accessed_at=stat_result.st_atime,
+                    modified_at=stat_result.st_mtime,
+                    shared=stat_result.st_nlink > 1,
+                    partial=entry.name.startswith(".") or entry.name.endswith(".part"),
+                )
+
+    def _remove_all(self, files: list[StoredFile], reason: str) -> int:
+        return sum(self._remove(stored_file.path, reason) for stored_file in files)
+
+    def _remove(self, file_path: str, reason: str) -> int:
+        """
+        Delete a file and count the bytes it frees.
+        """
+        try:
+            stat_result = os.stat(file_path)
+            os.unlink(file_path)
+        except FileNotFoundError:
+            return 0
+        except OSError as ex:
+            logger.warning(f"Failed to remove {file_path}: {str(ex)}")
+            return 0
+
+        # a file still linked elsewhere frees no blocks
+        freed = stat_result.st_size if stat_result.st_nlink == 1 else 0
+        with self._lock:
+            self.files_removed += 1
+            self.reclaimed_bytes[reason] = self.reclaimed_bytes.get(reason, 0) + freed
+        metrics.storage_reclaimed_bytes.labels(reason=reason).inc(freed)
+
+        logger.debug(f"Removed {file_path} ({reason}, {freed} bytes freed)")
+        return freed
+
+
+lifecycle_service = LifecycleService()
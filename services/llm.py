@@ -1,12 +1,35 @@
+import os
 import json
+import shutil
+import asyncio
 import logging
 from typing import Any
-from openai import OpenAI
+from pathlib import Path
+
+import httpx
+from openai import AsyncOpenAI
 
 from core.config import settings
+from core.executors import executors
+from core.metrics import metrics
+from services.audio import split_audio
+from services.ratelimit import openai_scheduler
+from services.transcription import create_transcription_backend
+from services.vad import SpeechTimeline
+from services.renderer import template_renderer
+from utils.helpers import (
+    estimate_tokens,
+    format_timestamp,
+    stitch_transcripts,
+    split_text_by_tokens,
+)
+from utils.progress import ProgressCallback
 from constants.llm import (
     ANALYSIS_SYSTEM_PROMPT,
     ANALYSIS_USER_PROMPT,
+    CHUNK_ANALYSIS_USER_PROMPT,
+    REDUCE_ANALYSIS_SYSTEM_PROMPT,
+    REDUCE_ANALYSIS_USER_PROMPT,
     PDF_SYSTEM_PROMPT,
     PDF_USER_PROMPT,
 )
@@ -18,18 +41,56 @@ class LLMService:
     """Service for handling OpenAI API interactions."""
 
     def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        # one pooled transport shared by every in-flight request on this worker
+        self.http_client = httpx.AsyncClient(
+            timeout=settings.OPENAI_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        )
+        self.client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL,
+            http_client=self.http_client,
+            # retries go through the shared scheduler so they respect the rate budgets
+            max_retries=0,
+        )
+        self.transcriber = create_transcription_backend(self.client)
 
-    async def transcribe_audio(self, audio_file_path: str) -> str:
+    async def close(self) -> None:
         """
-        Transcribe audio file using OpenAI Whisper.
+        Close the shared HTTP transport and the transcription backend.
+        """
+        await self.transcriber.close()
+        await self.client.close()
+
+    async def transcribe_audio(
+        self,
+        audio_file_path: str,
+        duration: float | None = None,
+        on_progress: ProgressCallback | None = None,
+    ) -> str:
+        """
+        Transcribe audio file with the configured transcription backend.
+
+        For the OpenAI backend, files over the chunk size or length cap are
+        split at silences into overlapping segments that are transcribed
+        concurrently and stitched. Without a duration, only the size is
+        checked. on_progress is called with transcribed and total segments.
         """
         try:
-            with open(audio_file_path, "rb") as audio_file:
-                transcript = self.client.audio.transcriptions.create(
-                    model=settings.WHISPER_MODEL,
-                    file=audio_file,
-                    response_format="text",
+            file_size = os.path.getsize(audio_file_path)
+            fits_one_request = file_size <= settings.WHISPER_CHUNK_MAX_BYTES and (
+                not duration or duration <= settings.WHISPER_CHUNK_MAX_SECONDS
+            )
+            if not self.transcriber.chunked or fits_one_request:
+                transcript = await self.transcribe_file(audio_file_path)
+                if on_progress:
+                    on_progress(1, 1)
+            else:
+                transcript = await self._transcribe_chunked(
+                    audio_file_path, on_progress
                 )
 
             logger.info(f"Successfully transcribed audio file: {audio_file_path}")
@@ -40,39 +101,295 @@ class LLMService:
             logger.exception(f"Error transcribing audio: {str(ex)}")
             raise ValueError(f"Failed to transcribe audio: {str(ex)}")
 
+    async def transcribe_file(self, audio_file_path: str) -> str:
+        """
+        Transcribe a single audio file in one backend call.
+        """
+        return await self.transcriber.transcribe(audio_file_path)
+
+    async def _transcribe_chunked(
+        self, audio_file_path: str, on_progress: ProgressCallback | None = None
+    ) -> str:
+        """
+        Split audio into segments, transcribe them concurrently and stitch the text.
+        """
+        # keep each exported segment under the upload size cap
+        bytes_per_second = settings.WHISPER_CHUNK_BITRATE_KBPS * 1000 / 8
+        max_seconds = min(
+            settings.WHISPER_CHUNK_MAX_SECONDS,
+            settings.WHISPER_CHUNK_MAX_BYTES / bytes_per_second,
+        )
+
+        audio_path = Path(audio_file_path)
+        segments_dir = audio_path.with_name(f"{audio_path.stem}_segments")
+
+        try:
+            with metrics.stage_duration.labels(stage="transcode").time():
+                segments = await executors.run_cpu(
+                    split_audio,
+                    audio_file_path,
+                    str(segments_dir),
+                    max_seconds,
+                    settings.WHISPER_CHUNK_OVERLAP_SECONDS,
+                    settings.WHISPER_CHUNK_BITRATE_KBPS,
+                )
+
+            semaphore = asyncio.Semaphore(settings.WHISPER_MAX_PARALLEL)
+            transcribed = 0
+
+            async def transcribe_segment(segment: dict[str, Any]) -> str:
+                nonlocal transcribed
+                async with semaphore:
+                    text = await self.transcribe_file(segment["path"])
+
+                transcribed += 1
+                if on_progress:
+                    on_progress(transcribed, len(segments))
+                return text
+
+            texts = await asyncio.gather(
+                *(transcribe_segment(segment) for segment in segments)
+            )
+            logger.info(f"Transcribed {len(segments)} segments of {audio_file_path}")
+
+        finally:
+            shutil.rmtree(segments_dir, ignore_errors=True)
+
+        return stitch_transcripts(
+            [
+                (text, segment["start"], segment["end"])
+                for text, segment in zip(texts, segments)
+            ]
+        )
+
     async def analyze_content(
-        self, transcript: str, video_info: dict[str, Any]
+        self,
+        transcript: str,
+        video_info: dict[str, Any],
+        on_progress: ProgressCallback | None = None,
+        speech_timeline: SpeechTimeline | None = None,
     ) -> dict[str, Any]:
         """
         Analyze transcript and generate actionable insights.
+
+        Transcripts over the single-call token budget are analyzed per chapter
+        or token window concurrently, then merged with a reduce call.
+        on_progress is called with completed and total completion calls.
+        speech_timeline is given when non-speech was cut from the audio.
+        """
+        try:
+            transcript_tokens = estimate_tokens(
+                transcript, settings.ANALYSIS_CHARS_PER_TOKEN
+            )
+
+            if transcript_tokens <= settings.ANALYSIS_SINGLE_CALL_MAX_TOKENS:
+                user_prompt = self.build_analysis_prompt(video_info, transcript)
+                analysis = await self._complete_analysis(
+                    ANALYSIS_SYSTEM_PROMPT, user_prompt
+                )
+                if on_progress:
+                    on_progress(1, 1)
+            else:
+                analysis = await self._analyze_map_reduce(
+                    transcript, video_info, on_progress, speech_timeline
+                )
+
+            logger.info("Successfully analyzed content with GPT")
+            logger.info(f"Analysis JSON \n\n: {json.dumps(analysis, indent=4)}")
+            return analysis
+
+        except Exception as ex:
+            logger.exception(f"Error analyzing content: {str(ex)}")
+            raise ValueError(f"Failed to analyze content: {str(ex)}")
+
+    async def _complete_analysis(
+        self, system_prompt: str, user_prompt: str
+    ) -> dict[str, Any]:
+        """
+        Run one JSON-mode analysis completion.
         """
+        response = await self._create_chat_completion(
+            system_prompt, user_prompt, response_format={"type": "json_object"}
+        )
+
+        analysis_text = response.choices[0].message.content
+
         try:
-            user_prompt = self.build_analysis_prompt(video_info, transcript)
+            return json.loads(analysis_text)
+        except json.JSONDecodeError:
+            return self._parse_text_analysis(analysis_text)
+
+    async def _create_chat_completion(
+        self, system_prompt: str, user_prompt: str, **kwargs: Any
+    ) -> Any:
+        """
+        Run a chat completion through the shared rate limit scheduler.
+        """
+        estimated_tokens = (
+            estimate_tokens(
+                system_prompt + user_prompt, settings.ANALYSIS_CHARS_PER_TOKEN
+            )
+            + settings.OPENAI_OUTPUT_TOKENS_ESTIMATE
+        )
 
-            response = self.client.chat.completions.create(
+        return await openai_scheduler.run(
+            "chat",
+            lambda: self.client.chat.completions.create(
                 model=settings.GPT_MODEL,
                 messages=[
-                    {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT},
+                    {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt},
                 ],
                 temperature=0.3,
-                response_format={"type": "json_object"},
+                **kwargs,
+            ),
+            estimated_tokens,
+        )
+
+    async def _analyze_map_reduce(
+        self,
+        transcript: str,
+        video_info: dict[str, Any],
+        on_progress: ProgressCallback | None = None,
+        speech_timeline: SpeechTimeline | None = None,
+    ) -> dict[str, Any]:
+        """
+        Analyze transcript chunks concurrently and merge the partial analyses.
+        """
+        chunks = self.build_transcript_chunks(transcript, video_info, speech_timeline)
+        logger.info(f"Analyzing transcript in {len(chunks)} chunks")
+
+        semaphore = asyncio.Semaphore(settings.ANALYSIS_MAX_PARALLEL)
+        # one call per chunk plus the reduce call
+        total_calls = len(chunks) + 1
+        completed_calls = 0
+
+        async def analyze_chunk(index: int, chunk: dict[str, Any]) -> dict[str, Any]:
+            nonlocal completed_calls
+            async with semaphore:
+                analysis = await self.analyze_chunk(
+                    video_info, chunk, index, len(chunks)
+                )
+
+            completed_calls += 1
+            if on_progress:
+                on_progress(completed_calls, total_calls)
+            return analysis
+
+        partial_analyses = await asyncio.gather(
+            *(analyze_chunk(i, chunk) for i, chunk in enumerate(chunks, 1))
+        )
+
+        analysis = await self.reduce_analyses(video_info, partial_analyses)
+        if on_progress:
+            on_progress(total_calls, total_calls)
+        return analysis
+
+    async def analyze_chunk(
+        self, video_info: dict[str, Any], chunk: dict[str, Any], index: int, total: int
+    ) -> dict[str, Any]:
+        """
+        Analyze one transcript chunk of a longer video.
+        """
+        user_prompt = self.build_chunk_analysis_prompt(video_info, chunk, index, total)
+        return await self._complete_analysis(ANALYSIS_SYSTEM_PROMPT, user_prompt)
+
+    async def reduce_analyses(
+        self, video_info: dict[str, Any], partial_analyses: list[dict[str, Any]]
+    ) -> dict[str, Any]:
+        """
+        Merge partial chunk analyses, in video order, into one analysis.
+        """
+        user_prompt = self.build_reduce_analysis_prompt(video_info, partial_analyses)
+        return await self._complete_analysis(REDUCE_ANALYSIS_SYSTEM_PROMPT, user_prompt)
+
+    def build_transcript_chunks(
+        self,
+        transcript: str,
+        video_info: dict[str, Any],
+        speech_timeline: SpeechTimeline | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Split a transcript by video chapters, or by token windows without chapters.
+
+        The transcript has no timestamps, so chapter boundaries are mapped to
+        character offsets in proportion to the video duration, or to the
+        speech kept before them when non-speech was cut. Chapters over the
+        chunk budget are split further into token windows.
+        """
+        chapters = video_info.get("chapters") or []
+        duration = video_info.get("duration") or 0
+
+        def position(time: float) -> float:
+            if speech_timeline and speech_timeline.kept_seconds:
+                return speech_timeline.to_stripped(time) / speech_timeline.kept_seconds
+            return time / duration
+
+        if not chapters or not duration:
+            windows = split_text_by_tokens(
+                transcript,
+                settings.ANALYSIS_CHUNK_TOKENS,
+                settings.ANALYSIS_CHARS_PER_TOKEN,
+            )
+            window_duration = duration / len(windows)
+            chunks = [
+                {
+                    "title": f"Part {i}",
+                    "start_time": (i - 1) * window_duration,
+                    "end_time": i * window_duration,
+                    "text": text,
+                }
+                for i, text in enumerate(windows, 1)
+            ]
+            if speech_timeline and speech_timeline.kept_seconds:
+                # windows split the speech evenly, not the original timeline
+                window_speech = speech_timeline.kept_seconds / len(windows)
+                for i, chunk in enumerate(chunks):
+                    chunk["start_time"] = speech_timeline.to_original(i * window_speech)
+                    chunk["end_time"] = speech_timeline.to_original(
+                        (i + 1) * window_speech
+                    )
+            return chunks
+
+        chunks = []
+        for i, chapter in enumerate(chapters):
+            start_time = chapter.get("start_time", 0)
+            end_time = chapter.get("end_time") or duration
+            start = self._snap_to_word(transcript, position(start_time))
+            end = (
+                len(transcript)
+                if i == len(chapters) - 1
+                else self._snap_to_word(transcript, position(end_time))
             )
 
-            analysis_text = response.choices[0].message.content
+            text = transcript[start:end].strip()
+            if not text:
+                continue
 
-            try:
-                analysis = json.loads(analysis_text)
-            except json.JSONDecodeError:
-                analysis = self._parse_text_analysis(analysis_text)
+            windows = split_text_by_tokens(
+                text,
+                settings.ANALYSIS_CHUNK_TOKENS,
+                settings.ANALYSIS_CHARS_PER_TOKEN,
+            )
+            for window in windows:
+                chunks.append(
+                    {
+                        "title": chapter.get("title", f"Chapter {i + 1}"),
+                        "start_time": start_time,
+                        "end_time": end_time,
+                        "text": window,
+                    }
+                )
 
-            logger.info("Successfully analyzed content with GPT")
-            logger.info(f"Analysis JSON \n\n: {json.dumps(analysis, indent=4)}")
-            return analysis
+        return chunks
 
-        except Exception as ex:
-            logger.exception(f"Error analyzing content: {str(ex)}")
-            raise ValueError(f"Failed to analyze content: {str(ex)}")
+    def _snap_to_word(self, text: str, fraction: float) -> int:
+        """
+        Map a fraction of the text length to the nearest following word boundary.
+        """
+        offset = int(len(text) * min(max(fraction, 0.0), 1.0))
+        boundary = text.find(" ", offset)
+        return len(text) if boundary == -1 else boundary
 
     def _parse_text_analysis(self, text: str) -> dict[str, Any]:
         """
@@ -109,13 +426,8 @@ class LLMService:
         try:
             user_prompt = self.build_pdf_prompt(analysis, video_info)
 
-            response = self.client.chat.completions.create(
-                model=settings.GPT_MODEL,
-                messages=[
-                    {"role": "system", "content": PDF_SYSTEM_PROMPT},
-                    {"role": "user", "content": user_prompt},
-                ],
-                temperature=0.3,
+            response = await self._create_chat_completion(
+                PDF_SYSTEM_PROMPT, user_prompt
             )
 
             html_content = response.choices[0].message.content
@@ -127,25 +439,7 @@ class LLMService:
 
         except Exception as ex:
             logger.exception(f"Error generating PDF content: {str(ex)}")
-            return self._generate_fallback_html(analysis, video_info)
-
-    def _format_duration(self, seconds: int) -> str:
-        """
-        Format duration from seconds to readable format.
-        """
-        if not seconds:
-            return "Unknown"
-
-        hours = seconds // 3600
-        minutes = (seconds % 3600) // 60
-        seconds = seconds % 60
-
-        if hours > 0:
-            return f"{hours}h {minutes}m {seconds}s"
-        elif minutes > 0:
-            return f"{minutes}m {seconds}s"
-        else:
-            return f"{seconds}s"
+            return template_renderer.render(analysis, video_info)
 
     def _clean_markdown_code_blocks(self, content: str) -> str:
         """
@@ -164,66 +458,6 @@ class LLMService:
 
         return content.strip()
 
-    def _generate_fallback_html(
-        self, analysis: dict[str, Any], video_info: dict[str, Any]
-    ) -> str:
-        """
-        Generate fallback HTML content if GPT generation fails.
-        """
-        return f"""
-        <style>
-            body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; line-height: 1.6; margin: 0; padding: 20px; }}
-            .header {{ text-align: center; border-bottom: 2px solid #333; padding-bottom: 20px; margin-bottom: 30px; }}
-            .title {{ color: #333; font-size: 28px; margin-bottom: 10px; }}
-            .meta {{ color: #666; font-size: 14px; }}
-            .section {{ margin-bottom: 30px; }}
-            .section h2 {{ color: #333; border-left: 4px solid #007acc; padding-left: 15px; }}
-            .section h3 {{ color: #555; }}
-            ul {{ padding-left: 20px; }}
-            li {{ margin-bottom: 5px; }}
-            .summary {{ background-color: #f8f9fa; padding: 20px; border-radius: 5px; margin-bottom: 20px; }}
-        </style>
-
-        <div class="header">
-            <h1 class="title">{video_info.get("title", "Video Analysis")}</h1>
-            <div class="meta">
-                <p>Duration: {self._format_duration(video_info.get("duration", 0))} |
-                   Uploader: {video_info.get("uploader", "Unknown")}</p>
-            </div>
-        </div>
-
-        <div class="summary">
-            <h2>Executive Summary</h2>
-            <p>{analysis.get("executive_summary", "Comprehensive analysis of video content.")}</p>
-        </div>
-
-        <div class="section">
-            <h2>Main Takeaways</h2>
-            <ul>
-                {"".join(f"<li>{takeaway}</li>" for takeaway in analysis.get("main_takeaways", []))}
-            </ul>
-        </div>
-
-        <div class="section">
-            <h2>Key Concepts</h2>
-            <ul>
-                {"".join(f"<li>{concept}</li>" for concept in analysis.get("key_concepts", []))}
-            </ul>
-        </div>
-
-        <div class="section">
-            <h2>Actionable Insights</h2>
-            <ul>
-                {"".join(f"<li>{insight}</li>" for insight in analysis.get("actionable_insights", []))}
-            </ul>
-        </div>
-
-        <div class="section">
-            <h2>Detailed Summary</h2>
-            <p>{analysis.get("detailed_summary", "Detailed analysis not available.")}</p>
-        </div>
-        """
-
     def build_analysis_prompt(self, video_info: dict[str, Any], transcript: str) -> str:
         """
         Build analysis prompt for the LLM.
@@ -236,6 +470,38 @@ class LLMService:
             transcript=transcript,
         )
 
+    def build_chunk_analysis_prompt(
+        self, video_info: dict[str, Any], chunk: dict[str, Any], index: int, total: int
+    ) -> str:
+        """
+        Build analysis prompt for one transcript chunk.
+        """
+        return CHUNK_ANALYSIS_USER_PROMPT.format(
+            title=video_info.get("title", "N/A"),
+            duration=video_info.get("duration", "N/A"),
+            uploader=video_info.get("uploader", "N/A"),
+            index=index,
+            total=total,
+            section_title=chunk["title"],
+            start_time=format_timestamp(chunk["start_time"]),
+            end_time=format_timestamp(chunk["end_time"]),
+            transcript=chunk["text"],
+        )
+
+    def build_reduce_analysis_prompt(
+        self, video_info: dict[str, Any], partial_analyses: list[dict[str, Any]]
+    ) -> str:
+        """
+        Build prompt merging partial chunk analyses into one analysis.
+        """
+        return REDUCE_ANALYSIS_USER_PROMPT.format(
+            title=video_info.get("title", "N/A"),
+            duration=video_info.get("duration", "N/A"),
+            uploader=video_info.get("uploader", "N/A"),
+            description=(video_info.get("description") or "N/A")[:500],
+            partial_analyses=json.dumps(partial_analyses, indent=2),
+        )
+
     def build_pdf_prompt(
         self, analysis: dict[str, Any], video_info: dict[str, Any]
     ) -> str:
@@ -248,8 +514,8 @@ class LLMService:
         if chapters and len(chapters) > 0:
             chapters_section = "\nVideo Chapters:"
             for i, chapter in enumerate(chapters, 1):
-                start_time = self._format_timestamp(chapter.get("start_time", 0))
-                end_time = self._format_timestamp(chapter.get("end_time", 0))
+                start_time = format_timestamp(chapter.get("start_time", 0))
+                end_time = format_timestamp(chapter.get("end_time", 0))
                 title = chapter.get("title", f"Chapter {i}")
                 chapters_section += f"\n  {i}. {title} ({start_time} - {end_time})"
 
@@ -262,21 +528,5 @@ class LLMService:
             analysis=analysis,
         )
 
-    def _format_timestamp(self, seconds: float) -> str:
-        """
-        Format timestamp from seconds to HH:MM:SS or MM:SS.
-        """
-        if not seconds:
-            return "00:00"
-
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-
-        if hours > 0:
-            return f"{hours:02d}:{minutes:02d}:{secs:02d}"
-        else:
-            return f"{minutes:02d}:{secs:02d}"
-
 
 llm_service = LLMService()
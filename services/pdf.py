@@ -1,17 +1,22 @@
 import os
+import re
+import shutil
+import threading
 import logging
 from typing import Any
 from pathlib import Path
 
-from weasyprint import HTML, CSS  # noqa
-from weasyprint.text.fonts import FontConfiguration
-
 from core.config import settings
-from constants.pdf import PDF_CSS
-from utils.helpers import sanitize_filename
+from services.render_pool import render_pool
+from utils.helpers import sanitize_filename, atomic_write_path, file_digest
+from utils.html_normalizer import normalize_html
 
 logger = logging.getLogger(__name__)
 
+# hex characters of the content hash in download filenames
+CONTENT_HASH_LENGTH = 16
+CONTENT_HASH_PATTERN = re.compile(rf"^(.+)\.([0-9a-f]{{{CONTENT_HASH_LENGTH}}})\.pdf$")
+
 
 class PDFService:
     """Service for handling PDF generation from HTML content."""
@@ -20,39 +25,137 @@ class PDFService:
         self.output_dir = Path(settings.UPLOAD_DIR) / "pdfs"
         self.output_dir.mkdir(exist_ok=True, parents=True)
 
-        self.font_config = FontConfiguration()
+        # filename -> (mtime, size, SHA-256) of the PDFs hashed so far
+        self.digests: dict[str, tuple[int, int, str]] = {}
+        self._lock = threading.Lock()
 
-    def generate_pdf(self, html_content: str, video_info: dict[str, Any]) -> str:
+    def generate_pdf(
+        self, html_content: str, video_info: dict[str, Any], renderer: str
+    ) -> tuple[str, int | None]:
         """
-        Generate PDF from HTML content.
+        Generate PDF from HTML content, written with the PDF_OPTIMIZATION options.
+
+        Returns the PDF path and, with PDF_MEASURE_ORIGINAL_SIZE, the size
+        it would have had without optimization.
+
+        Each render replaces the previous PDF of the video and renderer, so
+        re-renders leave no stale files behind. Downloads use a name with
+        the content hash, so a download URL always refers to the same bytes.
         """
+        render_path = self.output_dir / (
+            f".{video_info.get('id', 'unknown')}.{os.getpid()}"
+            f".{threading.get_ident()}.render.pdf"
+        )
         try:
-            title = sanitize_filename(video_info.get("title", "video_notes"))
-            video_id = video_info.get("id", "unknown")
-            output_filename = f"{title}_{video_id}_notes.pdf"
 
-            output_path = self.output_dir / output_filename
-
-            styled_html = self._add_professional_styling(html_content)
+            styled_html = self._add_professional_styling(
+                normalize_html(html_content, drop_images=settings.PDF_DROP_IMAGES)
+            )
 
             # with open("styled_html.html", "w") as f:
             #     f.write(styled_html)
 
-            html_doc = HTML(string=styled_html)
+            original_size = render_pool.render(styled_html, str(render_path))
 
-            html_doc.write_pdf(
-                str(output_path),
-                font_config=self.font_config,
-                presentational_hints=True,
-            )
+            digest = file_digest(render_path)
+            output_path = self.build_output_path(video_info, renderer)
+            os.replace(render_path, output_path)
+            self._record_digest(output_path, digest)
 
             logger.info(f"Successfully generated PDF: {output_path}")
-            return str(output_path)
+            return str(output_path), original_size
 
         except Exception as ex:
             logger.exception(f"Error generating PDF: {str(ex)}")
             raise ValueError(f"Failed to generate PDF: {str(ex)}")
 
+        finally:
+            render_path.unlink(missing_ok=True)
+
+    def build_output_path(self, video_info: dict[str, Any], renderer: str) -> Path:
+        """
+        Build the output path of the PDF for a video and renderer.
+        """
+        title = sanitize_filename(video_info.get("title", "video_notes"))
+        video_id = video_info.get("id", "unknown")
+        return self.output_dir / f"{title}_{video_id}_{renderer}_notes.pdf"
+
+    def restore_pdf(
+        self,
+        source_path: str,
+        video_info: dict[str, Any],
+        renderer: str,
+        digest: str | None = None,
+    ) -> str:
+        """
+        Put a previously generated PDF back at its output path unless it is already there.
+
+        digest is the SHA-256 stored with the cached PDF, which is only
+        computed here for cache entries written without one.
+        """
+        output_path = self.build_output_path(video_info, renderer)
+
+        try:
+            restored = os.path.samefile(source_path, output_path)
+        except FileNotFoundError:
+            restored = False
+
+        if not restored:
+            with atomic_write_path(output_path) as tmp_path:
+                try:
+                    os.link(source_path, tmp_path)
+                except OSError:
+                    shutil.copyfile(source_path, tmp_path)
+            logger.info(f"Restored PDF from cache: {output_path}")
+
+        self._record_digest(output_path, digest or file_digest(output_path))
+        return str(output_path)
+
+    def public_filename(self, pdf_path: str | Path) -> str:
+        """
+        Get the download filename of a PDF, which carries its content hash.
+        """
+        pdf_path = Path(pdf_path)
+        digest = self.digest(pdf_path)[:CONTENT_HASH_LENGTH]
+        return f"{pdf_path.stem}.{digest}.pdf"
+
+    def resolve_filename(self, filename: str) -> tuple[Path, str | None]:
+        """
+        Get the file a download filename refers to and the content hash it carries, if any.
+        """
+        match = CONTENT_HASH_PATTERN.match(filename)
+        if match:
+            return self.output_dir / f"{match.group(1)}.pdf", match.group(2)
+        return self.output_dir / filename, None
+
+    def digest(self, pdf_path: Path, stat_result: os.stat_result | None = None) -> str:
+        """
+        Get the SHA-256 of a PDF, hashing it only if it changed since it was last hashed.
+        """
+        stat_result = stat_result or pdf_path.stat()
+        with self._lock:
+            known = self.digests.get(pdf_path.name)
+        if known and known[:2] == (stat_result.st_mtime_ns, stat_result.st_size):
+            return known[2]
+
+        digest = file_digest(pdf_path)
+        self._record_digest(pdf_path, digest, stat_result)
+        return digest
+
+    def _record_digest(
+        self,
+        pdf_path: Path,
+        digest: str,
+        stat_result: os.stat_result | None = None,
+    ) -> None:
+        stat_result = stat_result or pdf_path.stat()
+        with self._lock:
+            self.digests[pdf_path.name] = (
+                stat_result.st_mtime_ns,
+                stat_result.st_size,
+                digest,
+            )
+
     def _add_professional_styling(self, html_content: str) -> str:
         """
         Add comprehensive professional styling to HTML content.
@@ -65,7 +168,6 @@ class PDFService:
             <meta charset="UTF-8">
             <meta name="viewport" content="width=device-width, initial-scale=1.0">
             <title>YouTube Video Analysis</title>
-            {PDF_CSS}
         </head>
         <body>
             {html_content}
@@ -85,11 +187,15 @@ class PDFService:
         try:
             if os.path.exists(pdf_path):
                 os.unlink(pdf_path)
+                with self._lock:
+                    self.digests.pop(os.path.basename(pdf_path), None)
                 logger.info(f"Cleaned up PDF: {pdf_path}")
         except Exception as ex:
             logger.warning(f"Failed to cleanup PDF {pdf_path}: {str(ex)}")
 
-    def get_pdf_info(self, pdf_path: str) -> dict[str, Any]:
+    def get_pdf_info(
+        self, pdf_path: str, original_size: int | None = None
+    ) -> dict[str, Any]:
         """
         Get information about generated PDF.
         """
@@ -102,8 +208,9 @@ class PDFService:
             return {
                 "file_size": file_stats.st_size,
                 "file_size_mb": round(file_stats.st_size / (1024 * 1024), 2),
+                "original_file_size": original_size,
                 "created_at": file_stats.st_ctime,
-                "filename": os.path.basename(pdf_path),
+                "filename": self.public_filename(pdf_path),
             }
 
         except Exception as ex:
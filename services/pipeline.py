@@ -0,0 +1,546 @@
+import time
+import asyncio
+import logging
+from typing import Any, Callable
+from pathlib import Path
+
+from core.config import settings
+from core.executors import executors
+from core.metrics import metrics
+from services.llm import llm_service
+from services.cache import result_cache
+from services.renderer import template_renderer
+from services.pdf import pdf_service
+from services.lifecycle import lifecycle_service
+from services.compression import compress_transcript
+from services.vad import SpeechTimeline, strip_non_speech
+from services.youtube import youtube_service
+from utils.helpers import stitch_transcripts
+from utils.timing import StageTimer
+from utils.progress import ProgressReporter
+from schemas.convert import (
+    PDFInfo,
+    VideoInfo,
+    HTMLRenderer,
+    ConvertRequest,
+    ConvertResponse,
+    ContentAnalysis,
+    ProcessingStatus,
+    TranscriptSource,
+    VADReport,
+    CompressionReport,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineService:
+    """Service running the full YouTube to PDF conversion pipeline."""
+
+    async def run(
+        self,
+        request: ConvertRequest,
+        on_event: Callable[[dict[str, Any]], None] | None = None,
+    ) -> ConvertResponse:
+        """
+        Run download, transcription, analysis and PDF generation for a video.
+
+        on_event receives stage and progress events, possibly from executor
+        threads. Concurrent requests for the same video are merged before
+        they get here, by JobService.submit.
+        """
+        start_time = time.time()
+        url = str(request.url)
+        renderer = request.renderer or HTMLRenderer(settings.HTML_RENDERER)
+
+        logger.info(f"Starting conversion for URL: {url}")
+
+        # validate yt url
+        if not youtube_service.validate_youtube_url(url):
+            raise ValueError("Invalid YouTube URL provided")
+
+        video_id = youtube_service.extract_video_id(url)
+        return await self._convert(
+            url, video_id, renderer, ProgressReporter(on_event), start_time
+        )
+
+    async def _convert(
+        self,
+        url: str,
+        video_id: str | None,
+        renderer: HTMLRenderer,
+        progress: ProgressReporter,
+        start_time: float,
+    ) -> ConvertResponse:
+        """
+        Convert a video, serving it from the result cache when possible.
+        """
+        # serve repeat conversions from the result cache
+        if video_id:
+            cached = await executors.run_io(result_cache.get, video_id, renderer)
+            if cached:
+                return await self._build_cached_response(cached, renderer, start_time)
+
+        timer = StageTimer()
+
+        # extract video information
+        logger.info("Extracting video metadata...")
+        progress.stage("extract")
+        with timer.stage("extract"):
+            video_info_dict = await executors.run_io(
+                youtube_service.extract_video_info, url
+            )
+        video_info = VideoInfo(**video_info_dict)
+
+        # use the video's captions instead of transcribing when allowed
+        captions = None
+        if settings.TRANSCRIPT_SOURCE != "whisper":
+            logger.info("Fetching captions...")
+            progress.stage("captions")
+            with timer.stage("captions"):
+                captions = await executors.run_io(
+                    youtube_service.download_captions, url, video_info_dict
+                )
+            if captions:
+                try:
+                    self._check_transcript(captions["transcript"])
+                except ValueError:
+                    if settings.TRANSCRIPT_SOURCE == "captions":
+                        raise
+                    # too little caption text is handled like no captions
+                    logger.warning("Captions are too short, transcribing instead")
+                    captions = None
+            if not captions and settings.TRANSCRIPT_SOURCE == "captions":
+                raise ValueError("No usable captions found for this video")
+
+        duration = video_info_dict.get("duration") or 0
+        vad_report = None
+        compression_report = None
+        if captions:
+            transcript_source = (
+                TranscriptSource.AUTOMATIC_CAPTIONS
+                if captions["automatic"]
+                else TranscriptSource.CAPTIONS
+            )
+            transcript = captions["transcript"]
+            analysis_dict, compression_report = await self._analyze(
+                transcript, video_info_dict, timer, progress
+            )
+        else:
+            transcript_source = TranscriptSource.WHISPER
+            if (
+                settings.PIPELINE_MODE == "streaming"
+                and duration > settings.STREAMING_SEGMENT_SECONDS
+            ):
+                transcript, analysis_dict = await self._run_streaming(
+                    url, video_info_dict, timer, progress
+                )
+                metrics.audio_seconds.inc(duration)
+            else:
+                (
+                    transcript,
+                    analysis_dict,
+                    vad_report,
+                    compression_report,
+                ) = await self._run_sequential(url, video_info_dict, timer, progress)
+
+        analysis = ContentAnalysis(**analysis_dict)
+
+        # generate HTML content for PDF
+        logger.info("Generating PDF content...")
+        progress.stage("html")
+        with timer.stage("html"):
+            if renderer == HTMLRenderer.TEMPLATE:
+                html_content = template_renderer.render(analysis_dict, video_info_dict)
+            else:
+                html_content = await llm_service.generate_pdf_content(
+                    analysis_dict, video_info_dict
+                )
+
+        # create PDF
+        logger.info("Creating PDF document...")
+        progress.stage("render")
+        with timer.stage("render"):
+            pdf_file_path, original_size = await executors.run_io(
+                pdf_service.generate_pdf,
+                html_content,
+                video_info_dict,
+                renderer.value,
+            )
+
+        # get PDF information
+        pdf_info_dict = pdf_service.get_pdf_info(pdf_file_path, original_size)
+        pdf_info = PDFInfo(**pdf_info_dict)
+
+        await executors.run_io(
+            result_cache.put,
+            video_info_dict["id"],
+            renderer,
+            video_info_dict,
+            transcript,
+            analysis_dict,
+            html_content,
+            pdf_file_path,
+            pdf_service.digest(Path(pdf_file_path)),
+        )
+
+        processing_time = round(time.time() - start_time, 2)
+        stage_timings = timer.summary()
+
+        logger.info(f"Conversion completed successfully in {processing_time}s")
+        logger.info(f"Stage timings: {stage_timings}")
+
+        return ConvertResponse(
+            status=ProcessingStatus.COMPLETED,
+            message="PDF generated successfully",
+            video_info=video_info,
+            pdf_info=pdf_info,
+            analysis=analysis,
+            processing_time=processing_time,
+            stage_timings=stage_timings,
+            transcript_source=transcript_source,
+            vad=vad_report,
+            compression=compression_report,
+        )
+
+    async def _run_sequential(
+        self,
+        url: str,
+        video_info: dict[str, Any],
+        timer: StageTimer,
+        progress: ProgressReporter,
+    ) -> tuple[str, dict[str, Any], VADReport | None, CompressionReport | None]:
+        """
+        Download, transcribe and analyze one stage after another.
+
+        With VAD_ENABLED, non-speech is cut from the audio before it is
+        transcribed, and the report of what was cut is returned.
+        """
+        # download audio
+        logger.info("Downloading and processing audio...")
+        progress.stage("download")
+        with timer.stage("download"):
+            audio_file_path = await executors.run_io(
+                youtube_service.download_audio,
+                url,
+                video_info,
+                progress.callback("download"),
+            )
+
+        speech_timeline = None
+        if settings.VAD_ENABLED:
+            vad_started = time.perf_counter()
+            audio_file_path, speech_timeline = await self._strip_non_speech(
+                audio_file_path, timer, progress
+            )
+            vad_seconds = time.perf_counter() - vad_started
+
+        # transcribe audio
+        logger.info("Transcribing audio using Whisper...")
+        progress.stage("transcribe")
+        transcribe_started = time.perf_counter()
+        with timer.stage("transcribe"):
+            try:
+                transcript = await llm_service.transcribe_audio(
+                    audio_file_path,
+                    (
+                        speech_timeline.kept_seconds
+                        if speech_timeline
+                        else video_info.get("duration")
+                    ),
+                    progress.callback("transcribe"),
+                )
+            finally:
+                # the audio is not needed once transcription is done or failed
+                await executors.run_io(lifecycle_service.release, audio_file_path)
+        transcribe_seconds = time.perf_counter() - transcribe_started
+        metrics.audio_seconds.inc(
+            speech_timeline.kept_seconds
+            if speech_timeline
+            else video_info.get("duration") or 0
+        )
+
+        vad_report = None
+        if speech_timeline:
+            removed_seconds = speech_timeline.removed_seconds
+            # transcription time scales with audio length, so estimate what
+            # the removed seconds would have cost at this job's rate
+            saved = (
+                transcribe_seconds / speech_timeline.kept_seconds * removed_seconds
+                if speech_timeline.kept_seconds
+                else 0.0
+            )
+            vad_report = VADReport(
+                original_seconds=round(speech_timeline.original_seconds, 2),
+                speech_seconds=round(speech_timeline.kept_seconds, 2),
+                removed_seconds=round(removed_seconds, 2),
+                latency_saved_seconds=round(saved - vad_seconds, 2),
+            )
+            metrics.vad_removed_seconds.inc(removed_seconds)
+
+        self._check_transcript(transcript)
+
+        analysis, compression_report = await self._analyze(
+            transcript, video_info, timer, progress, speech_timeline
+        )
+
+        return transcript, analysis, vad_report, compression_report
+
+    async def _strip_non_speech(
+        self, audio_file_path: str, timer: StageTimer, progress: ProgressReporter
+    ) -> tuple[str, SpeechTimeline | None]:
+        """
+        Cut non-speech from downloaded audio on the process pool.
+
+        Returns the audio to transcribe and its timeline, or the original
+        audio and None when too little would be cut.
+        """
+        logger.info("Detecting speech in audio...")
+        progress.stage("vad")
+        audio_path = Path(audio_file_path)
+        speech_path = str(audio_path.with_name(f"{audio_path.stem}_speech.mp3"))
+
+        with timer.stage("vad"):
+            result = await executors.run_cpu(
+                strip_non_speech,
+                audio_file_path,
+                speech_path,
+                settings.SPEECH_BITRATE_KBPS,
+                settings.VAD_FRAME_MS,
+                settings.VAD_ENERGY_THRESHOLD_DB,
+                settings.VAD_SPEECH_BAND_RATIO,
+                settings.VAD_MIN_DYNAMICS_DB,
+                settings.VAD_MIN_GAP_SECONDS,
+                settings.VAD_PADDING_SECONDS,
+            )
+
+        speech_timeline = SpeechTimeline(result["spans"], result["original_seconds"])
+        removed_seconds = speech_timeline.removed_seconds
+        if not result["written"] or removed_seconds < settings.VAD_MIN_REMOVED_SECONDS:
+            # no speech found is more likely a detection miss than a silent video
+            if result["written"]:
+                await executors.run_io(lifecycle_service.release, speech_path)
+                logger.info(f"Keeping full audio, VAD would cut {removed_seconds:.0f}s")
+            else:
+                logger.info("No speech detected, keeping full audio")
+            return audio_file_path, None
+
+        await executors.run_io(lifecycle_service.release, audio_file_path)
+        logger.info(f"VAD cut {removed_seconds:.0f}s of non-speech")
+        return speech_path, speech_timeline
+
+    async def _analyze(
+        self,
+        transcript: str,
+        video_info: dict[str, Any],
+        timer: StageTimer,
+        progress: ProgressReporter,
+        speech_timeline: SpeechTimeline | None = None,
+    ) -> tuple[dict[str, Any], CompressionReport | None]:
+        """
+        Analyze a complete transcript.
+
+        With TRANSCRIPT_COMPRESSION_ENABLED, the transcript is compressed
+        first and the report of what was removed is returned.
+        """
+        compression_report = None
+        if settings.TRANSCRIPT_COMPRESSION_ENABLED:
+            transcript, compression_report = await self._compress(
+                transcript, timer, progress
+            )
+
+        logger.info("Analyzing content with GPT...")
+        progress.stage("analyze")
+        with timer.stage("analyze"):
+            analysis = await llm_service.analyze_content(
+                transcript, video_info, progress.callback("analyze"), speech_timeline
+            )
+
+        return analysis, compression_report
+
+    async def _compress(
+        self, transcript: str, timer: StageTimer, progress: ProgressReporter
+    ) -> tuple[str, CompressionReport]:
+        """
+        Shrink a transcript towards the compression token budget on the process pool.
+        """
+        logger.info("Compressing transcript...")
+        progress.stage("compress")
+        with timer.stage("compress"):
+            result = await executors.run_cpu(
+                compress_transcript,
+                transcript,
+                settings.TRANSCRIPT_COMPRESSION_TARGET_TOKENS
+                or settings.ANALYSIS_SINGLE_CALL_MAX_TOKENS,
+                settings.ANALYSIS_CHARS_PER_TOKEN,
+                settings.TRANSCRIPT_COMPRESSION_MIN_KEEP_RATIO,
+                settings.TRANSCRIPT_COMPRESSION_DUPLICATE_SIMILARITY,
+                settings.TRANSCRIPT_COMPRESSION_MAX_FEATURES,
+            )
+
+        original_tokens = result["original_tokens"]
+        compressed_tokens = result["compressed_tokens"]
+        compression_report = CompressionReport(
+            original_tokens=original_tokens,
+            compressed_tokens=compressed_tokens,
+            compression_ratio=(
+                round(compressed_tokens / original_tokens, 3)
+                if original_tokens
+                else 1.0
+            ),
+            disfluencies=result["disfluencies"],
+            duplicate_sentences=result["duplicate_sentences"],
+            dropped_sentences=result["dropped_sentences"],
+        )
+        metrics.compression_removed_tokens.inc(
+            max(original_tokens - compressed_tokens, 0)
+        )
+        return result["transcript"], compression_report
+
+    async def _run_streaming(
+        self,
+        url: str,
+        video_info: dict[str, Any],
+        timer: StageTimer,
+        progress: ProgressReporter,
+    ) -> tuple[str, dict[str, Any]]:
+        """
+        Download audio in time ranges and transcribe and analyze each range as soon as it arrives.
+        """
+        ranges = youtube_service.build_segment_ranges(
+            video_info["duration"],
+            settings.STREAMING_SEGMENT_SECONDS,
+            settings.WHISPER_CHUNK_OVERLAP_SECONDS,
+        )
+        logger.info(f"Streaming audio in {len(ranges)} segments...")
+        # download, transcription and analysis overlap, so all three start now
+        for stage in ("download", "transcribe", "analyze"):
+            progress.stage(stage)
+        counts = {"download": 0, "transcribe": 0, "analyze": 0}
+
+        def count(stage: str) -> None:
+            # segments plus the final reduce call for analysis
+            counts[stage] += 1
+            total = len(ranges) + 1 if stage == "analyze" else len(ranges)
+            progress.update(stage, counts[stage], total)
+
+        loop = asyncio.get_running_loop()
+        segments: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue()
+        transcribe_semaphore = asyncio.Semaphore(settings.WHISPER_MAX_PARALLEL)
+        analyze_semaphore = asyncio.Semaphore(settings.ANALYSIS_MAX_PARALLEL)
+
+        def on_segment(segment: dict[str, Any]) -> None:
+            # called from the download thread
+            loop.call_soon_threadsafe(segments.put_nowait, segment)
+            loop.call_soon_threadsafe(count, "download")
+
+        async def process_segment(segment: dict[str, Any]) -> tuple[str, dict]:
+            try:
+                async with transcribe_semaphore:
+                    with timer.stage("transcribe"):
+                        text = await llm_service.transcribe_file(segment["path"])
+            finally:
+                await executors.run_io(lifecycle_service.release, segment["path"])
+            count("transcribe")
+
+            chunk = {
+                "title": f"Part {segment['index'] + 1}",
+                "start_time": segment["start"],
+                "end_time": segment["end"],
+                "text": text,
+            }
+            async with analyze_semaphore:
+                with timer.stage("analyze"):
+                    analysis = await llm_service.analyze_chunk(
+                        video_info, chunk, segment["index"] + 1, len(ranges)
+                    )
+            count("analyze")
+
+            return text, analysis
+
+        download_started = time.perf_counter()
+        download = asyncio.ensure_future(
+            executors.run_io(
+                youtube_service.download_audio_segments,
+                url,
+                video_info,
+                ranges,
+                on_segment,
+            )
+        )
+        # the sentinel is queued after every segment the thread reported
+        download.add_done_callback(lambda _: segments.put_nowait(None))
+
+        received = []
+        tasks = []
+        try:
+            while (segment := await segments.get()) is not None:
+                received.append(segment)
+                tasks.append(asyncio.create_task(process_segment(segment)))
+
+            await download
+            timer.record("download", download_started, time.perf_counter())
+
+            results = await asyncio.gather(*tasks)
+
+        except BaseException:
+            download.cancel()
+            for task in tasks:
+                task.cancel()
+            raise
+
+        transcript = stitch_transcripts(
+            [
+                (text, segment["start"], segment["end"])
+                for segment, (text, _) in zip(received, results)
+            ]
+        )
+        self._check_transcript(transcript)
+
+        with timer.stage("analyze"):
+            analysis = await llm_service.reduce_analyses(
+                video_info, [analysis for _, analysis in results]
+            )
+        count("analyze")
+
+        return transcript, analysis
+
+    def _check_transcript(self, transcript: str) -> None:
+        if not transcript or len(transcript.strip()) < 50:
+            raise ValueError(
+                "Transcript is too short or empty. The video might not have clear audio."
+            )
+
+        logger.info(f"Transcription completed. Length: {len(transcript)} characters")
+
+    async def _build_cached_response(
+        self, cached: dict[str, Any], renderer: HTMLRenderer, start_time: float
+    ) -> ConvertResponse:
+        """
+        Build a conversion response from a cached result.
+        """
+        pdf_file_path = await executors.run_io(
+            pdf_service.restore_pdf,
+            cached["pdf_path"],
+            cached["video_info"],
+            renderer.value,
+            cached["pdf_digest"],
+        )
+        pdf_info_dict = pdf_service.get_pdf_info(pdf_file_path)
+
+        processing_time = round(time.time() - start_time, 2)
+
+        logger.info(f"Conversion served from cache in {processing_time}s")
+
+        return ConvertResponse(
+            status=ProcessingStatus.COMPLETED,
+            message="PDF generated successfully",
+            video_info=VideoInfo(**cached["video_info"]),
+            pdf_info=PDFInfo(**pdf_info_dict),
+            analysis=ContentAnalysis(**cached["analysis"]),
+            processing_time=processing_time,
+            cached=True,
+        )
+
+
+pipeline_service = PipelineService()
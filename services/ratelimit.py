@@ -0,0 +1,221 @@
+import time
+import random
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, TypeVar
+
+import openai
+
+from core.config import settings
+from core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,  # includes APITimeoutError
+    openai.InternalServerError,
+)
+
+
+class TokenBucket:
+    """Budget of units per minute that refills continuously."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.available = float(per_minute)
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.available = min(
+            self.capacity, self.available + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """
+        Seconds until amount units are available. Calls over the capacity wait for a full bucket.
+        """
+        missing = min(amount, self.capacity) - self.available
+        return max(missing / self.rate, 0.0)
+
+
+class RateLimiter:
+    """FIFO admission control of one API's calls to requests and tokens per minute budgets."""
+
+    def __init__(self, name: str, rpm: int, tpm: int | None = None):
+        self.name = name
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+        self.waiting = 0
+        self.admitted = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    async def acquire(self, tokens: int) -> None:
+        """
+        Wait until the call fits both budgets and no rate limit pause is active.
+        """
+        started = time.monotonic()
+        self.waiting += 1
+
+        try:
+            # one waiter at a time keeps admission in arrival order
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    self.requests.refill(now)
+                    delay = max(self.paused_until - now, self.requests.wait_time(1))
+                    if self.tokens:
+                        self.tokens.refill(now)
+                        delay = max(delay, self.tokens.wait_time(tokens))
+
+                    if delay <= 0:
+                        break
+                    await asyncio.sleep(delay)
+
+                self.requests.available -= 1
+                if self.tokens:
+                    self.tokens.available -= tokens
+
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - started
+        metrics.openai_queue_wait.labels(api=self.name).observe(waited)
+        self.admitted += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def settle(self, estimated: int, actual: int) -> None:
+        """
+        Correct the token budget once the real usage of a call is known.
+        """
+        if self.tokens:
+            self.tokens.available += estimated - actual
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hold back every call for a while, e.g. after a 429 with Retry-After.
+        """
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "admitted": self.admitted,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "queue_wait_seconds_total": round(self.wait_seconds_total, 3),
+            "queue_wait_seconds_avg": (
+                round(self.wait_seconds_total / self.admitted, 3)
+                if self.admitted
+                else 0.0
+            ),
+            "queue_wait_seconds_max": round(self.wait_seconds_max, 3),
+            "waiting": self.waiting,
+        }
+
+
+class OpenAIScheduler:
+    """Shared admission controller and retry policy for Whisper and chat calls."""
+
+    def __init__(self):
+        self.limiters = {
+            "whisper": RateLimiter("whisper", settings.OPENAI_WHISPER_RPM),
+            "chat": RateLimiter(
+                "chat", settings.OPENAI_CHAT_RPM, settings.OPENAI_CHAT_TPM
+            ),
+        }
+
+    async def run(
+        self,
+        kind: str,
+        request: Callable[[], Awaitable[T]],
+        estimated_tokens: int = 0,
+    ) -> T:
+        """
+        Run an API call once admitted, retrying retryable errors with jittered exponential backoff.
+
+        request is called again for every attempt, so it must build a fresh
+        request (e.g. reopen files) each time.
+        """
+        limiter = self.limiters[kind]
+
+        for attempt in range(settings.OPENAI_MAX_RETRIES + 1):
+            await limiter.acquire(estimated_tokens)
+
+            try:
+                response = await request()
+
+            except RETRYABLE_ERRORS as ex:
+                # nothing was used, give the tokens back
+                limiter.settle(estimated_tokens, 0)
+                if attempt == settings.OPENAI_MAX_RETRIES:
+                    metrics.openai_requests.labels(api=kind, outcome="error").inc()
+                    raise
+                metrics.openai_requests.labels(api=kind, outcome="retry").inc()
+
+                delay = random.uniform(
+                    0,
+                    min(
+                        settings.OPENAI_RETRY_MAX_DELAY,
+                        settings.OPENAI_RETRY_BASE_DELAY * 2**attempt,
+                    ),
+                )
+                if isinstance(ex, openai.RateLimitError):
+                    limiter.rate_limited += 1
+                    retry_after = self._retry_after(ex)
+                    if retry_after:
+                        # the limit is shared, so every caller backs off
+                        limiter.pause(retry_after)
+                        delay = max(delay, retry_after)
+
+                limiter.retries += 1
+                logger.warning(
+                    f"OpenAI {kind} call failed ({type(ex).__name__}), "
+                    f"retry {attempt + 1}/{settings.OPENAI_MAX_RETRIES} in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+                continue
+
+            except Exception:
+                metrics.openai_requests.labels(api=kind, outcome="error").inc()
+                raise
+
+            metrics.openai_requests.labels(api=kind, outcome="success").inc()
+
+            usage = getattr(response, "usage", None)
+            if usage and getattr(usage, "total_tokens", None):
+                limiter.settle(estimated_tokens, usage.total_tokens)
+                metrics.openai_tokens.labels(type="prompt").inc(
+                    usage.prompt_tokens or 0
+                )
+                metrics.openai_tokens.labels(type="completion").inc(
+                    usage.completion_tokens or 0
+                )
+
+            return response
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """
+        Get admission, retry and queue wait counters per API.
+        """
+        return {kind: limiter.stats() for kind, limiter in self.limiters.items()}
+
+    def _retry_after(self, ex: openai.APIStatusError) -> float | None:
+        value = ex.response.headers.get("retry-after")
+        try:
+            return float(value) if value else None
+        except ValueError:
+            return None
+
+
+openai_scheduler = OpenAIScheduler()
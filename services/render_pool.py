@@ -0,0 +1,282 @@
+import sys
+import queue
+import logging
+import resource
+import threading
+import multiprocessing
+from typing import Any
+from multiprocessing.connection import Connection
+
+from core.config import settings
+from constants.pdf import PDF_STYLESHEET
+from utils.helpers import atomic_write_path
+
+logger = logging.getLogger(__name__)
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def pdf_options(optimization: str) -> dict[str, Any]:
+    """
+    WeasyPrint options for a PDF optimization mode.
+
+    They are passed to HTML.write_pdf, which applies them while laying the
+    document out, where images are decoded, as well as when writing it.
+    """
+    if optimization == "none":
+        return {}
+
+    return {
+        "optimize_images": True,
+        "jpeg_quality": settings.PDF_JPEG_QUALITY,
+        "dpi": settings.PDF_IMAGE_DPI,
+        # WeasyPrint's defaults, kept explicit: subset fonts without hinting
+        # in compressed streams
+        "full_fonts": False,
+        "hinting": False,
+        "uncompressed_pdf": False,
+    }
+
+
+def _render_worker(
+    conn: Connection,
+    max_jobs: int,
+    max_rss_mb: int,
+    options: dict[str, Any],
+    measure_original: bool,
+) -> None:
+    """
+    Render loop of one worker process.
+
+    Fonts and the stylesheet are loaded once and reused for every job. With
+    measure_original, each document is also rendered without options to
+    report the size they saved. The worker exits after max_jobs renders or
+    once its peak RSS reaches max_rss_mb, and tells the pool so it can start
+    a replacement.
+    """
+    from weasyprint import HTML, CSS
+    from weasyprint.text.fonts import FontConfiguration
+
+    font_config = FontConfiguration()
+    stylesheet = CSS(string=PDF_STYLESHEET, font_config=font_config)
+
+    jobs = 0
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+
+        html, output_path = job
+        error = None
+        original_size = None
+        try:
+            with atomic_write_path(output_path) as tmp_path:
+                HTML(string=html).write_pdf(
+                    str(tmp_path),
+                    stylesheets=[stylesheet],
+                    font_config=font_config,
+                    presentational_hints=True,
+                    **options,
+                )
+            if measure_original:
+                original_size = len(
+                    HTML(string=html).write_pdf(
+                        stylesheets=[stylesheet],
+                        font_config=font_config,
+                        presentational_hints=True,
+                    )
+                )
+        except Exception as ex:
+            error = f"{type(ex).__name__}: {str(ex)}"
+
+        jobs += 1
+        rss_mb = _peak_rss_mb()
+        retire = jobs >= max_jobs or rss_mb >= max_rss_mb
+        conn.send(
+            {
+                "error": error,
+                "original_size": original_size,
+                "jobs": jobs,
+                "rss_mb": rss_mb,
+                "retire": retire,
+            }
+        )
+
+        if retire:
+            return
+
+
+class RenderWorker:
+    """Handle on one render process and the pipe to it."""
+
+    def __init__(self, context: Any, name: str):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_render_worker,
+            args=(
+                child_conn,
+                settings.RENDER_WORKER_MAX_JOBS,
+                settings.RENDER_WORKER_MAX_RSS_MB,
+                pdf_options(settings.PDF_OPTIMIZATION),
+                settings.PDF_MEASURE_ORIGINAL_SIZE,
+            ),
+            name=name,
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.conn.close()
+
+
+class RenderPool:
+    """Pool of long-lived WeasyPrint processes with warm fonts and stylesheet."""
+
+    def __init__(self):
+        self.size = settings.RENDER_POOL_SIZE
+        # spawn rather than fork: the parent runs an event loop and threads
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: queue.Queue[RenderWorker] = queue.Queue()
+        self._workers: set[RenderWorker] = set()
+        self._lock = threading.Lock()
+        self._started = False
+        self._spawned = 0
+
+        self.rendered = 0
+        self.failed = 0
+        self.restarts: dict[str, int] = {}
+
+    def render(self, html: str, output_path: str) -> int | None:
+        """
+        Render HTML to a PDF file on the next idle worker, blocking until done.
+
+        Returns the size in bytes the PDF would have had without
+        optimization, or None unless PDF_MEASURE_ORIGINAL_SIZE is set.
+        """
+        self._ensure_started()
+
+        worker = self._idle.get()
+        replacement_reason = None
+        try:
+            worker.conn.send((html, output_path))
+            if not worker.conn.poll(settings.RENDER_TIMEOUT_SECONDS):
+                replacement_reason = "timeout"
+                raise TimeoutError(
+                    f"PDF render took over {settings.RENDER_TIMEOUT_SECONDS}s"
+                )
+            reply = worker.conn.recv()
+
+        except TimeoutError:
+            # a subclass of OSError, so it must not be reported as a crash
+            raise
+
+        except (OSError, EOFError) as ex:
+            replacement_reason = "crash"
+            raise RuntimeError(f"Render worker exited unexpectedly: {str(ex)}")
+
+        finally:
+            if replacement_reason:
+                with self._lock:
+                    self.failed += 1
+                # a hung or dead worker gets no grace period
+                self._replace(worker, replacement_reason, timeout=0)
+
+        if reply["retire"]:
+            reason = (
+                "max_jobs"
+                if reply["jobs"] >= settings.RENDER_WORKER_MAX_JOBS
+                else "max_rss"
+            )
+            logger.info(
+                f"Recycling {worker.process.name} after {reply['jobs']} jobs "
+                f"at {reply['rss_mb']:.0f} MB peak RSS"
+            )
+            self._replace(worker, reason)
+        else:
+            self._idle.put(worker)
+
+        with self._lock:
+            if reply["error"]:
+                self.failed += 1
+            else:
+                self.rendered += 1
+
+        if reply["error"]:
+            raise RuntimeError(reply["error"])
+
+        return reply["original_size"]
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Get worker, render and restart counts.
+        """
+        with self._lock:
+            return {
+                "workers": len(self._workers),
+                "idle": self._idle.qsize(),
+                "rendered": self.rendered,
+                "failed": self.failed,
+                "restarts": dict(self.restarts),
+            }
+
+    def shutdown(self) -> None:
+        """
+        Stop every worker process.
+        """
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+            self._started = False
+            while not self._idle.empty():
+                self._idle.get_nowait()
+
+        for worker in workers:
+            worker.stop()
+
+    def _ensure_started(self) -> None:
+        # started on first use, so importing this module never spawns processes
+        with self._lock:
+            if self._started:
+                return
+            for _ in range(self.size):
+                self._idle.put(self._spawn())
+            self._started = True
+            logger.info(f"Started {self.size} render workers")
+
+    def _spawn(self) -> RenderWorker:
+        # callers hold self._lock
+        self._spawned += 1
+        worker = RenderWorker(self._context, f"render-{self._spawned}")
+        self._workers.add(worker)
+        return worker
+
+    def _replace(self, worker: RenderWorker, reason: str, timeout: float = 5.0) -> None:
+        """
+        Stop a worker and put a fresh one in its place.
+        """
+        worker.stop(timeout)
+        with self._lock:
+            self._workers.discard(worker)
+            self.restarts[reason] = self.restarts.get(reason, 0) + 1
+            if self._started:
+                self._idle.put(self._spawn())
+
+
+render_pool = RenderPool()
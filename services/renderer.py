@@ -0,0 +1,158 @@
+import logging
+from html import escape
+from typing import Any
+
+from utils.helpers import format_duration, format_timestamp
+
+logger = logging.getLogger(__name__)
+
+
+class TemplateRenderer:
+    """Service for rendering analysis results to HTML locally, using the house stylesheet classes."""
+
+    def render(self, analysis: dict[str, Any], video_info: dict[str, Any]) -> str:
+        """
+        Render the analysis and video information as PDF body HTML.
+        """
+        sections = [
+            self._render_header(video_info),
+            self._render_executive_summary(analysis),
+            self._render_chapters(video_info),
+            self._render_list(
+                "Main Takeaways", analysis.get("main_takeaways"), "key-points"
+            ),
+            self._render_list("Key Concepts", analysis.get("key_concepts")),
+            self._render_list(
+                "Actionable Insights", analysis.get("actionable_insights")
+            ),
+            self._render_step_guides(analysis),
+            self._render_quotes(analysis),
+            self._render_list(
+                "Resources Mentioned", analysis.get("resources_mentioned"), "resources"
+            ),
+            self._render_detailed_summary(analysis),
+        ]
+
+        logger.info("Rendered PDF content from template")
+        return "\n".join(section for section in sections if section)
+
+    def _render_header(self, video_info: dict[str, Any]) -> str:
+        title = escape(video_info.get("title") or "Video Analysis")
+        meta = [
+            f"Duration: {format_duration(video_info.get('duration') or 0)}",
+            f"Uploader: {escape(video_info.get('uploader') or 'Unknown')}",
+        ]
+        upload_date = video_info.get("upload_date")
+        if upload_date and len(upload_date) == 8:
+            meta.append(
+                f"Published: {upload_date[:4]}-{upload_date[4:6]}-{upload_date[6:]}"
+            )
+
+        return f"""
+        <div class="document-header">
+            <h1 class="document-title">{title}</h1>
+            <p class="document-meta">{" | ".join(meta)}</p>
+        </div>
+        """
+
+    def _render_executive_summary(self, analysis: dict[str, Any]) -> str:
+        summary = analysis.get("executive_summary")
+        if not summary:
+            return ""
+
+        return f"""
+        <div class="executive-summary">
+            <h2>Executive Summary</h2>
+            <p>{escape(summary)}</p>
+        </div>
+        """
+
+    def _render_chapters(self, video_info: dict[str, Any]) -> str:
+        chapters = video_info.get("chapters") or []
+        if not chapters:
+            return ""
+
+        items = "".join(
+            f"<li><strong>{escape(chapter.get('title') or f'Chapter {i}')}</strong> "
+            f'<span class="chapter-timestamp">'
+            f"({format_timestamp(chapter.get('start_time', 0))} - "
+            f"{format_timestamp(chapter.get('end_time', 0))})</span></li>"
+            for i, chapter in enumerate(chapters, 1)
+        )
+
+        return f"""
+        <div class="chapters">
+            <h2>Video Chapters</h2>
+            <ol>{items}</ol>
+        </div>
+        """
+
+    def _render_list(
+        self, heading: str, items: list[str] | None, css_class: str = ""
+    ) -> str:
+        if not items:
+            return ""
+
+        content = "<ul>{}</ul>".format(
+            "".join(f"<li>{escape(str(item))}</li>" for item in items)
+        )
+        if css_class:
+            content = f'<div class="{css_class}">{content}</div>'
+
+        return f"""
+        <div class="section">
+            <h1>{heading}</h1>
+            {content}
+        </div>
+        """
+
+    def _render_step_guides(self, analysis: dict[str, Any]) -> str:
+        guides = analysis.get("step_by_step_guides") or []
+        if not guides:
+            return ""
+
+        items = "".join(
+            f'<div class="step-guide"><p>{escape(str(guide))}</p></div>'
+            for guide in guides
+        )
+
+        return f"""
+        <div class="section">
+            <h1>Step-by-Step Guides</h1>
+            {items}
+        </div>
+        """
+
+    def _render_quotes(self, analysis: dict[str, Any]) -> str:
+        quotes = analysis.get("important_quotes") or []
+        if not quotes:
+            return ""
+
+        items = "".join(
+            f'<div class="quote">{escape(str(quote))}</div>' for quote in quotes
+        )
+
+        return f"""
+        <div class="section">
+            <h1>Important Quotes</h1>
+            {items}
+        </div>
+        """
+
+    def _render_detailed_summary(self, analysis: dict[str, Any]) -> str:
+        summary = analysis.get("detailed_summary") or "Detailed analysis not available."
+        paragraphs = "".join(
+            f"<p>{escape(paragraph.strip())}</p>"
+            for paragraph in summary.split("\n")
+            if paragraph.strip()
+        )
+
+        return f"""
+        <div class="section">
+            <h1>Detailed Summary</h1>
+            {paragraphs}
+        </div>
+        """
+
+
+template_renderer = TemplateRenderer()
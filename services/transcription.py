@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import threading
+from typing import Any
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+
+from openai import AsyncOpenAI
+
+from core.config import settings
+from core.executors import TrackedPool, executors
+from services.ratelimit import openai_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptionBackend(ABC):
+    """Interface of the speech-to-text backends behind LLMService.transcribe_audio."""
+
+    name = ""
+    # whether long files must be split into segments under the upload caps
+    chunked = True
+
+    @abstractmethod
+    async def transcribe(self, audio_file_path: str) -> str:
+        """
+        Transcribe one audio file to plain text.
+        """
+
+    async def close(self) -> None:
+        """
+        Release the backend's resources.
+        """
+
+
+class OpenAIWhisperBackend(TranscriptionBackend):
+    """Hosted Whisper through the OpenAI audio transcriptions API."""
+
+    name = "openai"
+    chunked = True
+
+    def __init__(self, client: AsyncOpenAI):
+        self.client = client
+
+    async def transcribe(self, audio_file_path: str) -> str:
+        async def request() -> str:
+            with open(audio_file_path, "rb") as audio_file:
+                return await self.client.audio.transcriptions.create(
+                    model=settings.WHISPER_MODEL,
+                    file=audio_file,
+                    response_format="text",
+                )
+
+        return await openai_scheduler.run("whisper", request)
+
+
+class LocalWhisperBackend(TranscriptionBackend):
+    """
+    Quantized Whisper on the CPU with faster-whisper (CTranslate2).
+
+    Needs the optional "local" dependencies. The model is loaded on first
+    use and shared by LOCAL_WHISPER_WORKERS threads. Each thread decodes
+    with batched inference over the file's speech segments. The threads are
+    reported with the shared executor pools as "local_whisper".
+    """
+
+    name = "local"
+    # no upload cap, and batched decoding already parallelizes long files
+    chunked = False
+
+    def __init__(self):
+        self.pool = executors.register(
+            TrackedPool(
+                "local_whisper",
+                ThreadPoolExecutor(
+                    max_workers=settings.LOCAL_WHISPER_WORKERS,
+                    thread_name_prefix="local-whisper",
+                ),
+                settings.LOCAL_WHISPER_WORKERS,
+            )
+        )
+        self.pipeline: Any = None
+        self._lock = threading.Lock()
+
+    async def transcribe(self, audio_file_path: str) -> str:
+        return await asyncio.wrap_future(
+            self.pool.submit(self._transcribe_sync, audio_file_path)
+        )
+
+    async def close(self) -> None:
+        executors.unregister(self.pool)
+        self.pool.executor.shutdown(wait=False, cancel_futures=True)
+
+    def load(self) -> Any:
+        """
+        Load the model once, returning the batched inference pipeline.
+        """
+        with self._lock:
+            if self.pipeline is None:
+                try:
+                    from faster_whisper import BatchedInferencePipeline, WhisperModel
+                except ImportError:
+                    raise RuntimeError(
+                        "TRANSCRIPTION_BACKEND=local needs faster-whisper, "
+                        "install it with: uv sync --extra local"
+                    )
+
+                model = WhisperModel(
+                    settings.LOCAL_WHISPER_MODEL,
+                    device="cpu",
+                    compute_type=settings.LOCAL_WHISPER_COMPUTE_TYPE,
+                    cpu_threads=settings.LOCAL_WHISPER_CPU_THREADS,
+                    num_workers=settings.LOCAL_WHISPER_WORKERS,
+                    download_root=settings.LOCAL_WHISPER_MODEL_DIR,
+                )
+                self.pipeline = BatchedInferencePipeline(model=model)
+                logger.info(
+                    f"Loaded local Whisper model {settings.LOCAL_WHISPER_MODEL} "
+                    f"({settings.LOCAL_WHISPER_COMPUTE_TYPE}, "
+                    f"{settings.LOCAL_WHISPER_CPU_THREADS} threads)"
+                )
+
+            return self.pipeline
+
+    def _transcribe_sync(self, audio_file_path: str) -> str:
+        segments, info = self.load().transcribe(
+            audio_file_path,
+            batch_size=settings.LOCAL_WHISPER_BATCH_SIZE,
+            language=settings.LOCAL_WHISPER_LANGUAGE,
+        )
+        # segments is a generator, decoding happens while it is consumed
+        text = " ".join(segment.text.strip() for segment in segments)
+
+        logger.info(
+            f"Transcribed {info.duration:.0f}s of {info.language} audio locally"
+        )
+        return text
+
+
+def create_transcription_backend(client: AsyncOpenAI) -> TranscriptionBackend:
+    """
+    Create the backend chosen by the TRANSCRIPTION_BACKEND setting.
+    """
+    if settings.TRANSCRIPTION_BACKEND == "local":
+        return LocalWhisperBackend()
+    return OpenAIWhisperBackend(client)
@@ -0,0 +1,283 @@
+import logging
+import subprocess
+from typing import Any
+from bisect import bisect_right
+from pathlib import Path
+
+from pydub import AudioSegment
+
+from utils.helpers import atomic_write_path
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_SAMPLE_RATE = 16000
+SPEECH_BAND_HZ = (300, 3400)
+# frames decoded and analyzed at a time, bounding memory on long audio
+BLOCK_FRAMES = 4096
+
+
+class SpeechTimeline:
+    """
+    Kept spans of the original audio, in order, and the mapping between
+    original timestamps and timestamps in the speech-only audio.
+    """
+
+    def __init__(self, spans: list[tuple[float, float]], original_seconds: float):
+        self.spans = spans
+        self.original_seconds = original_seconds
+        self.starts = [start for start, _ in spans]
+        # start of each span in the speech-only audio
+        self.offsets: list[float] = []
+        kept = 0.0
+        for start, end in spans:
+            self.offsets.append(kept)
+            kept += end - start
+        self.kept_seconds = kept
+        self.removed_seconds = max(original_seconds - kept, 0.0)
+
+    def to_stripped(self, original_time: float) -> float:
+        """
+        Map an original timestamp into the speech-only audio. Times inside a cut map to the cut point.
+        """
+        i = bisect_right(self.starts, original_time) - 1
+        if i < 0:
+            return 0.0
+        start, end = self.spans[i]
+        return self.offsets[i] + min(original_time, end) - start
+
+    def to_original(self, stripped_time: float) -> float:
+        """
+        Map a timestamp in the speech-only audio back to the original audio.
+        """
+        i = max(bisect_right(self.offsets, stripped_time) - 1, 0)
+        if not self.spans:
+            return stripped_time
+        start, end = self.spans[i]
+        return min(start + stripped_time - self.offsets[i], end)
+
+
+def frame_features(frames: Any, sample_rate: int) -> tuple[Any, Any]:
+    """
+    Energy in dB and share of spectral energy in the speech band of each frame.
+
+    frames is a 2D array of int16 samples, one frame per row.
+    """
+    import numpy as np
+
+    frame_length = frames.shape[1]
+    samples = frames.astype(np.float32) / 32768
+    energy_db = 10 * np.log10(np.mean(samples**2, axis=1) + 1e-10)
+
+    window_function = np.hanning(frame_length).astype(np.float32)
+    frequencies = np.fft.rfftfreq(frame_length, 1 / sample_rate)
+    in_band = (frequencies >= SPEECH_BAND_HZ[0]) & (frequencies <= SPEECH_BAND_HZ[1])
+    spectrum = np.abs(np.fft.rfft(samples * window_function, axis=1)) ** 2
+    ratio = spectrum[:, in_band].sum(axis=1) / (spectrum.sum(axis=1) + 1e-10)
+
+    return energy_db, ratio
+
+
+def decode_features(audio_path: str, frame_ms: int) -> tuple[Any, Any, float]:
+    """
+    Decode audio to 16 kHz mono with ffmpeg and compute frame features block by block.
+
+    Only the per-frame features are kept, so memory does not grow with the
+    length of the audio. Returns the energy and band ratio of each frame
+    and the duration in seconds.
+    """
+    import numpy as np
+
+    frame_length = int(ANALYSIS_SAMPLE_RATE * frame_ms / 1000)
+    block_bytes = BLOCK_FRAMES * frame_length * 2
+    command = [
+        AudioSegment.converter,
+        "-nostdin",
+        "-v",
+        "error",
+        "-i",
+        audio_path,
+        "-ac",
+        "1",
+        "-ar",
+        str(ANALYSIS_SAMPLE_RATE),
+        "-f",
+        "s16le",
+        "-",
+    ]
+
+    energies, ratios = [], []
+    total_samples = 0
+    with subprocess.Popen(
+        command, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    ) as process:
+        while True:
+            data = process.stdout.read(block_bytes)
+            if not data:
+                break
+            samples = np.frombuffer(data, dtype=np.int16)
+            total_samples += len(samples)
+            # a partial block only comes at the end, its tail frame is dropped
+            n_frames = len(samples) // frame_length
+            if n_frames:
+                frames = samples[: n_frames * frame_length].reshape(n_frames, -1)
+                energy_db, ratio = frame_features(frames, ANALYSIS_SAMPLE_RATE)
+                energies.append(energy_db)
+                ratios.append(ratio)
+        stderr = process.stderr.read()
+
+    if process.returncode:
+        raise RuntimeError(
+            f"ffmpeg failed to decode {audio_path}: {stderr.decode(errors='replace').strip()}"
+        )
+
+    empty = np.empty(0, dtype=np.float32)
+    return (
+        np.concatenate(energies) if energies else empty,
+        np.concatenate(ratios) if ratios else empty,
+        total_samples / ANALYSIS_SAMPLE_RATE,
+    )
+
+
+def detect_speech(
+    energy_db: Any,
+    ratio: Any,
+    frame_ms: int,
+    energy_threshold_db: float,
+    band_ratio: float,
+    min_dynamics_db: float,
+    min_gap_seconds: float,
+    padding_seconds: float,
+) -> list[tuple[float, float]]:
+    """
+    Find speech spans from the vectorized features of each frame.
+
+    A frame counts as speech when its energy is energy_threshold_db above
+    the noise floor, at least band_ratio of its spectral energy lies in the
+    speech band, and the loudness around it varies by min_dynamics_db or
+    more, as syllables do and sustained music beds do not. Speech frames
+    are padded, and gaps shorter than min_gap_seconds are kept.
+    """
+    import numpy as np
+
+    if len(energy_db) == 0:
+        return []
+
+    # energy relative to the quietest tenth of the audio
+    noise_floor = np.percentile(energy_db, 10)
+    loud = energy_db > noise_floor + energy_threshold_db
+    voiced = ratio >= band_ratio
+
+    # loudness variation over a one second window, from running sums
+    window = max(int(1000 / frame_ms), 1)
+    padded = np.pad(energy_db, (window // 2, window - window // 2 - 1), mode="edge")
+    sums = np.cumsum(np.concatenate(([0.0], padded)))
+    squares = np.cumsum(np.concatenate(([0.0], padded**2)))
+    mean = (sums[window:] - sums[:-window]) / window
+    variance = (squares[window:] - squares[:-window]) / window - mean**2
+    dynamic = np.sqrt(np.maximum(variance, 0)) >= min_dynamics_db
+
+    speech = loud & voiced & dynamic
+
+    # pad speech frames on both sides by dilating the mask
+    pad_frames = int(padding_seconds * 1000 / frame_ms)
+    if pad_frames:
+        kernel = np.ones(2 * pad_frames + 1)
+        speech = np.convolve(speech, kernel, mode="same") > 0
+
+    # run boundaries of the mask
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], speech.astype(int), [0]))))
+    frame_seconds = frame_ms / 1000
+    spans: list[tuple[float, float]] = []
+    for start, end in zip(edges[::2], edges[1::2]):
+        start_s, end_s = float(start * frame_seconds), float(end * frame_seconds)
+        if spans and start_s - spans[-1][1] < min_gap_seconds:
+            spans[-1] = (spans[-1][0], end_s)
+        else:
+            spans.append((start_s, end_s))
+
+    return spans
+
+
+def cut_spans(
+    audio_path: str,
+    output_path: str,
+    spans: list[tuple[float, float]],
+    bitrate_kbps: int,
+) -> None:
+    """
+    Encode the given spans of an audio file, back to back, as one mono MP3 with ffmpeg.
+    """
+    # aselect keeps samples whose time falls in any span, asetpts closes the gaps
+    selection = "+".join(f"between(t,{start:.3f},{end:.3f})" for start, end in spans)
+    Path(output_path).parent.mkdir(exist_ok=True, parents=True)
+    with atomic_write_path(output_path) as tmp_path:
+        command = [
+            AudioSegment.converter,
+            "-nostdin",
+            "-v",
+            "error",
+            "-y",
+            "-i",
+            audio_path,
+            "-vn",
+            "-af",
+            f"aselect='{selection}',asetpts=N/SR/TB",
+            "-ac",
+            "1",
+            "-b:a",
+            f"{bitrate_kbps}k",
+            "-f",
+            "mp3",
+            str(tmp_path),
+        ]
+        result = subprocess.run(command, capture_output=True)
+        if result.returncode:
+            raise RuntimeError(
+                f"ffmpeg failed to cut {audio_path}: "
+                f"{result.stderr.decode(errors='replace').strip()}"
+            )
+
+
+def strip_non_speech(
+    audio_path: str,
+    output_path: str,
+    bitrate_kbps: int,
+    frame_ms: int,
+    energy_threshold_db: float,
+    band_ratio: float,
+    min_dynamics_db: float,
+    min_gap_seconds: float,
+    padding_seconds: float,
+) -> dict[str, Any]:
+    """
+    Write the speech spans of an audio file to a new mono MP3. Runs in the CPU process pool.
+
+    The audio is analyzed from a streamed 16 kHz mono decode and the spans
+    are cut from the original file by ffmpeg, so the decoded audio is never
+    held in memory. Returns the kept spans in original seconds, the original
+    duration and whether a file was written: nothing is written when no
+    speech is found.
+    """
+    energy_db, ratio, original_seconds = decode_features(audio_path, frame_ms)
+
+    spans = detect_speech(
+        energy_db,
+        ratio,
+        frame_ms,
+        energy_threshold_db,
+        band_ratio,
+        min_dynamics_db,
+        min_gap_seconds,
+        padding_seconds,
+    )
+    spans = [(start, min(end, original_seconds)) for start, end in spans]
+
+    written = bool(spans)
+    if written:
+        cut_spans(audio_path, output_path, spans, bitrate_kbps)
+
+    logger.info(
+        f"Kept {sum(end - start for start, end in spans):.0f}s of speech "
+        f"in {len(spans)} spans out of {original_seconds:.0f}s of {audio_path}"
+    )
+    return {"spans": spans, "original_seconds": original_seconds, "written": written}
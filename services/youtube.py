@@ -1,85 +1,250 @@
 import os
 import re
+import time
 import logging
-from typing import Any
+import threading
+from typing import Any, Callable
 from pathlib import Path
+from collections import OrderedDict
 
 import yt_dlp
 from pydub import AudioSegment
 
 from core.config import settings
-from utils.helpers import sanitize_filename
+from core.executors import executors
+from core.metrics import metrics
+from utils.helpers import sanitize_filename, atomic_write_path
+from utils.progress import ProgressCallback
+from utils.captions import caption_coverage, cues_to_text, parse_srv3, parse_vtt
 
 logger = logging.getLogger(__name__)
 
+# caption formats we can parse, in order of preference
+CAPTION_FORMATS = ("srv3", "vtt")
+
+
+def transcode_audio(
+    source_path: str,
+    output_path: str,
+    output_format: str,
+    channels: int | None = None,
+    sample_rate: int | None = None,
+    bitrate: str | None = None,
+) -> None:
+    """
+    Transcode an audio file with pydub/ffmpeg. Runs in the CPU process pool.
+    """
+    audio = AudioSegment.from_file(source_path)
+    if channels:
+        audio = audio.set_channels(channels)
+    if sample_rate:
+        audio = audio.set_frame_rate(sample_rate)
+    with atomic_write_path(output_path) as tmp_path:
+        audio.export(str(tmp_path), format=output_format, bitrate=bitrate)
+
 
 class YouTubeService:
     """Service for handling YouTube video processing and audio extraction."""
 
+    RAW_INFO_CACHE_SIZE = 32
+    RAW_INFO_TTL = 1800  # format URLs expire after a few hours
+
     def __init__(self):
         self.upload_dir = Path(settings.UPLOAD_DIR) / "youtube"
         self.upload_dir.mkdir(exist_ok=True)
 
-    def extract_video_info(self, url: str) -> dict[str, Any]:
+        # YoutubeDL isn't thread-safe, so each executor thread keeps its own
+        # long-lived instances
+        self._local = threading.local()
+
+        # raw yt-dlp info dicts by video id, reused by the download step
+        self._raw_infos: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._raw_infos_lock = threading.Lock()
+
+    def _get_ydl(self, profile: str) -> yt_dlp.YoutubeDL:
         """
-        Extract video metadata without downloading.
+        Get this thread's long-lived YoutubeDL instance for a profile.
         """
-        try:
-            ydl_opts = {
-                "quiet": True,
-                "no_warnings": True,
-            }
+        instances = self._local.__dict__.setdefault("instances", {})
+        if profile not in instances:
+            ydl = yt_dlp.YoutubeDL(self._build_ydl_opts(profile))
+            ydl.add_progress_hook(self._dispatch_progress)
+            instances[profile] = ydl
+        return instances[profile]
 
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
+    def _dispatch_progress(self, status: dict[str, Any]) -> None:
+        """
+        Forward yt-dlp download progress to the callback of the current download.
+
+        Instances outlive a single download, so the hook is registered once and
+        looks the callback up on the downloading thread.
+        """
+        if status["status"] not in ("downloading", "finished"):
+            return
+
+        total = status.get("total_bytes") or status.get("total_bytes_estimate")
+        downloaded = status.get("downloaded_bytes") or 0
+        if status["status"] == "finished":
+            downloaded = total = total or downloaded
+            metrics.downloaded_bytes.inc(downloaded)
+
+        on_progress = getattr(self._local, "on_progress", None)
+        if on_progress:
+            on_progress(downloaded, total)
 
-                # extract chapters if available
-                chapters = []
-                if info.get("chapters"):
-                    chapters = [
+    def _build_ydl_opts(self, profile: str) -> dict[str, Any]:
+        """
+        Build YoutubeDL options for metadata extraction or an audio profile.
+
+        Output templates use the yt_pdf_filename field, set per download on
+        the info dict, so one instance can serve every video.
+        """
+        ydl_opts = {
+            "quiet": True,
+            "no_warnings": True,
+            "noprogress": True,
+        }
+
+        if profile == "mp3":
+            ydl_opts.update(
+                {
+                    "format": "bestaudio/best",
+                    "outtmpl": str(self.upload_dir / "%(yt_pdf_filename)s"),
+                    "postprocessors": [
                         {
-                            "title": ch.get("title", "Untitled Chapter"),
-                            "start_time": ch.get("start_time", 0),
-                            "end_time": ch.get("end_time", 0),
+                            "key": "FFmpegExtractAudio",
+                            "preferredcodec": "mp3",
+                            "preferredquality": "192",
                         }
-                        for ch in info.get("chapters", [])
-                    ]
-
-                video_info = {
-                    "id": info.get("id"),
-                    "title": info.get("title"),
-                    "description": info.get("description"),
-                    "duration": info.get("duration"),
-                    "uploader": info.get("uploader"),
-                    "upload_date": info.get("upload_date"),
-                    "view_count": info.get("view_count"),
-                    "like_count": info.get("like_count"),
-                    "tags": info.get("tags", []),
-                    "categories": info.get("categories", []),
-                    "thumbnail": info.get("thumbnail"),
-                    "webpage_url": info.get("webpage_url"),
-                    "chapters": chapters,
+                    ],
+                }
+            )
+        elif profile == "flat":
+            ydl_opts["extract_flat"] = "in_playlist"
+        elif profile == "captions":
+            ydl_opts.update(
+                {
+                    "skip_download": True,
+                    "writesubtitles": True,
+                    "writeautomaticsub": True,
+                    "subtitleslangs": ["all"],
+                    "subtitlesformat": "/".join(CAPTION_FORMATS),
+                    "outtmpl": str(self.upload_dir / "%(yt_pdf_filename)s.%(ext)s"),
                 }
+            )
+        elif profile == "speech":
+            ydl_opts.update(
+                {
+                    "format": settings.SPEECH_AUDIO_FORMAT,
+                    "outtmpl": str(self.upload_dir / "%(yt_pdf_filename)s.%(ext)s"),
+                }
+            )
 
-                if (
-                    video_info["duration"]
-                    and video_info["duration"] > settings.MAX_VIDEO_DURATION
-                ):
-                    raise ValueError(
-                        f"Video duration ({video_info['duration']}s) exceeds maximum allowed duration ({settings.MAX_VIDEO_DURATION}s)"
-                    )
+        return ydl_opts
+
+    def _extract_raw_info(self, url: str) -> dict[str, Any]:
+        """
+        Run yt-dlp extraction once and remember the raw info dict for the download.
+        """
+        info = self._get_ydl("info").extract_info(url, download=False)
+
+        with self._raw_infos_lock:
+            self._raw_infos[info["id"]] = (time.monotonic(), info)
+            self._raw_infos.move_to_end(info["id"])
+            while len(self._raw_infos) > self.RAW_INFO_CACHE_SIZE:
+                self._raw_infos.popitem(last=False)
+
+        return info
 
-                logger.info(f"Successfully extracted info for video \n\n: {video_info}")
-                return video_info
+    def _get_raw_info(self, url: str, video_id: str) -> dict[str, Any]:
+        """
+        Get the raw info dict from the metadata step, extracting again only if it expired.
+        """
+        with self._raw_infos_lock:
+            cached = self._raw_infos.get(video_id)
+
+        if cached and time.monotonic() - cached[0] < self.RAW_INFO_TTL:
+            return cached[1]
+
+        logger.info(f"Raw info for video {video_id} expired, extracting again")
+        return self._extract_raw_info(url)
+
+    def _download_with_info(
+        self, ydl: yt_dlp.YoutubeDL, raw_info: dict[str, Any], audio_filename: str
+    ) -> dict[str, Any]:
+        """
+        Download from an already extracted info dict, as yt-dlp --load-info-json does.
+        """
+        info = ydl.sanitize_info(raw_info, remove_private_keys=True)
+        info["yt_pdf_filename"] = audio_filename
+        return ydl.process_ie_result(info, download=True)
+
+    def extract_video_info(self, url: str) -> dict[str, Any]:
+        """
+        Extract video metadata without downloading.
+        """
+        try:
+            info = self._extract_raw_info(url)
+
+            # extract chapters if available
+            chapters = []
+            if info.get("chapters"):
+                chapters = [
+                    {
+                        "title": ch.get("title", "Untitled Chapter"),
+                        "start_time": ch.get("start_time", 0),
+                        "end_time": ch.get("end_time", 0),
+                    }
+                    for ch in info.get("chapters", [])
+                ]
+
+            video_info = {
+                "id": info.get("id"),
+                "title": info.get("title"),
+                "description": info.get("description"),
+                "duration": info.get("duration"),
+                "uploader": info.get("uploader"),
+                "upload_date": info.get("upload_date"),
+                "view_count": info.get("view_count"),
+                "like_count": info.get("like_count"),
+                "tags": info.get("tags", []),
+                "categories": info.get("categories", []),
+                "thumbnail": info.get("thumbnail"),
+                "webpage_url": info.get("webpage_url"),
+                "chapters": chapters,
+            }
+
+            if (
+                video_info["duration"]
+                and video_info["duration"] > settings.MAX_VIDEO_DURATION
+            ):
+                raise ValueError(
+                    f"Video duration ({video_info['duration']}s) exceeds maximum allowed duration ({settings.MAX_VIDEO_DURATION}s)"
+                )
+
+            logger.info(f"Successfully extracted info for video \n\n: {video_info}")
+            return video_info
 
         except Exception as ex:
             logger.exception(f"Error extracting video info: {str(ex)}")
             raise ValueError(f"Failed to extract video information: {str(ex)}")
 
-    def download_audio(self, url: str, video_info: dict[str, Any] | None = None) -> str:
+    def download_audio(
+        self,
+        url: str,
+        video_info: dict[str, Any] | None = None,
+        on_progress: ProgressCallback | None = None,
+    ) -> str:
         """
-        Download audio from YouTube video and convert to MP3.
+        Download audio from YouTube video for transcription.
+
+        The "mp3" profile converts the best audio stream to 192 kbps MP3. The
+        "speech" profile downloads the smallest audio-only stream and keeps it
+        as is if Whisper accepts the container, or converts it to low-bitrate
+        mono 16 kHz MP3 otherwise. on_progress is called with downloaded and
+        total bytes.
         """
+        self._local.on_progress = on_progress
         try:
             if not video_info:
                 video_info = self.extract_video_info(url)
@@ -88,51 +253,268 @@ class YouTubeService:
             video_id = video_info["id"]
             audio_filename = f"{title}_{video_id}"
 
+            raw_info = self._get_raw_info(url, video_id)
+
+            if settings.AUDIO_PROFILE == "speech":
+                audio_path = self._download_speech_audio(raw_info, audio_filename)
+            else:
+                audio_path = self._download_mp3_audio(raw_info, audio_filename)
+
+            file_size = audio_path.stat().st_size
+            if file_size > settings.MAX_FILE_SIZE:
+                audio_path.unlink()
+                raise ValueError(f"Audio file too large: {file_size} bytes")
+
+            logger.info(f"Successfully downloaded audio: {audio_path}")
+            return str(audio_path)
+
+        except Exception as ex:
+            logger.exception(f"Error downloading audio: {str(ex)}")
+            raise ValueError(f"Failed to download audio: {str(ex)}")
+
+        finally:
+            self._local.on_progress = None
+
+    def _download_mp3_audio(
+        self, raw_info: dict[str, Any], audio_filename: str
+    ) -> Path:
+        """
+        Download the best audio stream and convert it to 192 kbps MP3.
+        """
+        self._download_with_info(self._get_ydl("mp3"), raw_info, audio_filename)
+
+        mp3_path = self.upload_dir / f"{audio_filename}.mp3"
+
+        if not mp3_path.exists():
+            for ext in ["mp3", "webm", "m4a", "wav"]:
+                potential_path = self.upload_dir / f"{audio_filename}.{ext}"
+                if potential_path.exists():
+                    if ext != "mp3":
+                        with metrics.stage_duration.labels(stage="transcode").time():
+                            executors.submit_cpu(
+                                transcode_audio,
+                                str(potential_path),
+                                str(mp3_path),
+                                "mp3",
+                            ).result()
+                        potential_path.unlink()
+                    else:
+                        mp3_path = potential_path
+                    break
+            else:
+                raise FileNotFoundError("Downloaded audio file not found")
+
+        return mp3_path
+
+    def _download_speech_audio(
+        self, raw_info: dict[str, Any], audio_filename: str
+    ) -> Path:
+        """
+        Download the smallest audio-only stream, transcoding only if Whisper can't take it.
+        """
+        info = self._download_with_info(
+            self._get_ydl("speech"), raw_info, audio_filename
+        )
+
+        downloaded_path = Path(info["requested_downloads"][0]["filepath"])
+        if not downloaded_path.exists():
+            raise FileNotFoundError("Downloaded audio file not found")
+
+        if downloaded_path.suffix.lstrip(".") in settings.ALLOWED_AUDIO_FORMATS:
+            logger.info(f"Using downloaded audio as is: {downloaded_path.name}")
+            return downloaded_path
+
+        speech_path = self.upload_dir / f"{audio_filename}.mp3"
+        with metrics.stage_duration.labels(stage="transcode").time():
+            executors.submit_cpu(
+                transcode_audio,
+                str(downloaded_path),
+                str(speech_path),
+                "mp3",
+                1,
+                settings.SPEECH_SAMPLE_RATE,
+                f"{settings.SPEECH_BITRATE_KBPS}k",
+            ).result()
+        downloaded_path.unlink()
+
+        return speech_path
+
+    def download_captions(
+        self, url: str, video_info: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        """
+        Fetch the best caption track and turn it into a transcript.
+
+        Manual captions in CAPTION_LANGUAGES are preferred over automatic
+        ones. Returns the transcript, the track language and whether it is
+        automatic, or None when no track exists or it covers less than
+        CAPTION_MIN_COVERAGE of the video.
+        """
+        video_id = video_info["id"]
+        caption_path = None
+        try:
+            raw_info = self._get_raw_info(url, video_id)
+            track = self._select_caption_track(raw_info)
+            if not track:
+                logger.info(
+                    f"No captions in {settings.CAPTION_LANGUAGES} for {video_id}"
+                )
+                return None
+
+            language, formats, automatic = track
+
+            # hand yt-dlp only the chosen track, so it fetches just that one
+            info = {
+                **raw_info,
+                "subtitles": {} if automatic else {language: formats},
+                "automatic_captions": {language: formats} if automatic else {},
+            }
+            filename = f"{sanitize_filename(video_info['title'])}_{video_id}"
+            info = self._download_with_info(self._get_ydl("captions"), info, filename)
+
+            subtitle = (info.get("requested_subtitles") or {}).get(language)
+            if not subtitle or not subtitle.get("filepath"):
+                raise FileNotFoundError("Downloaded caption file not found")
+            caption_path = Path(subtitle["filepath"])
+
+            content = caption_path.read_text(encoding="utf-8")
+            if subtitle["ext"] == "srv3":
+                cues = parse_srv3(content)
+            else:
+                cues = parse_vtt(content)
+
+            coverage = caption_coverage(cues, video_info.get("duration") or 0)
+            if coverage < settings.CAPTION_MIN_COVERAGE:
+                logger.info(
+                    f"Captions for {video_id} cover only {coverage:.0%} of the video"
+                )
+                return None
+
+            logger.info(
+                f"Using {'automatic' if automatic else 'manual'} {language} captions "
+                f"for {video_id} ({len(cues)} cues, {coverage:.0%} coverage)"
+            )
+            return {
+                "transcript": cues_to_text(cues),
+                "language": language,
+                "automatic": automatic,
+            }
+
+        except Exception as ex:
+            logger.warning(f"Failed to fetch captions for {video_id}: {str(ex)}")
+            return None
+
+        finally:
+            if caption_path:
+                caption_path.unlink(missing_ok=True)
+
+    def _select_caption_track(
+        self, raw_info: dict[str, Any]
+    ) -> tuple[str, list[dict[str, Any]], bool] | None:
+        """
+        Pick a caption track as (language, formats, automatic), or None.
+        """
+
+        def parseable(formats: list[dict[str, Any]]) -> list[dict[str, Any]]:
+            return [f for f in formats if f.get("ext") in CAPTION_FORMATS]
+
+        subtitles = raw_info.get("subtitles") or {}
+        for language in settings.CAPTION_LANGUAGES:
+            for key, formats in subtitles.items():
+                if (key == language or key.startswith(f"{language}-")) and parseable(
+                    formats
+                ):
+                    return key, parseable(formats), False
+
+        if not settings.CAPTION_ALLOW_AUTOMATIC:
+            return None
+
+        # automatic captions are listed in every language YouTube can
+        # machine-translate to; "-orig" marks the speech recognition track
+        automatic = raw_info.get("automatic_captions") or {}
+        has_original = any(key.endswith("-orig") for key in automatic)
+        for language in settings.CAPTION_LANGUAGES:
+            key = f"{language}-orig" if has_original else language
+            if parseable(automatic.get(key) or []):
+                return key, parseable(automatic[key]), True
+
+        return None
+
+    def download_audio_segments(
+        self,
+        url: str,
+        video_info: dict[str, Any],
+        ranges: list[tuple[float, float]],
+        on_segment: Callable[[dict[str, Any]], None],
+    ) -> int:
+        """
+        Download audio as consecutive overlapping time ranges, calling on_segment as each one finishes.
+
+        Segments are reported in order from the downloading thread, so
+        transcription can start before the whole file is downloaded. Returns
+        the number of segments.
+        """
+        try:
+            title = sanitize_filename(video_info["title"])
+            video_id = video_info["id"]
+            duration = video_info["duration"]
+            raw_info = self._get_raw_info(url, video_id)
+
+            finished = []
+
+            def progress_hook(status: dict[str, Any]) -> None:
+                if status["status"] != "finished":
+                    return
+                metrics.downloaded_bytes.inc(status.get("downloaded_bytes") or 0)
+
+                # yt-dlp downloads the ranges one after another, in order
+                info = status["info_dict"]
+                segment = {
+                    "index": len(finished),
+                    "path": status["filename"],
+                    "start": info.get("section_start") or 0,
+                    "end": info.get("section_end") or duration,
+                }
+                finished.append(segment)
+                on_segment(segment)
+
+            # ranges and hooks differ per download, so this instance is short-lived
             ydl_opts = {
                 "format": "bestaudio/best",
-                "outtmpl": str(self.upload_dir / audio_filename),
-                "postprocessors": [
-                    {
-                        "key": "FFmpegExtractAudio",
-                        "preferredcodec": "mp3",
-                        "preferredquality": "192",
-                    }
-                ],
+                "outtmpl": str(
+                    self.upload_dir / "%(yt_pdf_filename)s_%(section_start)s.%(ext)s"
+                ),
+                "download_ranges": yt_dlp.utils.download_range_func(None, ranges),
+                "progress_hooks": [progress_hook],
                 "quiet": True,
                 "no_warnings": True,
             }
 
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([url])
-
-            mp3_path = self.upload_dir / f"{audio_filename}.mp3"
-
-            if not mp3_path.exists():
-                for ext in ["mp3", "webm", "m4a", "wav"]:
-                    potential_path = self.upload_dir / f"{audio_filename}.{ext}"
-                    if potential_path.exists():
-                        if ext != "mp3":
-                            audio = AudioSegment.from_file(str(potential_path))
-                            audio.export(str(mp3_path), format="mp3")
-                            potential_path.unlink()
-                        else:
-                            mp3_path = potential_path
-                        break
-                else:
-                    raise FileNotFoundError("Downloaded audio file not found")
-
-            file_size = mp3_path.stat().st_size
-            if file_size > settings.MAX_FILE_SIZE:
-                mp3_path.unlink()
-                raise ValueError(f"Audio file too large: {file_size} bytes")
+                self._download_with_info(ydl, raw_info, f"{title}_{video_id}")
 
-            logger.info(f"Successfully downloaded audio: {mp3_path}")
-            return str(mp3_path)
+            logger.info(f"Downloaded {len(finished)} audio segments for {video_id}")
+            return len(finished)
 
         except Exception as ex:
-            logger.exception(f"Error downloading audio: {str(ex)}")
+            logger.exception(f"Error downloading audio segments: {str(ex)}")
             raise ValueError(f"Failed to download audio: {str(ex)}")
 
+    def build_segment_ranges(
+        self, duration: float, segment_seconds: float, overlap_seconds: float
+    ) -> list[tuple[float, float]]:
+        """
+        Split a duration into consecutive time ranges that overlap by overlap_seconds.
+        """
+        ranges = []
+        start = 0.0
+        while start < duration:
+            end = min(start + segment_seconds, duration)
+            ranges.append((start, end))
+            start = end - overlap_seconds if end < duration else end
+
+        return ranges
+
     def cleanup_file(self, file_path: str) -> None:
         """
         Clean up downloaded files.
@@ -144,6 +526,23 @@ class YouTubeService:
         except Exception as ex:
             logger.warning(f"Failed to cleanup file {file_path}: {str(ex)}")
 
+    def extract_video_id(self, url: str) -> str | None:
+        """
+        Extract the canonical video id from a YouTube URL without network access.
+        """
+        video_id_patterns = [
+            r"(?:https?://)?(?:www\.|m\.)?youtube\.com/watch\?(?:.*&)?v=([\w-]{11})",
+            r"(?:https?://)?(?:www\.)?youtu\.be/([\w-]{11})",
+            r"(?:https?://)?(?:www\.)?youtube\.com/(?:embed|v|shorts)/([\w-]{11})",
+        ]
+
+        for pattern in video_id_patterns:
+            match = re.match(pattern, url)
+            if match:
+                return match.group(1)
+
+        return None
+
     def validate_youtube_url(self, url: str) -> bool:
         """
         Validate if the URL is a valid YouTube URL.
@@ -161,5 +560,60 @@ class YouTubeService:
 
         return any(re.match(pattern, url) for pattern in youtube_patterns)
 
+    def validate_playlist_url(self, url: str) -> bool:
+        """
+        Validate if the URL is a YouTube playlist or channel URL.
+
+        Possible patterns:
+        - https://www.youtube.com/playlist?list=PLxxxxxxxxxxxxxxxx
+        - https://www.youtube.com/@handle
+        - https://www.youtube.com/channel/UCxxxxxxxxxxxxxxxxxxxxxx
+        """
+        playlist_patterns = [
+            r"(?:https?://)?(?:www\.|m\.)?youtube\.com/playlist\?(?:.*&)?list=[\w-]+",
+            r"(?:https?://)?(?:www\.|m\.)?youtube\.com/@[\w.-]+",
+            r"(?:https?://)?(?:www\.|m\.)?youtube\.com/(?:channel|c|user)/[\w-]+",
+        ]
+
+        return any(re.match(pattern, url) for pattern in playlist_patterns)
+
+    def expand_playlist(self, url: str, max_items: int) -> list[str]:
+        """
+        List the video URLs of a playlist or channel with a flat extraction.
+
+        Flat extraction reads only the playlist pages, not each video. Channel
+        tabs (videos, shorts, live) are expanded one level.
+        """
+        try:
+            ydl = self._get_ydl("flat")
+            info = ydl.extract_info(url, download=False)
+
+            video_urls: list[str] = []
+            pending = [(entry, 0) for entry in info.get("entries") or []]
+            while pending and len(video_urls) < max_items:
+                entry, depth = pending.pop(0)
+                if not entry:
+                    continue
+
+                if entry.get("ie_key") == "Youtube" and entry.get("id"):
+                    video_urls.append(f"https://www.youtube.com/watch?v={entry['id']}")
+                elif (
+                    entry.get("ie_key") == "YoutubeTab"
+                    and entry.get("url")
+                    and depth == 0
+                ):
+                    tab = ydl.extract_info(entry["url"], download=False)
+                    pending.extend((e, depth + 1) for e in tab.get("entries") or [])
+
+            if not video_urls:
+                raise ValueError("Playlist contains no videos")
+
+            logger.info(f"Expanded {url} into {len(video_urls)} videos")
+            return video_urls
+
+        except Exception as ex:
+            logger.exception(f"Error expanding playlist: {str(ex)}")
+            raise ValueError(f"Failed to expand playlist: {str(ex)}")
+
 
 youtube_service = YouTubeService()
@@ -0,0 +1,115 @@
+import re
+from html import unescape
+from xml.etree import ElementTree
+
+# (start seconds, end seconds, text)
+Cue = tuple[float, float, str]
+
+VTT_TIMING_PATTERN = re.compile(
+    r"((?:\d+:)?\d{1,2}:\d{2}\.\d{3})\s+-->\s+((?:\d+:)?\d{1,2}:\d{2}\.\d{3})"
+)
+TAG_PATTERN = re.compile(r"<[^>]+>")
+# non-speech annotations: anything bracketed, as in [Music], and known sound
+# tags in parentheses, as in (applause), so spoken asides in parentheses stay
+SOUND_TAGS = (
+    "music|applause|laughter|laughs|laughing|cheering|cheers|clapping|"
+    "inaudible|silence|crosstalk|coughs|coughing|sighs|chuckles|gasps|noise"
+)
+ANNOTATION_PATTERN = re.compile(
+    rf"\[[^\]]*\]|\((?:\w+\s+)?(?:{SOUND_TAGS})(?:\s+playing)?\)|♪+",
+    re.IGNORECASE,
+)
+
+
+def _parse_vtt_timestamp(value: str) -> float:
+    parts = value.split(":")
+    seconds = float(parts[-1])
+    minutes = int(parts[-2])
+    hours = int(parts[-3]) if len(parts) == 3 else 0
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def _clean_text(text: str) -> str:
+    text = unescape(TAG_PATTERN.sub("", text))
+    text = ANNOTATION_PATTERN.sub(" ", text)
+    return " ".join(text.split())
+
+
+def parse_vtt(content: str) -> list[Cue]:
+    """
+    Parse WebVTT captions into cues, one per caption line.
+
+    YouTube's automatic captions repeat the previous line at the top of
+    every cue while the next one is typed in, so a line equal to the last
+    one kept is skipped.
+    """
+    cues: list[Cue] = []
+    last_line = None
+
+    for block in re.split(r"\n{2,}", content.replace("\r\n", "\n")):
+        lines = block.strip().split("\n")
+        for i, line in enumerate(lines):
+            timing = VTT_TIMING_PATTERN.search(line)
+            if timing:
+                break
+        else:
+            # header, NOTE, STYLE or REGION block
+            continue
+
+        start = _parse_vtt_timestamp(timing.group(1))
+        end = _parse_vtt_timestamp(timing.group(2))
+        for line in lines[i + 1 :]:
+            text = _clean_text(line)
+            if not text or text == last_line:
+                continue
+            cues.append((start, end, text))
+            last_line = text
+
+    return cues
+
+
+def parse_srv3(content: str) -> list[Cue]:
+    """
+    Parse YouTube's srv3 (timedtext XML) captions into cues.
+
+    Times are in milliseconds. Automatic captions carry one word per <s>
+    element, manual ones the whole text in the <p>.
+    """
+    root = ElementTree.fromstring(content)
+    cues: list[Cue] = []
+
+    for paragraph in root.iter("p"):
+        text = _clean_text("".join(paragraph.itertext()))
+        if not text:
+            continue
+
+        start = int(paragraph.get("t", 0)) / 1000
+        end = start + int(paragraph.get("d", 0)) / 1000
+        cues.append((start, end, text))
+
+    return cues
+
+
+def cues_to_text(cues: list[Cue]) -> str:
+    """
+    Join cues into a plain transcript.
+    """
+    return " ".join(text for _, _, text in cues)
+
+
+def caption_coverage(cues: list[Cue], duration: float) -> float:
+    """
+    Fraction of the video duration during which a caption is shown.
+    """
+    if not duration:
+        return 1.0 if cues else 0.0
+
+    covered = 0.0
+    covered_until = 0.0
+    for start, end, _ in sorted(cues):
+        start = max(start, covered_until)
+        if end > start:
+            covered += end - start
+            covered_until = end
+
+    return min(covered / duration, 1.0)
@@ -1,5 +1,13 @@
+import os
 import re
+import math
+import hashlib
 import logging
+import threading
+from pathlib import Path
+from typing import Iterator
+from difflib import SequenceMatcher
+from contextlib import contextmanager
 
 
 logger = logging.getLogger(__name__)
@@ -30,3 +38,159 @@ def cleanup_files(audio_file_path: str = None, pdf_file_path: str = None) -> Non
 
     except Exception as ex:
         logger.warning(f"Error during file cleanup: {str(ex)}")
+
+
+@contextmanager
+def atomic_write_path(path: str | Path) -> Iterator[Path]:
+    """
+    Yield a temporary sibling path to write to, renamed over path on success.
+
+    Readers see either the old file or the complete new one, never a
+    partial write.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def file_digest(path: str | Path) -> str:
+    """
+    SHA-256 hex digest of a file's content.
+    """
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def stitch_transcripts(
+    segments: list[tuple[str, float, float]],
+    min_match_words: int = 3,
+    end_slack_words: int = 2,
+) -> str:
+    """
+    Join transcripts of overlapping audio segments, dropping the words repeated in each overlap.
+
+    segments are (text, start, end) with times in seconds. Only the words
+    spoken in the time two segments share are compared, estimated from
+    each segment's own speech rate. A match must also run to the end of
+    the earlier segment, give or take end_slack_words cut off mid-word,
+    so a phrase repeated elsewhere is never taken for the overlap.
+    """
+    stitched: list[str] = []
+    previous_end = 0.0
+    previous_rate = 0.0
+
+    for text, start, end in segments:
+        words = text.split()
+        rate = len(words) / (end - start) if end > start else 0.0
+        overlap = previous_end - start
+
+        if stitched and overlap > 0:
+            tail = stitched[-_overlap_words(overlap, previous_rate) :]
+            head = words[: _overlap_words(overlap, rate)]
+            blocks = [
+                block
+                for block in SequenceMatcher(
+                    None,
+                    [_normalize_word(w) for w in tail],
+                    [_normalize_word(w) for w in head],
+                    autojunk=False,
+                ).get_matching_blocks()
+                if block.size >= min_match_words
+                and block.a + block.size >= len(tail) - end_slack_words
+            ]
+            if blocks:
+                match = max(blocks, key=lambda block: block.size)
+                # keep the earlier segment up to the overlap, then continue
+                # from the same point in the later segment
+                cut = len(stitched) - len(tail) + match.a
+                stitched = stitched[:cut] + words[match.b :]
+            else:
+                stitched.extend(words)
+        else:
+            stitched.extend(words)
+
+        previous_end, previous_rate = end, rate
+
+    return " ".join(stitched)
+
+
+def _overlap_words(overlap_seconds: float, words_per_second: float) -> int:
+    # speech rate varies within a segment, so leave room either side
+    return math.ceil(overlap_seconds * words_per_second * 1.5) + 3
+
+
+def estimate_tokens(text: str, chars_per_token: float = 4.0) -> int:
+    """
+    Estimate the token count of text from its length.
+    """
+    return math.ceil(len(text) / chars_per_token)
+
+
+def split_text_by_tokens(
+    text: str, max_tokens: int, chars_per_token: float = 4.0
+) -> list[str]:
+    """
+    Split text into windows of at most max_tokens, breaking at sentence ends where possible.
+    """
+    max_chars = int(max_tokens * chars_per_token)
+    windows = []
+
+    while len(text) > max_chars:
+        cut = max(text.rfind(". ", 0, max_chars), text.rfind("? ", 0, max_chars))
+        if cut < max_chars // 2:
+            cut = text.rfind(" ", 0, max_chars)
+        if cut <= 0:
+            cut = max_chars - 1
+
+        windows.append(text[: cut + 1].strip())
+        text = text[cut + 1 :]
+
+    if text.strip():
+        windows.append(text.strip())
+
+    return windows
+
+
+def format_duration(seconds: int) -> str:
+    """
+    Format duration from seconds to readable format.
+    """
+    if not seconds:
+        return "Unknown"
+
+    seconds = int(seconds)
+    hours = seconds // 3600
+    minutes = (seconds % 3600) // 60
+    seconds = seconds % 60
+
+    if hours > 0:
+        return f"{hours}h {minutes}m {seconds}s"
+    elif minutes > 0:
+        return f"{minutes}m {seconds}s"
+    else:
+        return f"{seconds}s"
+
+
+def format_timestamp(seconds: float) -> str:
+    """
+    Format timestamp from seconds to HH:MM:SS or MM:SS.
+    """
+    if not seconds:
+        return "00:00"
+
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    secs = int(seconds % 60)
+
+    if hours > 0:
+        return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+    else:
+        return f"{minutes:02d}:{secs:02d}"
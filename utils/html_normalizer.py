@@ -0,0 +1,168 @@
+from html import escape
+from html.parser import HTMLParser
+
+# elements dropped together with everything inside them
+DROPPED_ELEMENTS = {
+    "audio",
+    "canvas",
+    "embed",
+    "form",
+    "head",
+    "iframe",
+    "link",
+    "meta",
+    "noscript",
+    "object",
+    "script",
+    "style",
+    "svg",
+    "template",
+    "title",
+    "video",
+}
+
+VOID_ELEMENTS = {"br", "hr", "img", "link", "meta"}
+
+# elements kept, with the attributes each may carry besides class
+ALLOWED_ELEMENTS = {
+    "a": {"href"},
+    "b": set(),
+    "blockquote": set(),
+    "br": set(),
+    "code": set(),
+    "div": set(),
+    "em": set(),
+    "h1": set(),
+    "h2": set(),
+    "h3": set(),
+    "h4": set(),
+    "h5": set(),
+    "h6": set(),
+    "hr": set(),
+    "i": set(),
+    "img": {"src", "alt"},
+    "li": set(),
+    "ol": {"start"},
+    "p": set(),
+    "pre": set(),
+    "section": set(),
+    "span": set(),
+    "strong": set(),
+    "sub": set(),
+    "sup": set(),
+    "table": set(),
+    "tbody": set(),
+    "td": {"colspan", "rowspan"},
+    "th": {"colspan", "rowspan"},
+    "thead": set(),
+    "tr": set(),
+    "u": set(),
+    "ul": set(),
+}
+
+
+class _Normalizer(HTMLParser):
+    """Rebuild HTML keeping only allowed elements and attributes."""
+
+    def __init__(self, drop_images: bool = False):
+        super().__init__(convert_charrefs=True)
+        self.drop_images = drop_images
+        self.output: list[str] = []
+        self.open_elements: list[str] = []
+        self.dropping: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if self.dropping:
+            # count nested elements of the dropped kind to find its end
+            if tag == self.dropping[-1]:
+                self.dropping.append(tag)
+            return
+
+        if tag in DROPPED_ELEMENTS or (tag == "img" and self.drop_images):
+            if tag not in VOID_ELEMENTS:
+                self.dropping.append(tag)
+            return
+
+        if tag not in ALLOWED_ELEMENTS:
+            # unknown wrappers (html, body, article, ...) keep their content
+            return
+
+        kept = self._filter_attributes(tag, attrs)
+        if kept is None:
+            return
+
+        self.output.append(f"<{tag}{kept}>")
+        if tag not in VOID_ELEMENTS:
+            self.open_elements.append(tag)
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if self.dropping:
+            if tag == self.dropping[-1]:
+                self.dropping.pop()
+            return
+
+        if tag not in self.open_elements:
+            return
+
+        # close elements the model left open inside this one
+        while self.open_elements:
+            open_tag = self.open_elements.pop()
+            self.output.append(f"</{open_tag}>")
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data: str) -> None:
+        if not self.dropping:
+            self.output.append(escape(data, quote=False))
+
+    def close(self) -> None:
+        super().close()
+        while self.open_elements:
+            self.output.append(f"</{self.open_elements.pop()}>")
+
+    def _filter_attributes(
+        self, tag: str, attrs: list[tuple[str, str | None]]
+    ) -> str | None:
+        """
+        Keep class and the element's allowed attributes, or return None to skip the element.
+        """
+        allowed = ALLOWED_ELEMENTS[tag] | {"class"}
+        kept = []
+        for name, value in attrs:
+            if name not in allowed or value is None:
+                continue
+
+            if name in ("href", "src"):
+                scheme = value.split(":", 1)[0].lower() if ":" in value else ""
+                if tag == "img" and scheme != "data":
+                    # remote images block layout on a network fetch
+                    return None
+                if tag == "a" and scheme not in ("http", "https", "mailto", ""):
+                    continue
+
+            kept.append(f' {name}="{escape(value)}"')
+
+        if tag == "img" and not any(name == "src" for name, _ in attrs):
+            return None
+
+        return "".join(kept)
+
+
+def normalize_html(html: str, drop_images: bool = False) -> str:
+    """
+    Reduce model-generated HTML to the elements the house stylesheet covers.
+
+    Style blocks, inline styles, scripts, embedded media and remote images
+    are removed, so every render is laid out with the one pre-parsed
+    stylesheet. Unknown wrapper elements are unwrapped and unclosed
+    elements are closed. With drop_images, inline images are removed too.
+    """
+    normalizer = _Normalizer(drop_images)
+    normalizer.feed(html)
+    normalizer.close()
+    return "".join(normalizer.output)
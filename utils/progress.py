@@ -0,0 +1,52 @@
+from typing import Any, Callable
+
+# called with (completed, total) units of work, e.g. bytes or chunks
+ProgressCallback = Callable[[float, float], None]
+
+
+class ProgressReporter:
+    """Turn pipeline stage changes and work counts into events for a listener."""
+
+    def __init__(self, listener: Callable[[dict[str, Any]], None] | None = None):
+        self.listener = listener
+        self._last_percent: dict[str, int] = {}
+
+    def stage(self, name: str) -> None:
+        """
+        Report that a stage has started.
+        """
+        self._emit({"type": "stage", "stage": name})
+
+    def update(self, stage: str, completed: float, total: float | None) -> None:
+        """
+        Report progress within a stage, at most once per whole percent.
+
+        May be called from executor threads, so the listener must be thread-safe.
+        """
+        if not total:
+            return
+
+        percent = min(int(completed * 100 / total), 100)
+        if self._last_percent.get(stage) == percent:
+            return
+        self._last_percent[stage] = percent
+
+        self._emit(
+            {
+                "type": "progress",
+                "stage": stage,
+                "percent": percent,
+                "completed": completed,
+                "total": total,
+            }
+        )
+
+    def callback(self, stage: str) -> ProgressCallback:
+        """
+        Get a (completed, total) callback reporting progress for a stage.
+        """
+        return lambda completed, total: self.update(stage, completed, total)
+
+    def _emit(self, event: dict[str, Any]) -> None:
+        if self.listener:
+            self.listener(event)
@@ -0,0 +1,57 @@
+import time
+from typing import Any, Iterator
+from contextlib import contextmanager
+
+from core.metrics import metrics
+
+
+class StageTimer:
+    """Record when each pipeline stage starts and ends, relative to the job start."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.stages: dict[str, dict[str, Any]] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Time one span of a stage. A stage may run as several, possibly concurrent, spans.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    def record(self, name: str, start: float, end: float) -> None:
+        """
+        Record a span of a stage from perf_counter timestamps.
+        """
+        metrics.stage_duration.labels(stage=name).observe(end - start)
+        stage = self.stages.setdefault(
+            name, {"start": start, "end": end, "busy": 0.0, "spans": 0}
+        )
+        stage["start"] = min(stage["start"], start)
+        stage["end"] = max(stage["end"], end)
+        stage["busy"] += end - start
+        stage["spans"] += 1
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        """
+        Get each stage's window and busy time in seconds from the job start.
+
+        When stages overlap, their windows intersect and the total is less
+        than the sum of the stage durations.
+        """
+        return {
+            name: {
+                "start": round(stage["start"] - self.started_at, 3),
+                "end": round(stage["end"] - self.started_at, 3),
+                "duration": round(stage["end"] - stage["start"], 3),
+                "busy": round(stage["busy"], 3),
+                "spans": stage["spans"],
+            }
+            for name, stage in sorted(
+                self.stages.items(), key=lambda item: item[1]["start"]
+            )
+        }